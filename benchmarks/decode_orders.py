@@ -0,0 +1,151 @@
+"""Orders decoded per second, eager decoder against decode_order
+
+    python benchmarks/decode_orders.py [--orders N] [--rounds N]
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import astuple
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.order_decoder import decode_order
+from src.types.models import (
+    Order, OrderStatus, OrderType, TimeFrame, TradeDirection, TPSLStatus,
+    TakeProfit, StopLoss, PartialTakeProfit, TrailingStopLoss
+)
+
+def eager_decode(doc: dict) -> Order:
+    """The previous MongoClient._document_to_order, kept as the baseline"""
+    try:
+        order_type = OrderType(doc.get("order_type"))
+    except (ValueError, TypeError):
+        order_type = OrderType.SPOT
+    order = Order(
+        symbol=doc["symbol"],
+        status=OrderStatus(doc["status"]),
+        order_type=order_type,
+        price=Decimal(str(doc["price"])),
+        quantity=Decimal(str(doc["quantity"])),
+        timeframe=TimeFrame(doc["timeframe"]),
+        order_id=doc["order_id"],
+        created_at=doc["created_at"],
+        updated_at=doc["updated_at"],
+        leverage=doc.get("leverage"),
+        direction=TradeDirection(doc["direction"]) if doc.get("direction") else None,
+        filled_at=doc.get("filled_at"),
+        cancelled_at=doc.get("cancelled_at"),
+        fees=Decimal(str(doc.get("fees", 0))),
+        fee_asset=doc.get("fee_asset"),
+        threshold=doc.get("threshold"),
+        is_manual=doc.get("is_manual", False)
+    )
+    if doc.get("take_profit"):
+        tp_data = doc["take_profit"]
+        order.take_profit = TakeProfit(
+            price=Decimal(str(tp_data["price"])),
+            percentage=float(tp_data["percentage"]),
+            status=TPSLStatus(tp_data["status"]),
+            triggered_at=tp_data.get("triggered_at"),
+            order_id=tp_data.get("order_id")
+        )
+    if doc.get("stop_loss"):
+        sl_data = doc["stop_loss"]
+        order.stop_loss = StopLoss(
+            price=Decimal(str(sl_data["price"])),
+            percentage=float(sl_data["percentage"]),
+            status=TPSLStatus(sl_data["status"]),
+            triggered_at=sl_data.get("triggered_at"),
+            order_id=sl_data.get("order_id")
+        )
+    for tp_data in doc.get("partial_take_profits") or []:
+        order.partial_take_profits.append(PartialTakeProfit(
+            level=int(tp_data["level"]),
+            price=Decimal(str(tp_data["price"])),
+            profit_percentage=float(tp_data["profit_percentage"]),
+            position_percentage=float(tp_data["position_percentage"]),
+            status=TPSLStatus(tp_data["status"]),
+            triggered_at=tp_data.get("triggered_at"),
+            order_id=tp_data.get("order_id")
+        ))
+    if doc.get("trailing_stop_loss"):
+        tsl_data = doc["trailing_stop_loss"]
+        order.trailing_stop_loss = TrailingStopLoss(
+            activation_percentage=float(tsl_data["activation_percentage"]),
+            callback_rate=float(tsl_data["callback_rate"]),
+            initial_price=Decimal(str(tsl_data["initial_price"])),
+            activation_price=Decimal(str(tsl_data["activation_price"])),
+            current_stop_price=Decimal(str(tsl_data["current_stop_price"])),
+            highest_price=Decimal(str(tsl_data["highest_price"])),
+            status=TPSLStatus(tsl_data["status"]),
+            triggered_at=tsl_data.get("triggered_at"),
+            activated_at=tsl_data.get("activated_at"),
+            order_id=tsl_data.get("order_id")
+        )
+    return order
+
+def make_documents(count: int) -> list:
+    """Filled limit orders shaped like MongoClient.insert_order writes them"""
+    now = datetime.utcnow()
+    docs = []
+    for i in range(count):
+        price = 100 + i % 50
+        docs.append({
+            "symbol": "BTCUSDT", "status": "filled", "order_type": "limit",
+            "price": f"{price}.12345678", "quantity": "0.00150000",
+            "threshold": 5.0, "timeframe": "daily", "order_id": str(1000000 + i),
+            "created_at": now, "updated_at": now, "fees": "0.00001500", "fee_asset": "BTC",
+            "is_manual": False, "filled_at": now, "cancelled_at": None,
+            "take_profit": {"price": f"{price * 1.1:.8f}", "percentage": 10.0, "status": "pending",
+                            "triggered_at": None, "order_id": None},
+            "stop_loss": {"price": f"{price * 0.95:.8f}", "percentage": 5.0, "status": "pending",
+                          "triggered_at": None, "order_id": None},
+            "partial_take_profits": [
+                {"level": level, "price": f"{price * (1 + level / 20):.8f}", "profit_percentage": level * 5.0,
+                 "position_percentage": 33.3, "status": "pending", "triggered_at": None, "order_id": None}
+                for level in (1, 2, 3)
+            ],
+            "trailing_stop_loss": {
+                "activation_percentage": 2.0, "callback_rate": 1.0, "initial_price": f"{price}.12345678",
+                "activation_price": f"{price * 1.02:.8f}", "current_stop_price": f"{price * 0.99:.8f}",
+                "highest_price": f"{price}.12345678", "status": "pending", "triggered_at": None,
+                "activated_at": None, "order_id": None
+            }
+        })
+    return docs
+
+def touch_tp_sl(order: Order):
+    return (order.take_profit, order.stop_loss, order.partial_take_profits, order.trailing_stop_loss)
+
+def measure(decoder, docs: list, rounds: int, access=None) -> float:
+    """Best orders/second over a few rounds"""
+    best = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for doc in docs:
+            order = decoder(doc)
+            if access:
+                access(order)
+        best = max(best, len(docs) / (time.perf_counter() - start))
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    docs = make_documents(args.orders)
+    assert astuple(eager_decode(docs[0])) == astuple(decode_order(docs[0]))
+
+    print(f"{'scenario':<32}{'eager/s':>12}{'decode_order/s':>16}{'speedup':>10}")
+    for name, access in (("scalar fields only", None), ("all TP/SL sub-objects read", touch_tp_sl)):
+        before = measure(eager_decode, docs, args.rounds, access)
+        after = measure(decode_order, docs, args.rounds, access)
+        print(f"{name:<32}{before:>12,.0f}{after:>16,.0f}{after / before:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
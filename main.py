@@ -192,6 +192,9 @@ def load_config_from_env() -> dict:
             'take_profit': take_profit_setting,
             'stop_loss': stop_loss_setting,
             'only_lower_entries': os.getenv('TRADING_ONLY_LOWER_ENTRIES', 'true').lower() == 'true',
+            'max_concurrent_symbols': int(os.getenv('TRADING_MAX_CONCURRENT_SYMBOLS', '10')),
+            'threshold_state_durable': os.getenv('TRADING_THRESHOLD_STATE_DURABLE', 'false').lower() == 'true',
+            'archive_after_days': int(os.getenv('TRADING_ARCHIVE_AFTER_DAYS', '90')),
             'partial_take_profits': {
                 'enabled': partial_tp_enabled,
                 'levels': partial_tp_levels
@@ -340,6 +343,25 @@ async def initialize_services(config):
         
         # Initialize indexes - this works with both drivers
         await mongo_client.init_indexes()
+        await mongo_client.verify_query_plans()
+        
+        # Numeric order fields are read without $toDecimal once every order is on Decimal128
+        await mongo_client.refresh_order_schema_state()
+        
+        # Running totals must exist before fills and deposits start incrementing them
+        await mongo_client.get_portfolio_totals()
+        
+        # Serve open orders, symbols and settings from memory
+        await mongo_client.start_change_watcher()
+        
+        # Daily and weekly balance history aggregates for long chart ranges
+        await mongo_client.start_balance_rollups()
+        
+        # Keep the orders collection to open and recent orders
+        await mongo_client.start_order_archive(config['trading'].get('archive_after_days'))
+        
+        # Precomputed /viz views, read by get_visualization_data without touching orders
+        await mongo_client.start_order_views()
         
         # Ensure we use a consistent base currency throughout
         base_currency = config['trading'].get('base_currency', 'USDT')
@@ -471,6 +493,10 @@ async def main():
                 order_manager.stop(),
                 telegram_bot.stop(),
                 binance_client.close(),
+                services['mongo_client'].stop_change_watcher(),
+                services['mongo_client'].stop_balance_rollups(),
+                services['mongo_client'].stop_order_archive(),
+                services['mongo_client'].stop_order_views(),
                 return_exceptions=True
             )
             
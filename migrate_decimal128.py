@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+from src.database.mongo_client import MongoClient, ORDER_SCHEMA_VERSION
+from src.types.constants import DECIMAL_MIGRATION_BATCH_SIZE, DECIMAL_MIGRATION_PAUSE_SECONDS
+from src.utils.logger import setup_logging
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=f"Convert string prices, quantities and fees of orders to Decimal128 (schema version {ORDER_SCHEMA_VERSION})"
+    )
+    parser.add_argument('--batch-size', type=int, default=DECIMAL_MIGRATION_BATCH_SIZE)
+    parser.add_argument('--pause', type=float, default=DECIMAL_MIGRATION_PAUSE_SECONDS,
+                        help="Seconds to wait between batches")
+    args = parser.parse_args()
+
+    setup_logging()
+    from main import load_and_merge_config
+    config = await load_and_merge_config()
+
+    mongo_client = MongoClient(
+        uri=config['mongodb']['uri'],
+        database_name=config['mongodb']['database'],
+        driver=config['mongodb'].get('driver', 'motor')
+    )
+
+    def progress(stats):
+        print(f"Converted {stats['migrated']} orders, {stats['changed']} changed while running, {stats['failed']} failed")
+
+    # Safe to run while the bot is trading, orders changed mid-batch are picked up by the next run
+    stats = await mongo_client.migrate_orders_to_decimal128(args.batch_size, args.pause, progress)
+    if stats['remaining']:
+        print(f"{stats['remaining']} orders still use strings, run the migration again")
+    else:
+        print("All orders use Decimal128, restart the bot to use the simplified aggregations")
+
+if __name__ == "__main__":
+    asyncio.run(main())
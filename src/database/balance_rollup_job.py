@@ -0,0 +1,36 @@
+import asyncio
+import logging
+from ..types.constants import BALANCE_ROLLUP_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class BalanceRollupJob:
+    """Keeps the daily and weekly balance_history rollups current in the background"""
+
+    def __init__(self, mongo_client, interval: float = BALANCE_ROLLUP_INTERVAL_SECONDS):
+        self.mongo_client = mongo_client
+        self.interval = interval
+        self.task = None
+
+    async def start(self):
+        if not self.task:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.mongo_client.rollup_balance_history()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ROLLUP] Balance history rollup failed: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+import pymongo.errors
+from ..types.constants import CHANGE_POLL_SECONDS, CHANGE_POLL_FULL_RELOAD_EVERY
+
+logger = logging.getLogger(__name__)
+
+# Raised when opening a change stream on a standalone mongod
+CHANGE_STREAMS_UNSUPPORTED = 40573
+# Re-read documents changed this long before the previous poll, covering writes in flight
+POLL_OVERLAP = timedelta(seconds=5)
+
+class CollectionCache:
+    """In-memory copy of the documents of one collection, keyed by _id"""
+
+    def __init__(self, collection, query: dict = None, keep: Callable[[dict], bool] = None,
+                 poll_field: Optional[str] = None):
+        self.collection = collection
+        self.query = query or {}
+        # Change events for documents outside query remove them instead
+        self.keep = keep or (lambda doc: True)
+        # Timestamp field the polling fallback diffs on, None to reload on every poll
+        self.poll_field = poll_field
+        self.docs: Dict[object, dict] = {}
+
+    @property
+    def name(self) -> str:
+        return self.collection.name
+
+    def values(self) -> Iterable[dict]:
+        return self.docs.values()
+
+    def put(self, doc: dict):
+        if self.keep(doc):
+            self.docs[doc["_id"]] = doc
+        else:
+            self.docs.pop(doc["_id"], None)
+
+    def delete(self, doc_id):
+        self.docs.pop(doc_id, None)
+
+    async def load(self):
+        docs = await self.collection.find(self.query).to_list(None)
+        self.docs = {doc["_id"]: doc for doc in docs}
+
+    async def poll(self, since: datetime):
+        """Apply documents changed after since, or reload when there is no timestamp to diff on"""
+        if not self.poll_field:
+            await self.load()
+            return
+        async for doc in self.collection.find({self.poll_field: {"$gt": since}}):
+            self.put(doc)
+
+class ChangeWatcher:
+    """Keeps CollectionCaches current from a database change stream, polling where there is none
+
+    Change streams need a replica set; a single-node one is enough for local runs.
+    """
+
+    def __init__(self, db, caches: Iterable[CollectionCache], poll_interval: float = CHANGE_POLL_SECONDS):
+        self.db = db
+        self.caches = {cache.name: cache for cache in caches}
+        self.poll_interval = poll_interval
+        self.mode: Optional[str] = None  # "stream" or "poll"
+        self.ready = False
+        self.task = None
+
+    async def start(self):
+        if not self.task:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.ready = False
+
+    async def _load_all(self):
+        for cache in self.caches.values():
+            await cache.load()
+        logger.info(f"[CACHE] Loaded {', '.join(f'{len(c.docs)} {name}' for name, c in self.caches.items())}")
+
+    def _apply(self, change: dict):
+        cache = self.caches.get(change.get("ns", {}).get("coll"))
+        if cache is None:
+            return
+        operation = change["operationType"]
+        if operation == "delete":
+            cache.delete(change["documentKey"]["_id"])
+        elif change.get("fullDocument") is not None:
+            cache.put(change["fullDocument"])
+        elif operation in ("update", "replace"):
+            # Deleted before the update could be looked up
+            cache.delete(change["documentKey"]["_id"])
+
+    async def _run(self):
+        while True:
+            try:
+                await self._watch()
+            except pymongo.errors.OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning("[CACHE] Change streams need a replica set, polling for changes instead")
+                    await self._poll_loop()
+                    return
+                logger.error(f"[CACHE] Change stream failed: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[CACHE] Change stream failed: {e}")
+            # Reads fall back to MongoDB until the caches are reloaded
+            self.ready = False
+            await asyncio.sleep(self.poll_interval)
+
+    async def _watch(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self.caches)}}}]
+        async with self.db.watch(pipeline, full_document="updateLookup") as stream:
+            # Opens the stream before loading, so no change between the two is missed
+            first = await stream.try_next()
+            await self._load_all()
+            self.mode = "stream"
+            self.ready = True
+            if first:
+                self._apply(first)
+            async for change in stream:
+                if change["operationType"] in ("drop", "dropDatabase", "rename", "invalidate"):
+                    logger.warning(f"[CACHE] Change stream ended by {change['operationType']}, reloading")
+                    return
+                self._apply(change)
+
+    async def _poll_loop(self):
+        since = datetime.utcnow()
+        await self._load_all()
+        self.mode = "poll"
+        self.ready = True
+        polls = 0
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            started = datetime.utcnow()
+            polls += 1
+            try:
+                if polls % CHANGE_POLL_FULL_RELOAD_EVERY == 0:
+                    # Deletions only show up in a full reload
+                    await self._load_all()
+                else:
+                    for cache in self.caches.values():
+                        await cache.poll(since - POLL_OVERLAP)
+                since = started
+                self.ready = True
+            except Exception as e:
+                logger.error(f"[CACHE] Polling for changes failed: {e}")
+                self.ready = False
@@ -12,15 +12,128 @@ import motor.motor_asyncio
 import pymongo
 import pymongo.errors
 from pymongo.client_session import ClientSession
+from bson.decimal128 import Decimal128, create_decimal128_context
+import decimal
 
 from ..types.models import Order, OrderStatus, TimeFrame, OrderType, TradeDirection, TPSLStatus, TakeProfit, StopLoss, PartialTakeProfit, TrailingStopLoss  # Add TPSLStatus and related classes
-from ..types.constants import TAX_RATE, PRICE_PRECISION
+from ..types.constants import (
+    TAX_RATE, PRICE_PRECISION, DECIMAL_MIGRATION_BATCH_SIZE, DECIMAL_MIGRATION_PAUSE_SECONDS,
+    BALANCE_ROLLUPS, BALANCE_CHART_MIN_POINTS, ORDER_ARCHIVE_AFTER_DAYS, ORDER_ARCHIVE_BATCH_SIZE
+)
+from .order_decoder import ORDER_PROJECTION, decode_order
+from .change_watcher import ChangeWatcher, CollectionCache
+from .order_index import OrderIndex, INDEX_PROJECTION
+from .balance_rollup_job import BalanceRollupJob
+from .order_archive_job import OrderArchiveJob
+from .order_views_job import OrderViewsJob
+from .order_views import view_specs, refresh_pipeline, read_pipeline
+from ..types.codec import to_document, to_decimal
 from decimal import ROUND_DOWN, InvalidOperation
 import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Numeric balance snapshot fields, stored as doubles in the balance_history time series
+_BALANCE_FIELDS = ("balance", "invested", "fees", "net_deposits", "total_net_deposits")
+_BALANCE_PROJECTION = {"_id": 0, "timestamp": 1, "balance": 1, "invested": 1, "fees": 1, "net_deposits": 1}
+# balance_history documents copied per insert_many when converting the old collection
+_BALANCE_COPY_BATCH = 1000
+
+def _balance_number(value) -> float:
+    return float(to_decimal(value)) if value is not None else 0.0
+
+def _balance_row(doc: dict) -> dict:
+    """Chart row from a balance_history or balance_rollups document"""
+    return {
+        "timestamp": doc["timestamp"],
+        "balance": _balance_number(doc.get("balance")),
+        "invested": _balance_number(doc.get("invested")),
+        "fees": _balance_number(doc.get("fees")),
+        "net_deposits": _balance_number(doc.get("net_deposits"))
+    }
+
+# _id of the analytics_state document recording the last /viz view refresh
+ORDER_VIEWS_STATE_ID = "order_views"
+# _id of the analytics_state document recording the last legacy balance snapshot copied
+BALANCE_COPY_STATE_ID = "balance_history_copy"
+# Orders updated this long before the last view refresh are rechecked, covering writes in flight
+_ORDER_VIEWS_OVERLAP = timedelta(seconds=5)
+
+# _id of the single running totals document in portfolio_totals
+PORTFOLIO_TOTALS_ID = "totals"
+
+# Order documents from version 2 on store prices, quantities and fees as Decimal128 instead of strings
+ORDER_SCHEMA_VERSION = 2
+
+def _to_decimal128(value) -> Decimal128:
+    """Convert a number to Decimal128, rounding to its 34 significant digits"""
+    with decimal.localcontext(create_decimal128_context()) as ctx:
+        return Decimal128(ctx.create_decimal(str(value)))
+
+def _from_decimal128(value) -> Decimal:
+    if isinstance(value, Decimal128):
+        return value.to_decimal()
+    return Decimal(str(value)) if value is not None else Decimal('0')
+
+def _serialize_tp_sl(target) -> Optional[dict]:
+    """Serialize a TakeProfit or StopLoss"""
+    return to_document(target, _to_decimal128) if target else None
+
+def _serialize_partial_take_profits(partial_take_profits) -> List[dict]:
+    return [to_document(ptp, _to_decimal128) for ptp in (partial_take_profits or [])]
+
+def _serialize_trailing_stop_loss(tsl) -> Optional[dict]:
+    return to_document(tsl, _to_decimal128) if tsl else None
+
+# Numeric order fields still stored as strings in documents older than ORDER_SCHEMA_VERSION 2
+_DECIMAL_SUBDOCUMENT_FIELDS = {
+    "take_profit": ("price",),
+    "stop_loss": ("price",),
+    "trailing_stop_loss": ("initial_price", "activation_price", "current_stop_price", "highest_price")
+}
+_DECIMAL_MIGRATION_PROJECTION = {
+    "_id": 1, "updated_at": 1, "price": 1, "quantity": 1, "fees": 1,
+    "take_profit.price": 1, "stop_loss.price": 1, "partial_take_profits.price": 1,
+    **{f"trailing_stop_loss.{field}": 1 for field in _DECIMAL_SUBDOCUMENT_FIELDS["trailing_stop_loss"]}
+}
+
+def _decimal128_update(doc: dict) -> dict:
+    """$set rewriting the string numbers of an order document as Decimal128"""
+    update = {"schema_version": ORDER_SCHEMA_VERSION}
+
+    def convert(path: str, value):
+        if value is not None and not isinstance(value, Decimal128):
+            update[path] = _to_decimal128(value)
+
+    for field in ("price", "quantity", "fees"):
+        convert(field, doc.get(field))
+    for name, fields in _DECIMAL_SUBDOCUMENT_FIELDS.items():
+        sub = doc.get(name)
+        if sub:
+            for field in fields:
+                convert(f"{name}.{field}", sub.get(field))
+    for i, ptp in enumerate(doc.get("partial_take_profits") or []):
+        convert(f"partial_take_profits.{i}.price", ptp.get("price"))
+    return update
+
+def _union_archive(pipeline: list) -> list:
+    """Run an orders pipeline over orders_archive too, its leading $match applied to both"""
+    head = pipeline[:1] if pipeline and "$match" in pipeline[0] else []
+    return head + [{"$unionWith": {"coll": "orders_archive", "pipeline": head}}] + pipeline[len(head):]
+
+def _plan_stages(plan) -> List[str]:
+    """Stage names of an explain() plan tree, outermost first"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("queryPlan", "inputStage"):
+            stages.extend(_plan_stages(plan.get(key)))
+        for child in plan.get("inputStages", []):
+            stages.extend(_plan_stages(child))
+    return stages
+
 class MongoClient:
     def __init__(self, uri=None, database_name=None, env_file='.env', driver=None):
         """Initialize MongoDB client"""
@@ -40,10 +153,27 @@ class MongoClient:
         self.settings = None
         self.thresholds = None
         self.orders = None
+        self.orders_archive = None  # Closed orders moved out of orders by archive_orders
+        self.archive_job = None
         self.balance_history = None
+        self.balance_rollups = None
+        self.rollup_job = None
+        self.analytics_state = None
+        self._order_views_lock = asyncio.Lock()
+        self.views_job = None
         self.reference_prices = None  
         self.trading_symbols = None
         self.deposits_withdrawals = None  # Collection for deposits and withdrawals
+        self.portfolio_totals = None
+        # True once every order document is on ORDER_SCHEMA_VERSION, pipelines then skip $toDecimal
+        self.decimal_storage_complete = False
+        # Open orders, symbols and settings mirrored in memory, see start_change_watcher
+        self.watcher = None
+        self.order_index = None
+        self.symbols_cache = None
+        self.config_cache = None
+        # "<collection> <keys>" of the indexes init_indexes could not build
+        self.failed_indexes: List[str] = []
         
         if not self.connection_string:
             raise ValueError("MongoDB connection string not provided")
@@ -57,18 +187,22 @@ class MongoClient:
             self.db = self.client[self.database_name]
             self.orders = self.db.orders
             self.orders_collection = self.db.orders  # Add this alias
+            self.orders_archive = self.db.orders_archive
             logger.info(f"MongoClient initialized with Motor driver for {self.database_name}")
             
             # Initialize collections
             self.threshold_state = self.db.threshold_state
             self.triggered_thresholds = self.db.triggered_thresholds
             self.balance_history = self.db.balance_history
+            self.balance_rollups = self.db.balance_rollups  # Daily and weekly balance_history aggregates
+            self.analytics_state = self.db.analytics_state  # Refresh bookkeeping of the /viz views
             self.reference_prices = self.db.reference_prices
             self.invalid_symbols = self.db.invalid_symbols
             self.trading_symbols = self.db.trading_symbols
             self.removed_symbols = self.db.removed_symbols
             self.trading_config = self.db.trading_config  # New collection for trading config
             self.deposits_withdrawals = self.db.deposits_withdrawals  # Add deposits_withdrawals collection
+            self.portfolio_totals = self.db.portfolio_totals  # Running invested/deposit totals
             
             logger.info(f"Successfully connected to MongoDB at {self.connection_string}")
             
@@ -85,39 +219,136 @@ class MongoClient:
             return "motor"
         return driver
 
+    async def _create_index(self, collection, keys, **kwargs) -> bool:
+        """create_index that logs a failed build instead of stopping startup"""
+        try:
+            await collection.create_index(keys, **kwargs)
+            return True
+        except pymongo.errors.DuplicateKeyError as e:
+            # A unique index over existing duplicates, the documents have to be cleaned up first
+            duplicate = (e.details or {}).get("keyValue")
+            logger.error(f"Cannot build unique index {keys} on {collection.name}, duplicate key {duplicate}: {e}")
+        except pymongo.errors.OperationFailure as e:
+            logger.error(f"Failed to create index {keys} on {collection.name}: {e}")
+        self.failed_indexes.append(f"{collection.name} {keys}")
+        return False
+
     async def init_indexes(self):
         """Create indexes for collections"""
+        self.failed_indexes = []
         # Create indexes for trading_symbols collection
-        self.trading_symbols.create_index([("symbol", pymongo.ASCENDING)], unique=True)
+        await self._create_index(self.trading_symbols, [("symbol", pymongo.ASCENDING)], unique=True)
         
-        # Create indexes for orders collection
-        self.orders.create_index([("order_id", pymongo.ASCENDING)], unique=True)
-        self.orders.create_index([("symbol", pymongo.ASCENDING)])
-        self.orders.create_index([("side", pymongo.ASCENDING)])
-        self.orders.create_index([("status", pymongo.ASCENDING)])
-        self.orders.create_index([("created_at", pymongo.DESCENDING)])
+        # Create indexes for orders collection, shaped after the queries that run every cycle
+        await self._create_index(self.orders, [("order_id", pymongo.ASCENDING)], unique=True)
+        await self._create_index(self.orders, [("status", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING)])
+        await self._create_index(self.orders, [("status", pymongo.ASCENDING), ("filled_at", pymongo.ASCENDING)])
+        await self._create_index(self.orders, [
+            ("symbol", pymongo.ASCENDING),
+            ("status", pymongo.ASCENDING),
+            ("filled_at", pymongo.DESCENDING)
+        ])
+        await self._create_index(self.orders, [("created_at", pymongo.DESCENDING)])
+        await self._create_index(self.orders, [("updated_at", pymongo.ASCENDING)])
         
-        # Create indexes for balance_history collection
-        self.balance_history.create_index([("timestamp", pymongo.DESCENDING)])
+        # Partial indexes holding only filled orders that still have a pending TP/SL
+        for field in ("take_profit.status", "stop_loss.status", "partial_take_profits.status"):
+            await self._create_index(
+                self.orders,
+                [(field, pymongo.ASCENDING)],
+                name=f"active_{field.replace('.', '_')}",
+                partialFilterExpression={"status": OrderStatus.FILLED.value, field: TPSLStatus.PENDING.value}
+            )
+        
+        # orders_archive serves the history queries, same indexes without the TP/SL ones
+        await self._create_index(self.orders_archive, [("order_id", pymongo.ASCENDING)], unique=True)
+        await self._create_index(self.orders_archive, [("status", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING)])
+        await self._create_index(self.orders_archive, [("status", pymongo.ASCENDING), ("filled_at", pymongo.ASCENDING)])
+        await self._create_index(self.orders_archive, [
+            ("symbol", pymongo.ASCENDING),
+            ("status", pymongo.ASCENDING),
+            ("filled_at", pymongo.DESCENDING)
+        ])
+        await self._create_index(self.orders_archive, [("created_at", pymongo.DESCENDING)])
+        
+        # Single-field indexes covered by the compound ones above
+        for name in ("status_1", "symbol_1", "side_1"):
+            try:
+                await self.orders.drop_index(name)
+                logger.info(f"Dropped redundant orders index {name}")
+            except pymongo.errors.OperationFailure:
+                pass
+        
+        # balance_history is a time series, balance_rollups is keyed by resolution and bucket
+        await self.init_balance_history()
+        await self._create_index(self.balance_history, [("timestamp", pymongo.DESCENDING)])
+        await self._create_index(
+            self.balance_rollups,
+            [("resolution", pymongo.ASCENDING), ("timestamp", pymongo.ASCENDING)], unique=True
+        )
+        
+        # /viz views are read and refreshed by day
+        for spec in view_specs(self._order_number).values():
+            await self._create_index(self.db[spec["collection"]], [("_id.date", pymongo.ASCENDING)])
         
         # Create indexes for threshold_state collection
-        self.threshold_state.create_index([
+        await self._create_index(self.threshold_state, [
             ("symbol", pymongo.ASCENDING),
             ("timeframe", pymongo.ASCENDING),
             ("type", pymongo.ASCENDING)
         ])
         
-        # Create indexes for reference_prices collection
-        self.reference_prices.create_index([("symbol", pymongo.ASCENDING)], unique=True)
+        # Create indexes for reference_prices collection (one cached open per symbol and timeframe)
+        await self._create_index(self.reference_prices, [
+            ("symbol", pymongo.ASCENDING),
+            ("timeframe", pymongo.ASCENDING)
+        ], unique=True)
         
         # Create indexes for deposits_withdrawals collection
-        self.deposits_withdrawals.create_index([("timestamp", pymongo.DESCENDING)])
-        self.deposits_withdrawals.create_index([("transaction_id", pymongo.ASCENDING)], unique=True)
-        self.deposits_withdrawals.create_index([("transaction_type", pymongo.ASCENDING)])
+        await self._create_index(self.deposits_withdrawals, [("timestamp", pymongo.DESCENDING)])
+        await self._create_index(self.deposits_withdrawals, [("transaction_id", pymongo.ASCENDING)], unique=True)
+        await self._create_index(self.deposits_withdrawals, [("transaction_type", pymongo.ASCENDING)])
         
+        if self.failed_indexes:
+            logger.warning(f"MongoDB indexes initialized, {len(self.failed_indexes)} could not be built")
+            return False
         logger.info("MongoDB indexes initialized successfully")
         return True
 
+    def _hot_order_queries(self) -> List[tuple]:
+        """(name, filter, sort) of the order queries run every monitoring cycle"""
+        since = datetime.utcnow() - timedelta(days=30)
+        filled = OrderStatus.FILLED.value
+        return [
+            ("pending orders", {"status": OrderStatus.PENDING.value}, [("created_at", 1)]),
+            ("stale pending orders", {"status": OrderStatus.PENDING.value, "created_at": {"$lt": since}}, None),
+            ("active orders", {"status": filled}, None),
+            ("buy history", {"status": filled, "filled_at": {"$gte": since}}, [("filled_at", 1)]),
+            ("symbol position", {"symbol": "BTCUSDT", "status": filled}, None),
+            ("latest symbol fill", {"symbol": "BTCUSDT", "status": filled}, [("filled_at", -1)]),
+            ("active TP/SL", self._active_tp_sl_query(), None),
+        ]
+
+    async def verify_query_plans(self) -> Dict[str, bool]:
+        """Explain every hot order query and warn about any that scans the whole collection"""
+        results = {}
+        for name, query, sort in self._hot_order_queries():
+            try:
+                cursor = self.orders.find(query)
+                if sort:
+                    cursor = cursor.sort(sort)
+                plan = await cursor.explain()
+                stages = _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+                results[name] = "COLLSCAN" not in stages
+                if results[name]:
+                    logger.debug(f"Query plan for {name}: {' <- '.join(stages)}")
+                else:
+                    logger.warning(f"Query for {name} does not use an index: {' <- '.join(stages)}")
+            except Exception as e:
+                logger.error(f"Failed to explain query for {name}: {e}")
+                results[name] = False
+        return results
+
     def _validate_order_data(self, order: Order) -> bool:
         """Validate order data before insertion"""
         required_fields = {
@@ -175,178 +406,62 @@ class MongoClient:
             return False
 
     async def insert_order(self, order: Order) -> Optional[str]:
-        """Insert order with validation"""
+        """Insert or update an order with validation, as a single upsert"""
         if not self._validate_order_data(order):
             logger.error("Order validation failed")
             return None
 
         try:
-            # Check if order with this ID already exists
-            existing_order = await self.orders.find_one({"order_id": order.order_id})
-            if (existing_order):
-                logger.info(f"Order {order.order_id} already exists, updating instead of inserting")
-                
-                # Serialize take profit data if present
-                tp_data = None
-                if order.take_profit:
-                    tp_data = {
-                        "price": str(order.take_profit.price),
-                        "percentage": order.take_profit.percentage,
-                        "status": order.take_profit.status.value,
-                        "triggered_at": order.take_profit.triggered_at,
-                        "order_id": order.take_profit.order_id
-                    }
-
-                # Serialize stop loss data if present
-                sl_data = None
-                if order.stop_loss:
-                    sl_data = {
-                        "price": str(order.stop_loss.price),
-                        "percentage": order.stop_loss.percentage,
-                        "status": order.stop_loss.status.value,
-                        "triggered_at": order.stop_loss.triggered_at,
-                        "order_id": order.stop_loss.order_id
-                    }
-                
-                # Serialize partial take profits data if present
-                partial_tp_data = []
-                if hasattr(order, 'partial_take_profits') and order.partial_take_profits:
-                    for ptp in order.partial_take_profits:
-                        partial_tp_data.append({
-                            "level": ptp.level,
-                            "price": str(ptp.price),
-                            "profit_percentage": ptp.profit_percentage,
-                            "position_percentage": ptp.position_percentage,
-                            "status": ptp.status.value,
-                            "triggered_at": ptp.triggered_at,
-                            "order_id": ptp.order_id
-                        })
-                
-                # Serialize trailing stop loss data if present
-                tsl_data = None
-                if hasattr(order, 'trailing_stop_loss') and order.trailing_stop_loss:
-                    tsl = order.trailing_stop_loss
-                    tsl_data = {
-                        "activation_percentage": tsl.activation_percentage,
-                        "callback_rate": tsl.callback_rate,
-                        "initial_price": str(tsl.initial_price),
-                        "activation_price": str(tsl.activation_price),
-                        "current_stop_price": str(tsl.current_stop_price),
-                        "highest_price": str(tsl.highest_price),
-                        "status": tsl.status.value,
-                        "triggered_at": tsl.triggered_at,
-                        "activated_at": tsl.activated_at,
-                        "order_id": tsl.order_id
-                    }
-                
-                # Update the existing order
-                update_data = {
-                    "status": order.status.value,
-                    "updated_at": order.updated_at,
-                    "filled_at": order.filled_at,
-                    "cancelled_at": order.cancelled_at,
-                    "take_profit": tp_data,
-                    "stop_loss": sl_data,
-                    "partial_take_profits": partial_tp_data,
-                    "trailing_stop_loss": tsl_data,
-                    "metadata.last_checked": datetime.utcnow(),
-                    "metadata.check_count": existing_order.get("metadata", {}).get("check_count", 0) + 1
-                }
-                
-                result = await self.orders.update_one(
-                    {"order_id": order.order_id},
-                    {"$set": update_data}
-                )
-                
-                return str(existing_order["_id"])
-                
-            # If order doesn't exist, proceed with insertion as before
-            # Ensure order_type is converted to string value if it's an enum
+            now = datetime.utcnow()
             order_type_value = order.order_type.value if isinstance(order.order_type, OrderType) else str(order.order_type)
             
-            # Serialize take profit data if present
-            tp_data = None
-            if order.take_profit:
-                tp_data = {
-                    "price": str(order.take_profit.price),
-                    "percentage": order.take_profit.percentage,
-                    "status": order.take_profit.status.value,
-                    "triggered_at": order.take_profit.triggered_at,
-                    "order_id": order.take_profit.order_id
-                }
-
-            # Serialize stop loss data if present
-            sl_data = None
-            if order.stop_loss:
-                sl_data = {
-                    "price": str(order.stop_loss.price),
-                    "percentage": order.stop_loss.percentage,
-                    "status": order.stop_loss.status.value,
-                    "triggered_at": order.stop_loss.triggered_at,
-                    "order_id": order.stop_loss.order_id
-                }
-                
-            # Serialize partial take profits data if present
-            partial_tp_data = []
-            if hasattr(order, 'partial_take_profits') and order.partial_take_profits:
-                for ptp in order.partial_take_profits:
-                    partial_tp_data.append({
-                        "level": ptp.level,
-                        "price": str(ptp.price),
-                        "profit_percentage": ptp.profit_percentage,
-                        "position_percentage": ptp.position_percentage,
-                        "status": ptp.status.value,
-                        "triggered_at": ptp.triggered_at,
-                        "order_id": ptp.order_id
-                    })
+            # Fields that change over the life of an order
+            update_data = {
+                "status": order.status.value,
+                "updated_at": now,
+                "filled_at": order.filled_at,
+                "cancelled_at": order.cancelled_at,
+                "take_profit": _serialize_tp_sl(order.take_profit),
+                "stop_loss": _serialize_tp_sl(order.stop_loss),
+                "partial_take_profits": _serialize_partial_take_profits(getattr(order, 'partial_take_profits', None)),
+                "trailing_stop_loss": _serialize_trailing_stop_loss(getattr(order, 'trailing_stop_loss', None)),
+                "metadata.last_checked": now
+            }
             
-            # Serialize trailing stop loss data if present
-            tsl_data = None
-            if hasattr(order, 'trailing_stop_loss') and order.trailing_stop_loss:
-                tsl = order.trailing_stop_loss
-                tsl_data = {
-                    "activation_percentage": tsl.activation_percentage,
-                    "callback_rate": tsl.callback_rate,
-                    "initial_price": str(tsl.initial_price),
-                    "activation_price": str(tsl.activation_price),
-                    "current_stop_price": str(tsl.current_stop_price),
-                    "highest_price": str(tsl.highest_price),
-                    "status": tsl.status.value,
-                    "triggered_at": tsl.triggered_at,
-                    "activated_at": tsl.activated_at,
-                    "order_id": tsl.order_id
-                }
-
-            order_dict = {
+            # Fields written only when the order is first stored
+            insert_data = {
                 "symbol": order.symbol,
-                "status": order.status.value,
-                "order_type": order_type_value,  # Use the converted value
-                "price": str(order.price),
-                "quantity": str(order.quantity),
+                "order_type": order_type_value,
+                "price": _to_decimal128(order.price),
+                "quantity": _to_decimal128(order.quantity),
                 "threshold": float(order.threshold) if order.threshold else None,
                 "timeframe": order.timeframe.value,
                 "order_id": order.order_id,
                 "created_at": order.created_at,
-                "updated_at": order.updated_at,
-                "fees": str(order.fees),
+                "fees": _to_decimal128(order.fees),
                 "fee_asset": order.fee_asset,
                 "is_manual": bool(order.is_manual),
-                "filled_at": order.filled_at,
-                "cancelled_at": order.cancelled_at,
-                "take_profit": tp_data,
-                "stop_loss": sl_data,
-                "partial_take_profits": partial_tp_data,
-                "trailing_stop_loss": tsl_data,
-                "metadata": {
-                    "inserted_at": datetime.utcnow(),
-                    "last_checked": datetime.utcnow(),
-                    "check_count": 0,
-                    "error_count": 0
-                }
+                "schema_version": ORDER_SCHEMA_VERSION,
+                "metadata.inserted_at": now,
+                "metadata.error_count": 0
             }
             
-            result = await self.orders.insert_one(order_dict)
-            return str(result.inserted_id)
+            # One round trip for both a new and an existing order
+            result = await self.orders.find_one_and_update(
+                {"order_id": order.order_id},
+                {
+                    "$set": update_data,
+                    "$setOnInsert": insert_data,
+                    "$inc": {"metadata.check_count": 1}
+                },
+                projection=INDEX_PROJECTION,
+                upsert=True,
+                return_document=pymongo.ReturnDocument.AFTER
+            )
+            if not result:
+                return None
+            self._index_order(result)
+            return str(result["_id"])
             
         except Exception as e:
             logger.error(f"Failed to insert order: {e}")
@@ -359,16 +474,17 @@ class MongoClient:
                 "symbol": order.symbol,
                 "status": OrderStatus.FILLED.value,  # Always FILLED for manual trades
                 "order_type": order.order_type.value,
-                "price": str(order.price),
-                "quantity": str(order.quantity),
+                "price": _to_decimal128(order.price),
+                "quantity": _to_decimal128(order.quantity),
                 "timeframe": order.timeframe.value,
                 "order_id": order.order_id,
                 "created_at": order.created_at,
                 "updated_at": order.updated_at,
                 "filled_at": order.filled_at,
-                "fees": str(order.fees),
+                "fees": _to_decimal128(order.fees),
                 "fee_asset": order.fee_asset,
                 "threshold": "Manual",  # Add manual threshold marker
+                "schema_version": ORDER_SCHEMA_VERSION,
             }
             
             # Add futures-specific fields if applicable
@@ -379,6 +495,8 @@ class MongoClient:
                 })
             
             result = await self.orders.insert_one(order_dict)
+            self._index_order({**order_dict, "_id": result.inserted_id})
+            await self.add_filled_order_to_totals(order)
             return str(result.inserted_id)
             
         except Exception as e:
@@ -387,7 +505,9 @@ class MongoClient:
 
     async def update_order_status(self, order_id: str, status: OrderStatus, 
                                 filled_at: Optional[datetime] = None,
-                                cancelled_at: Optional[datetime] = None) -> bool:
+                                cancelled_at: Optional[datetime] = None,
+                                expected_status: Optional[OrderStatus] = None) -> bool:
+        """Update order status, optionally only if it is still in expected_status"""
         update_dict = {
             "status": status.value,
             "updated_at": datetime.utcnow()
@@ -397,18 +517,98 @@ class MongoClient:
         if cancelled_at:
             update_dict["cancelled_at"] = cancelled_at
 
-        result = await self.orders.update_one(
-            {"order_id": order_id},
-            {"$set": update_dict}
+        filter_dict = {"order_id": order_id}
+        if expected_status:
+            filter_dict["status"] = expected_status.value
+
+        return await self._update_indexed_order(filter_dict, {"$set": update_dict})
+
+    async def start_change_watcher(self):
+        """Mirror open orders, trading symbols and settings in memory, kept current by a change stream"""
+        self.order_index = OrderIndex(self.orders)
+        self.symbols_cache = CollectionCache(self.trading_symbols)
+        self.config_cache = CollectionCache(self.trading_config)
+        self.watcher = ChangeWatcher(self.db, [self.order_index, self.symbols_cache, self.config_cache])
+        await self.watcher.start()
+
+    async def stop_change_watcher(self):
+        if self.watcher:
+            await self.watcher.stop()
+
+    def _cache_ready(self, cache: Optional[CollectionCache]) -> bool:
+        """Whether reads can be served from cache instead of MongoDB"""
+        return cache is not None and self.watcher is not None and self.watcher.ready
+
+    def _index_order(self, doc: dict):
+        """Write an order document just stored through to the order index"""
+        if self.order_index is not None:
+            self.order_index.put(doc)
+
+    async def _update_indexed_order(self, filter_dict: dict, update: dict) -> bool:
+        """Update one order and write the result through to the order index"""
+        doc = await self.orders.find_one_and_update(
+            filter_dict, update,
+            projection=INDEX_PROJECTION,
+            return_document=pymongo.ReturnDocument.AFTER
         )
-        return result.modified_count > 0
+        if doc is None:
+            return False
+        self._index_order(doc)
+        return True
+
+    def _decode_all(self, docs: List[dict]) -> List[Order]:
+        return [order for order in map(self._document_to_order, docs) if order]
+
+    async def count_orders(self, status: OrderStatus) -> int:
+        """Number of orders in status, from the order index for pending ones
+
+        Filled orders move to orders_archive once closed, so only pending
+        orders are all in the index; the rest are counted over the history.
+        """
+        if status == OrderStatus.PENDING and self._cache_ready(self.order_index):
+            return self.order_index.count(status)
+        return await self.count_order_history({"status": status.value})
+
+    async def count_pending_orders(self) -> int:
+        """Number of pending orders"""
+        return await self.count_orders(OrderStatus.PENDING)
+
+    async def get_recent_orders(self, limit: int = 5) -> List[Order]:
+        """The newest orders by creation time"""
+        try:
+            if self._cache_ready(self.order_index):
+                docs = self.order_index.recent_orders(limit)
+                if docs is not None:
+                    return self._decode_all(docs)
+            docs = await self.orders.find({}, ORDER_PROJECTION).sort("created_at", -1).limit(limit).to_list(limit)
+            return self._decode_all(docs)
+        except Exception as e:
+            logger.error(f"Error retrieving recent orders: {e}")
+            return []
+
+    async def get_order(self, order_id: str) -> Optional[Order]:
+        """Get a single order by its exchange order ID"""
+        try:
+            if self._cache_ready(self.order_index):
+                doc = self.order_index.get(str(order_id))
+                if doc is not None:
+                    return self._document_to_order(doc)
+            doc = await self.orders.find_one({"order_id": str(order_id)}, ORDER_PROJECTION)
+            return self._document_to_order(doc) if doc else None
+        except Exception as e:
+            logger.error(f"Error retrieving order {order_id}: {e}")
+            return None
 
     async def get_pending_orders(self) -> List[Order]:
         """Get all pending orders from database"""
         try:
+            if self._cache_ready(self.order_index):
+                docs = sorted(self.order_index.with_status(OrderStatus.PENDING), key=lambda doc: doc["created_at"])
+                return self._decode_all(docs)
+                
             # Convert the find cursor to a list using to_list
             docs = await self.orders.find(
-                {"status": OrderStatus.PENDING.value}
+                {"status": OrderStatus.PENDING.value}, ORDER_PROJECTION
             ).sort("created_at", 1).to_list(None)
             
             # Convert documents to Order objects
@@ -425,12 +625,14 @@ class MongoClient:
                 {"$group": {
                     "_id": None,
                     "total_orders": {"$sum": 1},
-                    "total_volume": {"$sum": {"$multiply": ["$price", "$quantity"]}},
-                    "average_price": {"$avg": "$price"}
+                    "total_volume": {"$sum": {"$toDouble": {
+                        "$multiply": [self._order_number("price"), self._order_number("quantity")]
+                    }}},
+                    "average_price": {"$avg": {"$toDouble": self._order_number("price")}}
                 }}
             ]
             
-            result = await self._execute_aggregate(self.orders, pipeline)
+            result = await self.aggregate_order_history(pipeline)
             
             if result and len(result) > 0:
                 return result[0]
@@ -449,12 +651,12 @@ class MongoClient:
             {"$match": match_stage},
             {"$group": {
                 "_id": "$symbol",
-                "total_quantity": {"$sum": {"$toDecimal": "$quantity"}},
+                "total_quantity": {"$sum": self._order_number("quantity")},
                 "total_cost": {
                     "$sum": {
                         "$multiply": [
-                            {"$toDecimal": "$quantity"},
-                            {"$toDecimal": "$price"}
+                            self._order_number("quantity"),
+                            self._order_number("price")
                         ]
                     }
                 },
@@ -497,7 +699,10 @@ class MongoClient:
     def calculate_profit_loss(self, position: dict, current_price: Decimal) -> dict:
         """Calculate profit/loss for a position including fees"""
         current_value = position["total_quantity"] * current_price
-        total_fees = sum(Decimal(str(order.get('fees', 0))) for order in position['orders'])
+        if "total_fees" in position:
+            total_fees = position["total_fees"]
+        else:
+            total_fees = sum(Decimal(str(order.get('fees', 0))) for order in position['orders'])
         
         # Include fees in profit calculation
         absolute_pl = current_value - position["total_cost"] - total_fees
@@ -544,99 +749,18 @@ class MongoClient:
 
     def _document_to_order(self, doc: dict) -> Optional[Order]:
         """Convert a MongoDB document to an Order object"""
-        try:
-            # Handle order_type conversion
-            order_type_str = doc.get("order_type")
-            try:
-                # Try to convert to enum
-                order_type = OrderType(order_type_str)
-            except (ValueError, TypeError):
-                # Fallback to default if conversion fails
-                logger.warning(f"Invalid order_type '{order_type_str}', defaulting to 'spot'")
-                order_type = OrderType.SPOT
-
-            # Create the base Order object
-            order = Order(
-                symbol=doc["symbol"],
-                status=OrderStatus(doc["status"]),
-                order_type=order_type,  # Use the converted order_type
-                price=Decimal(str(doc["price"])),
-                quantity=Decimal(str(doc["quantity"])),
-                timeframe=TimeFrame(doc["timeframe"]),
-                order_id=doc["order_id"],
-                created_at=doc["created_at"],
-                updated_at=doc["updated_at"],
-                leverage=doc.get("leverage"),
-                direction=TradeDirection(doc["direction"]) if doc.get("direction") else None,
-                filled_at=doc.get("filled_at"),
-                cancelled_at=doc.get("cancelled_at"),
-                fees=Decimal(str(doc.get("fees", 0))),
-                fee_asset=doc.get("fee_asset"),
-                threshold=doc.get("threshold"),
-                is_manual=doc.get("is_manual", False)
-            )
-
-            # Process take profit if exists
-            if "take_profit" in doc and doc["take_profit"]:
-                tp_data = doc["take_profit"]
-                order.take_profit = TakeProfit(
-                    price=Decimal(str(tp_data["price"])),
-                    percentage=float(tp_data["percentage"]),
-                    status=TPSLStatus(tp_data["status"]),
-                    triggered_at=tp_data.get("triggered_at"),
-                    order_id=tp_data.get("order_id")
-                )
-
-            # Process stop loss if exists
-            if "stop_loss" in doc and doc["stop_loss"]:
-                sl_data = doc["stop_loss"]
-                order.stop_loss = StopLoss(
-                    price=Decimal(str(sl_data["price"])),
-                    percentage=float(sl_data["percentage"]),
-                    status=TPSLStatus(sl_data["status"]),
-                    triggered_at=sl_data.get("triggered_at"),
-                    order_id=sl_data.get("order_id")
-                )
-
-            # Process partial take profits if exist
-            if "partial_take_profits" in doc and doc["partial_take_profits"]:
-                for tp_data in doc["partial_take_profits"]:
-                    partial_tp = PartialTakeProfit(
-                        level=int(tp_data["level"]),
-                        price=Decimal(str(tp_data["price"])),
-                        profit_percentage=float(tp_data["profit_percentage"]),
-                        position_percentage=float(tp_data["position_percentage"]),
-                        status=TPSLStatus(tp_data["status"]),
-                        triggered_at=tp_data.get("triggered_at"),
-                        order_id=tp_data.get("order_id")
-                    )
-                    order.partial_take_profits.append(partial_tp)
-                    
-            # Process trailing stop loss if exists
-            if "trailing_stop_loss" in doc and doc["trailing_stop_loss"]:
-                tsl_data = doc["trailing_stop_loss"]
-                order.trailing_stop_loss = TrailingStopLoss(
-                    activation_percentage=float(tsl_data["activation_percentage"]),
-                    callback_rate=float(tsl_data["callback_rate"]),
-                    initial_price=Decimal(str(tsl_data["initial_price"])),
-                    activation_price=Decimal(str(tsl_data["activation_price"])),
-                    current_stop_price=Decimal(str(tsl_data["current_stop_price"])),
-                    highest_price=Decimal(str(tsl_data["highest_price"])),
-                    status=TPSLStatus(tsl_data["status"]),
-                    triggered_at=tsl_data.get("triggered_at"),
-                    activated_at=tsl_data.get("activated_at"),
-                    order_id=tsl_data.get("order_id")
-                )
-
-            return order
-        except Exception as e:
-            logger.error(f"Error converting document to Order: {e}")
-            return None
+        return decode_order(doc)
 
     async def cleanup_stale_orders(self, hours: int = 24) -> int:
         """Cleanup orders that have been pending for too long"""
         try:
-            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+            now = datetime.utcnow()
+            cutoff_time = now - timedelta(hours=hours)
+            cancel = {
+                "status": OrderStatus.CANCELLED.value,
+                "cancelled_at": now,
+                "updated_at": now
+            }
             
             # Find stale pending orders
             result = await self.orders.update_many(
@@ -644,14 +768,14 @@ class MongoClient:
                     "status": OrderStatus.PENDING.value,
                     "created_at": {"$lt": cutoff_time}
                 },
-                {
-                    "$set": {
-                        "status": OrderStatus.CANCELLED.value,
-                        "cancelled_at": datetime.utcnow()
-                    }
-                }
+                {"$set": cancel}
             )
             
+            if self.order_index is not None:
+                for doc in self.order_index.with_status(OrderStatus.PENDING):
+                    if doc["created_at"] < cutoff_time:
+                        self.order_index.update(doc["order_id"], cancel)
+            
             count = result.modified_count
             if count > 0:
                 logger.info(f"Cleaned up {count} stale orders")
@@ -661,108 +785,275 @@ class MongoClient:
             logger.error(f"Error cleaning up stale orders: {e}")
             return 0
 
-    async def get_visualization_data(self, viz_type: str, days: int = 30) -> List[Dict]:
-        """Get data for visualizations"""
-        try:
-            cutoff = datetime.utcnow() - timedelta(days=days)
-            
-            if viz_type == "daily_volume":
-                pipeline = [
-                    {"$match": {
-                        "created_at": {"$gte": cutoff},
-                        "status": OrderStatus.FILLED.value
-                    }},
-                    {"$group": {
-                        "_id": {
-                            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
-                            "symbol": "$symbol"
-                        },
-                        "volume": {
-                            "$sum": {
-                                "$toDouble": {  # Convert to double before multiplication
-                                    "$multiply": [
-                                        {"$toDouble": "$price"},  # Convert price to double
-                                        {"$toDouble": "$quantity"}  # Convert quantity to double
-                                    ]
-                                }
-                            }
-                        },
-                        "count": {"$sum": 1}
-                    }},
-                    {"$sort": {"_id.date": 1}}
-                ]
-            
-            elif viz_type == "profit_distribution":
-                pipeline = [
-                    {"$match": {"status": OrderStatus.FILLED.value}},
-                    {"$group": {
-                        "_id": "$symbol",
-                        "total_profit": {
-                            "$sum": {"$toDouble": "$profit"}  # Convert profit to double
-                        },
-                        "avg_profit": {
-                            "$avg": {"$toDouble": "$profit"}  # Convert profit to double
-                        },
-                        "count": {"$sum": 1}
-                    }}
-                ]
-            
-            elif viz_type == "order_types":
-                pipeline = [
-                    {"$match": {"created_at": {"$gte": cutoff}}},
-                    {"$group": {
-                        "_id": {
-                            "type": "$order_type",
-                            "status": "$status"
-                        },
-                        "count": {"$sum": 1}
-                    }}
-                ]
-            
-            elif viz_type == "hourly_activity":
-                pipeline = [
-                    {"$match": {"created_at": {"$gte": cutoff}}},
-                    {"$group": {
-                        "_id": {
-                            "hour": {"$hour": "$created_at"},
-                            "status": "$status"
-                        },
-                        "count": {"$sum": 1}
-                    }},
-                    {"$sort": {"_id.hour": 1}}
-                ]
+    async def refresh_order_views(self) -> int:
+        """Bring the /viz views up to date, recomputing only days with orders changed since the last refresh
+
+        Returns the number of days recomputed, -1 for a full rebuild.
+        """
+        async with self._order_views_lock:
+            specs = view_specs(self._order_number)
+            started = datetime.utcnow()
+            state = await self.analytics_state.find_one({"_id": ORDER_VIEWS_STATE_ID})
+            
+            if state is None:
+                # First run, build every view from all orders
+                for spec in specs.values():
+                    await self.db[spec["collection"]].delete_many({})
+                    await self.orders.aggregate(_union_archive(refresh_pipeline(spec, None))).to_list(None)
+                touched = -1
             else:
+                # created_at days of orders written since the last refresh
+                since = state["refreshed_at"] - _ORDER_VIEWS_OVERLAP
+                days = [doc["_id"] async for doc in self.orders.aggregate([
+                    {"$match": {"updated_at": {"$gt": since}}},
+                    {"$group": {"_id": {"$dateTrunc": {"date": "$created_at", "unit": "day"}}}}
+                ])]
+                days = [day for day in days if day is not None]
+                for spec in specs.values():
+                    if not days:
+                        break
+                    # Groups that no longer have orders would otherwise survive the $merge
+                    await self.db[spec["collection"]].delete_many({"_id.date": {"$in": days}})
+                    await self.orders.aggregate(_union_archive(refresh_pipeline(spec, days))).to_list(None)
+                touched = len(days)
+            
+            await self.analytics_state.update_one(
+                {"_id": ORDER_VIEWS_STATE_ID}, {"$set": {"refreshed_at": started}}, upsert=True
+            )
+            if touched:
+                logger.debug(f"Refreshed /viz views, {'all' if touched < 0 else touched} days recomputed")
+            return touched
+
+    async def start_order_views(self):
+        """Refresh the /viz order views now and then periodically"""
+        self.views_job = OrderViewsJob(self)
+        await self.views_job.start()
+
+    async def stop_order_views(self):
+        if self.views_job:
+            await self.views_job.stop()
+
+    async def get_visualization_data(self, viz_type: str, days: int = 30,
+                                     allowed_symbols: set = None) -> List[Dict]:
+        """Get data for visualizations from the order views kept current by OrderViewsJob"""
+        try:
+            specs = view_specs(self._order_number)
+            if viz_type not in specs:
                 raise ValueError(f"Unknown visualization type: {viz_type}")
-
-            results = []
-            async for doc in self.orders.aggregate(pipeline):
-                # Convert all numeric values to float
-                if 'volume' in doc:
-                    doc['volume'] = float(doc['volume'])
-                if 'total_profit' in doc:
-                    doc['total_profit'] = float(doc['total_profit'])
-                if 'avg_profit' in doc:
-                    doc['avg_profit'] = float(doc['avg_profit'])
-                results.append(doc)
-            return results
+            cutoff = (datetime.utcnow() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+            view = self.db[specs[viz_type]["collection"]]
+            return await view.aggregate(read_pipeline(viz_type, cutoff, allowed_symbols)).to_list(None)
 
         except Exception as e:
             logger.error(f"Error getting visualization data: {e}")
             return []
 
+    async def aggregate_order_history(self, pipeline: list) -> List[dict]:
+        """Run an analytics pipeline over orders and orders_archive together
+
+        Trading code queries self.orders directly and never sees archived orders.
+        """
+        return await self._execute_aggregate(self.orders, _union_archive(pipeline))
+
+    async def count_order_history(self, query: dict) -> int:
+        """count_documents over orders and orders_archive"""
+        hot = await self.orders.count_documents(query)
+        return hot + await self.orders_archive.count_documents(query)
+
+    def _archivable_orders_query(self, cutoff: datetime) -> dict:
+        """Closed orders last updated before cutoff: cancelled, or filled and fully exited by TP/SL"""
+        pending, triggered = TPSLStatus.PENDING.value, TPSLStatus.TRIGGERED.value
+        # Partial take profits that sold the whole position between them
+        partials_sold = {"$sum": {"$map": {
+            "input": {"$filter": {
+                "input": {"$ifNull": ["$partial_take_profits", []]},
+                "as": "ptp",
+                "cond": {"$eq": ["$$ptp.status", triggered]}
+            }},
+            "as": "ptp",
+            "in": "$$ptp.position_percentage"
+        }}}
+        return {
+            "updated_at": {"$lt": cutoff},
+            # Strings are converted by the Decimal128 migration first, pipelines assume one type per field
+            "schema_version": ORDER_SCHEMA_VERSION,
+            "$or": [
+                {"status": OrderStatus.CANCELLED.value},
+                {
+                    "status": OrderStatus.FILLED.value,
+                    "take_profit.status": {"$ne": pending},
+                    "stop_loss.status": {"$ne": pending},
+                    "trailing_stop_loss.status": {"$ne": pending},
+                    "partial_take_profits.status": {"$ne": pending},
+                    "$or": [
+                        {"take_profit.status": triggered},
+                        {"stop_loss.status": triggered},
+                        {"trailing_stop_loss.status": triggered},
+                        {"$expr": {"$gte": [partials_sold, 100]}}
+                    ]
+                }
+            ]
+        }
+
+    async def archive_orders(self, older_than_days: int = ORDER_ARCHIVE_AFTER_DAYS,
+                             batch_size: int = ORDER_ARCHIVE_BATCH_SIZE) -> int:
+        """Move closed orders older than older_than_days from orders to orders_archive, in batches
+
+        Each batch is copied before it is deleted, and an order changed in
+        between stays in orders, so history queries never miss an order.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        query = self._archivable_orders_query(cutoff)
+        moved = 0
+        last_id = None
+        while True:
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            docs = await self.orders.find(query).sort("_id", 1).to_list(length=batch_size)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            
+            await self.orders_archive.bulk_write([
+                pymongo.ReplaceOne({"order_id": doc["order_id"]}, doc, upsert=True) for doc in docs
+            ], ordered=False)
+            # Only if unchanged since it was read
+            result = await self.orders.bulk_write([
+                pymongo.DeleteOne({"_id": doc["_id"], "updated_at": doc["updated_at"]}) for doc in docs
+            ], ordered=False)
+            moved += result.deleted_count
+            
+            if result.deleted_count < len(docs):
+                # Changed while copying, the copy in orders_archive is outdated
+                ids = [doc["_id"] for doc in docs]
+                kept = await self.orders.find({"_id": {"$in": ids}}, {"_id": 1}).to_list(None)
+                kept_ids = {doc["_id"] for doc in kept}
+                await self.orders_archive.delete_many({"_id": {"$in": list(kept_ids)}})
+                ids = [doc_id for doc_id in ids if doc_id not in kept_ids]
+            else:
+                ids = [doc["_id"] for doc in docs]
+            
+            if self.order_index is not None:
+                for doc_id in ids:
+                    self.order_index.delete(doc_id)
+        
+        if moved:
+            logger.info(f"Archived {moved} closed orders older than {older_than_days} days")
+        return moved
+
+    async def start_order_archive(self, older_than_days: Optional[int] = None):
+        """Archive old closed orders now and then periodically"""
+        self.archive_job = OrderArchiveJob(self, older_than_days or ORDER_ARCHIVE_AFTER_DAYS)
+        await self.archive_job.start()
+
+    async def stop_order_archive(self):
+        if self.archive_job:
+            await self.archive_job.stop()
+
+    async def init_balance_history(self):
+        """Create balance_history as a time series collection, converting an older regular one
+
+        Servers before MongoDB 5.0 have no time series and keep the regular collection.
+        """
+        try:
+            names = await self.db.list_collection_names()
+            server = await self.client.server_info()
+            if tuple(server.get("versionArray", [0, 0])[:2]) < (5, 0):
+                if "balance_history_legacy" in names and "balance_history" not in names:
+                    # Left renamed by an earlier failed conversion
+                    await self.db.balance_history_legacy.rename("balance_history")
+                logger.warning(f"MongoDB {server.get('version')} has no time series collections, "
+                               f"keeping balance_history as a regular collection")
+                return
+            
+            if "balance_history" in names:
+                result = await self.db.command("listCollections", filter={"name": "balance_history"})
+                info = result["cursor"]["firstBatch"]
+                if info and info[0].get("type") == "timeseries":
+                    if "balance_history_legacy" in names:
+                        await self._copy_legacy_balance_history()
+                    return
+                if "balance_history_legacy" in names:
+                    logger.warning("Both balance_history and balance_history_legacy exist as regular "
+                                   "collections, keeping balance_history as it is")
+                    return
+                # String fields from before the time series, copied over below
+                await self.balance_history.rename("balance_history_legacy")
+            
+            try:
+                await self.db.create_collection(
+                    "balance_history",
+                    timeseries={"timeField": "timestamp", "granularity": "hours"}
+                )
+            except Exception:
+                # Put the snapshots back rather than leave balance_history missing
+                if "balance_history" in names or "balance_history_legacy" in names:
+                    await self.db.balance_history_legacy.rename("balance_history")
+                raise
+            logger.info("Created balance_history time series collection")
+            if "balance_history" in names or "balance_history_legacy" in names:
+                await self._copy_legacy_balance_history()
+        except Exception as e:
+            logger.error(f"Failed to set up balance_history time series: {e}")
+
+    async def _copy_legacy_balance_history(self):
+        """Copy snapshots from balance_history_legacy with numeric fields, resuming after the last copied one
+
+        Progress is kept in analytics_state by legacy _id, snapshots recorded
+        into the time series meanwhile do not move it.
+        """
+        legacy = self.db.balance_history_legacy
+        state = await self.analytics_state.find_one({"_id": BALANCE_COPY_STATE_ID})
+        last_id = state["last_id"] if state else None
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        
+        copied = 0
+        batch = []
+        async for doc in legacy.find(query).sort("_id", 1):
+            batch.append(doc)
+            if len(batch) >= _BALANCE_COPY_BATCH:
+                last_id = await self._copy_balance_batch(batch)
+                copied += len(batch)
+                batch = []
+        if batch:
+            last_id = await self._copy_balance_batch(batch)
+            copied += len(batch)
+        
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        if await legacy.count_documents(query, limit=1):
+            logger.warning("balance_history_legacy still has snapshots left to copy, keeping the old collection")
+            return
+        await legacy.drop()
+        await self.analytics_state.delete_one({"_id": BALANCE_COPY_STATE_ID})
+        logger.info(f"Converted balance_history to a time series, {copied} snapshots copied")
+
+    async def _copy_balance_batch(self, batch: List[dict]):
+        """Insert legacy snapshots into the time series and move the copy marker past them"""
+        await self.balance_history.insert_many([{
+            "timestamp": doc["timestamp"],
+            **{field: _balance_number(doc.get(field)) for field in _BALANCE_FIELDS}
+        } for doc in batch])
+        last_id = batch[-1]["_id"]
+        await self.analytics_state.update_one(
+            {"_id": BALANCE_COPY_STATE_ID}, {"$set": {"last_id": last_id}}, upsert=True
+        )
+        return last_id
+
     async def record_balance(self, timestamp=None, balance=None, invested=None, fees=None):
         """Record balance snapshot for historical tracking"""
         timestamp = timestamp or datetime.now()
         
-        # Get net deposits since the last snapshot
-        net_deposits = await self._get_net_deposits_since_last_snapshot(timestamp)
+        # Get net deposits since the last snapshot from the running totals
+        totals = await self.get_portfolio_totals()
+        net_deposits = await self._get_net_deposits_since_last_snapshot(timestamp, totals["net_deposits"])
         
         document = {
             "timestamp": timestamp,
-            "balance": str(balance) if balance is not None else "0",
-            "invested": str(invested) if invested is not None else "0",
-            "fees": str(fees) if fees is not None else "0",
-            "net_deposits": str(net_deposits) if net_deposits is not None else "0"
+            "balance": _balance_number(balance),
+            "invested": _balance_number(invested),
+            "fees": _balance_number(fees),
+            "net_deposits": _balance_number(net_deposits),
+            "total_net_deposits": _balance_number(totals["net_deposits"])
         }
 
         try:
@@ -772,26 +1063,82 @@ class MongoClient:
             logger.error(f"Error recording balance: {e}")
             return False
 
+    def _balance_rollup_pipeline(self, resolution: str, since: Optional[datetime]) -> list:
+        """Aggregate snapshots from since into resolution buckets and $merge them into balance_rollups"""
+        unit, _ = BALANCE_ROLLUPS[resolution]
+        bucket = {"date": "$timestamp", "unit": unit}
+        if unit == "week":
+            bucket["startOfWeek"] = "monday"
+        pipeline = [{"$match": {"timestamp": {"$gte": since}}}] if since else []
+        return pipeline + [
+            {"$sort": {"timestamp": 1}},
+            {"$group": {
+                "_id": {"$dateTrunc": bucket},
+                # Balances are levels, the bucket keeps its last one; deposits are changes and add up
+                "balance": {"$last": "$balance"},
+                "invested": {"$last": "$invested"},
+                "fees": {"$last": "$fees"},
+                "total_net_deposits": {"$last": "$total_net_deposits"},
+                "net_deposits": {"$sum": "$net_deposits"},
+                "samples": {"$sum": 1},
+                "last_sample_at": {"$max": "$timestamp"}
+            }},
+            {"$project": {
+                "_id": 0, "resolution": {"$literal": resolution}, "timestamp": "$_id",
+                "balance": 1, "invested": 1, "fees": 1, "total_net_deposits": 1,
+                "net_deposits": 1, "samples": 1, "last_sample_at": 1
+            }},
+            {"$merge": {
+                "into": "balance_rollups",
+                "on": ["resolution", "timestamp"],
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }}
+        ]
+
+    async def rollup_balance_history(self):
+        """Rebuild the daily and weekly buckets from the newest existing one onwards"""
+        for resolution in BALANCE_ROLLUPS:
+            # The newest bucket may have been partial when it was last rolled up
+            latest = await self.balance_rollups.find_one(
+                {"resolution": resolution}, {"timestamp": 1}, sort=[("timestamp", pymongo.DESCENDING)]
+            )
+            since = latest["timestamp"] if latest else None
+            await self.balance_history.aggregate(self._balance_rollup_pipeline(resolution, since)).to_list(None)
+        logger.debug("Balance history rollups refreshed")
+
+    async def start_balance_rollups(self):
+        """Refresh the balance history rollups now and then periodically"""
+        self.rollup_job = BalanceRollupJob(self)
+        await self.rollup_job.start()
+
+    async def stop_balance_rollups(self):
+        if self.rollup_job:
+            await self.rollup_job.stop()
+
     async def get_balance_history(self, days: int = 30) -> List[Dict]:
-        """Get balance history for the specified number of days"""
+        """Get balance history for the specified number of days
+
+        Uses the coarsest rollup that still gives BALANCE_CHART_MIN_POINTS
+        points, and the raw hourly snapshots for short ranges.
+        """
         try:
             cutoff = datetime.utcnow() - timedelta(days=days)
-            cursor = self.balance_history.find(
-                {"timestamp": {"$gte": cutoff}}
-            ).sort("timestamp", 1)
-            
-            # Convert decimal strings to Decimal objects for all records
-            result = []
-            async for doc in cursor:
-                result.append({
-                    "timestamp": doc["timestamp"],
-                    "balance": Decimal(doc["balance"]),
-                    "invested": Decimal(doc["invested"]) if doc.get("invested") else None,
-                    "fees": Decimal(doc["fees"]) if doc.get("fees") else Decimal('0'),
-                    "net_deposits": Decimal(doc.get("net_deposits", "0"))
-                })
-                
-            return result
+            for resolution, (_, bucket_days) in BALANCE_ROLLUPS.items():
+                if days / bucket_days < BALANCE_CHART_MIN_POINTS:
+                    continue
+                docs = await self.balance_rollups.find(
+                    {"resolution": resolution, "timestamp": {"$gte": cutoff - timedelta(days=bucket_days)}},
+                    _BALANCE_PROJECTION
+                ).sort("timestamp", 1).to_list(None)
+                # Before the first rollup has run, read the snapshots instead
+                if len(docs) >= 2:
+                    return [_balance_row(doc) for doc in docs]
+            
+            docs = await self.balance_history.find(
+                {"timestamp": {"$gte": cutoff}}, _BALANCE_PROJECTION
+            ).sort("timestamp", 1).to_list(None)
+            return [_balance_row(doc) for doc in docs]
             
         except Exception as e:
             logger.error(f"Error getting balance history: {e}")
@@ -801,19 +1148,22 @@ class MongoClient:
         """Get all buy orders in the specified period"""
         try:
             cutoff = datetime.utcnow() - timedelta(days=days)
-            cursor = self.orders.find({
-                "status": OrderStatus.FILLED.value,
-                "filled_at": {"$gte": cutoff}
-            }).sort("filled_at", 1)
+            docs = await self.aggregate_order_history([
+                {"$match": {
+                    "status": OrderStatus.FILLED.value,
+                    "filled_at": {"$gte": cutoff}
+                }},
+                {"$sort": {"filled_at": 1}}
+            ])
             
             results = []
-            async for doc in cursor:
+            for doc in docs:
                 try:
                     results.append({
                         "timestamp": doc["filled_at"] if doc.get("filled_at") else doc["created_at"],
                         "symbol": doc["symbol"],
-                        "price": Decimal(doc["price"]),
-                        "quantity": Decimal(doc["quantity"]),
+                        "price": to_decimal(doc["price"]),
+                        "quantity": to_decimal(doc["quantity"]),
                         "order_id": doc["order_id"]
                     })
                 except (KeyError, ValueError, InvalidOperation) as e:  # Changed from DecimalException to InvalidOperation
@@ -861,6 +1211,33 @@ class MongoClient:
             logger.error(f"Failed to save threshold state: {e}", exc_info=True)
             return False
             
+    async def save_threshold_states(self, states: Dict[tuple, list]) -> bool:
+        """Write many (symbol, timeframe) -> thresholds states with one bulk_write"""
+        if not states:
+            return True
+        try:
+            now = datetime.utcnow()
+            operations = []
+            for (symbol, timeframe), thresholds in states.items():
+                key = {"symbol": symbol, "timeframe": timeframe}
+                if not thresholds:
+                    # Empty state is stored as no document, like save_triggered_threshold
+                    operations.append(pymongo.DeleteOne(key))
+                else:
+                    operations.append(pymongo.UpdateOne(key, {"$set": {
+                        "symbol": symbol,
+                        "timeframe": timeframe,
+                        "thresholds": [float(t) for t in thresholds],
+                        "updated_at": now
+                    }}, upsert=True))
+            result = await self.threshold_state.bulk_write(operations, ordered=False)
+            logger.debug(f"Flushed {len(operations)} threshold states "
+                         f"(upserted: {result.upserted_count}, modified: {result.modified_count}, deleted: {result.deleted_count})")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to bulk save threshold states: {e}", exc_info=True)
+            return False
+
     async def check_triggered_threshold(self, symbol: str, timeframe: str, threshold: float) -> bool:
         """Check if a specific threshold is already triggered for a symbol/timeframe"""
         try:
@@ -878,6 +1255,21 @@ class MongoClient:
             logger.error(f"Error checking triggered threshold: {e}")
             return False  # Default to false on error to prevent double-triggers
 
+    async def has_threshold_order(self, symbol: str, timeframe: TimeFrame, threshold: float,
+                                  since: datetime) -> bool:
+        """Check if an order was already placed for this threshold since the period started"""
+        try:
+            doc = await self.orders.find_one({
+                "symbol": symbol,
+                "timeframe": timeframe.value,
+                "threshold": float(threshold),
+                "created_at": {"$gte": since}
+            }, {"_id": 1})
+            return doc is not None
+        except Exception as e:
+            logger.error(f"Error checking orders for threshold: {e}")
+            return False
+
     async def get_all_triggered_thresholds(self):
         """Get all triggered thresholds from the database"""
         try:
@@ -954,6 +1346,45 @@ class MongoClient:
             logger.error(f"Error getting reference prices: {e}")
             return {}
 
+    async def get_cached_reference_price(self, symbol: str, timeframe: str, period_start: int) -> Optional[float]:
+        """Get the stored reference price for a symbol/timeframe if it belongs to period_start"""
+        try:
+            doc = await self.reference_prices.find_one({
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'period_start': period_start
+            })
+            return float(doc['price']) if doc else None
+        except Exception as e:
+            logger.error(f"Error getting cached reference price for {symbol} {timeframe}: {e}")
+            return None
+
+    async def save_cached_reference_price(self, symbol: str, timeframe: str, period_start: int, price: float) -> bool:
+        """Store the reference price of the current period for a symbol/timeframe"""
+        try:
+            await self.reference_prices.update_one(
+                {'symbol': symbol, 'timeframe': timeframe},
+                {'$set': {
+                    'price': float(price),
+                    'period_start': period_start,
+                    'updated_at': datetime.utcnow()
+                }},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving reference price for {symbol} {timeframe}: {e}")
+            return False
+
+    async def clear_reference_prices(self, timeframe: str) -> int:
+        """Remove cached reference prices for a timeframe"""
+        try:
+            result = await self.reference_prices.delete_many({'timeframe': timeframe})
+            return result.deleted_count
+        except Exception as e:
+            logger.error(f"Error clearing {timeframe} reference prices: {e}")
+            return 0
+
     async def get_triggered_thresholds(self):
         """Get all triggered thresholds from database"""
         try:
@@ -1008,7 +1439,7 @@ class MongoClient:
                 {"$project": {"filled_at": 1}}
             ]
             
-            result = await self._execute_aggregate(self.orders, pipeline)
+            result = await self.aggregate_order_history(pipeline)
             if result and len(result) > 0:
                 first_date = result[0]['filled_at']
                 logger.info(f"Found first trade date: {first_date}")
@@ -1041,14 +1472,14 @@ class MongoClient:
                 {"$group": {
                     "_id": None,
                     "total_invested": {"$sum": {"$multiply": [
-                        {"$toDecimal": "$price"}, 
-                        {"$toDecimal": "$quantity"}
+                        self._order_number("price"),
+                        self._order_number("quantity")
                     ]}},
-                    "total_fees": {"$sum": {"$toDecimal": "$fees"}}
+                    "total_fees": {"$sum": self._order_number("fees")}
                 }}
             ]
             
-            investment_result = await self._execute_aggregate(self.orders, initial_investment_pipeline)
+            investment_result = await self.aggregate_order_history(initial_investment_pipeline)
             if not investment_result or len(investment_result) == 0:
                 logger.warning("No investment data found")
                 return {"performance_percentage": 0.0}
@@ -1064,11 +1495,11 @@ class MongoClient:
                 }},
                 {"$group": {
                     "_id": "$symbol",
-                    "total_quantity": {"$sum": {"$toDecimal": "$quantity"}}
+                    "total_quantity": {"$sum": self._order_number("quantity")}
                 }}
             ]
             
-            portfolio_result = await self._execute_aggregate(self.orders, portfolio_pipeline)
+            portfolio_result = await self.aggregate_order_history(portfolio_pipeline)
             
             # Calculate current value
             current_value = Decimal('0')
@@ -1124,7 +1555,7 @@ class MongoClient:
             
             if order_docs and len(order_docs) > 0:
                 # Use the most recent order price as a fallback
-                recent_price = float(order_docs[0]["price"])
+                recent_price = float(to_decimal(order_docs[0]["price"]))
                 # Apply a small random adjustment to simulate current market conditions
                 import random
                 adjustment = random.uniform(0.95, 1.05)  # ±5% adjustment
@@ -1189,7 +1620,7 @@ class MongoClient:
                 {"$match": match_stage},
                 {"$group": {
                     "_id": "$symbol",
-                    "total_quantity": {"$sum": {"$toDecimal": "$quantity"}},
+                    "total_quantity": {"$sum": self._order_number("quantity")},
                 }},
                 {"$project": {
                     "symbol": "$_id",
@@ -1215,12 +1646,11 @@ class MongoClient:
     async def update_tp_sl_status(self, order_id: str, updates: Dict[str, Any]) -> bool:
         """Update TP/SL status fields for an order (backward compatibility method)"""
         try:
-            result = await self.orders.update_one(
+            success = await self._update_indexed_order(
                 {"order_id": order_id},
                 {"$set": {**updates, "updated_at": datetime.utcnow()}}
             )
             
-            success = result.modified_count > 0
             if success:
                 logger.info(f"Updated TP/SL status for order {order_id}")
             else:
@@ -1231,23 +1661,29 @@ class MongoClient:
             logger.error(f"Error updating TP/SL status for order {order_id}: {e}")
             return False
 
+    def _active_tp_sl_query(self) -> dict:
+        """Filled orders with a pending TP, SL or partial TP
+
+        Every $or branch repeats the filled status so it matches one of the
+        partial indexes created in init_indexes.
+        """
+        filled, pending = OrderStatus.FILLED.value, TPSLStatus.PENDING.value
+        return {"$or": [
+            {"status": filled, "take_profit.status": pending},
+            {"status": filled, "stop_loss.status": pending},
+            {"status": filled, "partial_take_profits.status": pending}
+        ]}
+
     async def get_orders_with_active_tp_sl(self) -> List[Order]:
         """Get all orders with active (pending) TP/SL or partial TP settings"""
         try:
-            # Find orders that are filled and have either pending TP, SL, or partial TP
-            query = {
-                "status": OrderStatus.FILLED.value,
-                "$or": [
-                    {"take_profit.status": TPSLStatus.PENDING.value},
-                    {"stop_loss.status": TPSLStatus.PENDING.value},
-                    {"partial_take_profits": {"$elemMatch": {"status": TPSLStatus.PENDING.value}}}
-                ]
-            }
-            
-            cursor = self.orders.find(query)
+            if self._cache_ready(self.order_index):
+                docs = self.order_index.with_pending_protection(("take_profit", "stop_loss", "partial_take_profits"))
+            else:
+                docs = await self.orders.find(self._active_tp_sl_query(), ORDER_PROJECTION).to_list(None)
             orders = []
             
-            async for doc in cursor:
+            for doc in docs:
                 try:
                     order = self._document_to_order(doc)
                     if order:
@@ -1262,6 +1698,19 @@ class MongoClient:
             logger.error(f"Error fetching orders with active TP/SL: {e}")
             return []
 
+    async def iter_filled_orders_for_positions(self):
+        """Yield filled orders with only the fields the position ledger replays"""
+        cursor = self.orders.find(
+            {"status": OrderStatus.FILLED.value},
+            {
+                "_id": 0, "order_id": 1, "symbol": 1, "price": 1, "quantity": 1, "fees": 1,
+                "take_profit.status": 1, "stop_loss.status": 1, "trailing_stop_loss.status": 1,
+                "partial_take_profits.status": 1, "partial_take_profits.position_percentage": 1
+            }
+        )
+        async for doc in cursor:
+            yield doc
+
     async def get_position_for_symbol(self, symbol: str) -> Optional[Dict]:
         """Get position details for a specific symbol"""
         try:
@@ -1269,12 +1718,12 @@ class MongoClient:
                 {"$match": {"symbol": symbol, "status": "filled"}},
                 {"$group": {
                     "_id": "$symbol",
-                    "total_quantity": {"$sum": {"$toDecimal": "$quantity"}},
+                    "total_quantity": {"$sum": self._order_number("quantity")},
                     "total_cost": {
                         "$sum": {
                             "$multiply": [
-                                {"$toDecimal": "$quantity"},
-                                {"$toDecimal": "$price"}
+                                self._order_number("quantity"),
+                                self._order_number("price")
                             ]
                         }
                     },
@@ -1425,6 +1874,8 @@ class MongoClient:
     async def get_trading_symbols(self) -> List[str]:
         """Get list of all active trading symbols"""
         try:
+            if self._cache_ready(self.symbols_cache):
+                return [doc["symbol"] for doc in self.symbols_cache.values() if doc.get("active")]
             documents = await self._execute_find(
                 self.trading_symbols,
                 {"active": True}
@@ -1566,13 +2017,12 @@ class MongoClient:
         """Load trading configuration from database"""
         try:
             # Get all config entries
-            cursor = self.trading_config.find({})
-            config = {}
-            
-            async for doc in cursor:
-                key = doc["key"]
-                value = doc["value"]
-                config[key] = value
+            if self._cache_ready(self.config_cache):
+                config = {doc["key"]: doc["value"] for doc in self.config_cache.values()}
+            else:
+                config = {}
+                async for doc in self.trading_config.find({}):
+                    config[doc["key"]] = doc["value"]
                 
             if config:
                 logger.info(f"Loaded trading configuration from database with {len(config)} settings")
@@ -1613,16 +2063,11 @@ class MongoClient:
     async def get_active_orders(self) -> List[Order]:
         """Get all orders with FILLED status for TP/SL monitoring"""
         try:
-            cursor = self.orders_collection.find({"status": OrderStatus.FILLED.value})
-            documents = await cursor.to_list(length=100)  # Limit to 100 active orders
-            
-            orders = []
-            for doc in documents:
-                order = self._document_to_order(doc)
-                if order:
-                    orders.append(order)
-                    
-            return orders
+            if self._cache_ready(self.order_index):
+                return self._decode_all(self.order_index.with_status(OrderStatus.FILLED))
+                
+            documents = await self.orders.find({"status": OrderStatus.FILLED.value}, ORDER_PROJECTION).to_list(None)
+            return self._decode_all(documents)
         except Exception as e:
             logger.error(f"Error retrieving active orders: {e}")
             return []
@@ -1646,6 +2091,7 @@ class MongoClient:
         
         try:
             await self.deposits_withdrawals.insert_one(document)
+            await self._inc_totals({"net_deposits": amount})
             logger.info(f"Deposit of {amount} recorded with ID {transaction_id}")
             return True
         except Exception as e:
@@ -1672,6 +2118,7 @@ class MongoClient:
         
         try:
             await self.deposits_withdrawals.insert_one(document)
+            await self._inc_totals({"net_deposits": -amount})
             logger.info(f"Withdrawal of {amount} recorded with ID {transaction_id}")
             return True
         except Exception as e:
@@ -1709,7 +2156,153 @@ class MongoClient:
         net_deposits = sum(t["amount"] for t in transactions)
         return net_deposits
         
-    async def _get_net_deposits_since_last_snapshot(self, current_timestamp):
+    def _order_number(self, field: str):
+        """Aggregation expression for a numeric order field, converted while string-stored orders remain"""
+        if self.decimal_storage_complete:
+            return f"${field}"
+        return {"$toDecimal": f"${field}"}
+
+    async def refresh_order_schema_state(self) -> bool:
+        """Check whether any order still predates ORDER_SCHEMA_VERSION"""
+        try:
+            outdated = await self.orders.find_one(
+                {"schema_version": {"$ne": ORDER_SCHEMA_VERSION}}, {"_id": 1}
+            )
+            self.decimal_storage_complete = outdated is None
+            if not self.decimal_storage_complete:
+                logger.info("Orders stored as strings remain, run migrate_decimal128.py to convert them")
+        except Exception as e:
+            logger.error(f"Failed to check order schema versions: {e}")
+            self.decimal_storage_complete = False
+        return self.decimal_storage_complete
+
+    async def migrate_orders_to_decimal128(self, batch_size: int = DECIMAL_MIGRATION_BATCH_SIZE,
+                                           pause: float = DECIMAL_MIGRATION_PAUSE_SECONDS,
+                                           progress=None) -> Dict[str, int]:
+        """Rewrite string prices, quantities and fees of older orders as Decimal128, in batches
+
+        Safe while the bot is running: an order changed between reading and
+        rewriting it is left for the next run instead of being overwritten.
+        """
+        stats = {"migrated": 0, "changed": 0, "failed": 0, "remaining": 0}
+        last_id = None
+        while True:
+            query = {"schema_version": {"$ne": ORDER_SCHEMA_VERSION}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            docs = await self.orders.find(query, _DECIMAL_MIGRATION_PROJECTION).sort("_id", 1).to_list(length=batch_size)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            
+            operations = []
+            for doc in docs:
+                try:
+                    update = _decimal128_update(doc)
+                except (decimal.InvalidOperation, ValueError, TypeError) as e:
+                    logger.error(f"Cannot convert order document {doc['_id']} to Decimal128: {e}")
+                    stats["failed"] += 1
+                    continue
+                # Only if unchanged since it was read
+                operations.append(pymongo.UpdateOne(
+                    {"_id": doc["_id"], "updated_at": doc.get("updated_at")},
+                    {"$set": update}
+                ))
+            if operations:
+                result = await self.orders.bulk_write(operations, ordered=False)
+                stats["migrated"] += result.modified_count
+                stats["changed"] += len(operations) - result.matched_count
+            
+            if progress:
+                progress(stats)
+            await asyncio.sleep(pause)
+        
+        stats["remaining"] = await self.orders.count_documents({"schema_version": {"$ne": ORDER_SCHEMA_VERSION}})
+        self.decimal_storage_complete = stats["remaining"] == 0
+        logger.info(f"Decimal128 migration: {stats['migrated']} orders converted, "
+                    f"{stats['changed']} changed concurrently, {stats['failed']} failed, {stats['remaining']} remaining")
+        return stats
+
+    async def _inc_totals(self, amounts: Dict[str, Any], count: int = 0) -> bool:
+        """Atomically add amounts to the running totals document"""
+        try:
+            inc = {field: _to_decimal128(value) for field, value in amounts.items()}
+            if count:
+                inc["filled_orders"] = count
+            await self.portfolio_totals.update_one(
+                {"_id": PORTFOLIO_TOTALS_ID},
+                {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update portfolio totals: {e}")
+            return False
+
+    async def add_filled_order_to_totals(self, order: Order) -> bool:
+        """Count a newly filled order in the running totals"""
+        return await self._inc_totals({
+            "invested": Decimal(str(order.price)) * Decimal(str(order.quantity)),
+            "fees": Decimal(str(order.fees or 0))
+        }, count=1)
+
+    async def get_portfolio_totals(self) -> Dict[str, Any]:
+        """Running invested, fees and net deposit totals, rebuilt from history if missing"""
+        try:
+            doc = await self.portfolio_totals.find_one({"_id": PORTFOLIO_TOTALS_ID})
+            if doc is None:
+                return await self.rebuild_portfolio_totals()
+            return {
+                "invested": _from_decimal128(doc.get("invested")),
+                "fees": _from_decimal128(doc.get("fees")),
+                "net_deposits": _from_decimal128(doc.get("net_deposits")),
+                "filled_orders": doc.get("filled_orders", 0),
+                "updated_at": doc.get("updated_at")
+            }
+        except Exception as e:
+            logger.error(f"Failed to get portfolio totals: {e}")
+            return {"invested": Decimal('0'), "fees": Decimal('0'), "net_deposits": Decimal('0'),
+                    "filled_orders": 0, "updated_at": None}
+
+    async def rebuild_portfolio_totals(self) -> Dict[str, Any]:
+        """Recompute the running totals from all filled orders and deposits/withdrawals"""
+        orders_pipeline = [
+            {"$match": {"status": OrderStatus.FILLED.value}},
+            {"$group": {
+                "_id": None,
+                "invested": {"$sum": {"$multiply": [self._order_number("price"), self._order_number("quantity")]}},
+                "fees": {"$sum": self._order_number("fees")},
+                "filled_orders": {"$sum": 1}
+            }}
+        ]
+        deposits_pipeline = [
+            {"$group": {"_id": None, "net_deposits": {"$sum": {"$toDecimal": "$amount"}}}}
+        ]
+        order_totals = await self.orders.aggregate(_union_archive(orders_pipeline)).to_list(length=1)
+        deposit_totals = await self.deposits_withdrawals.aggregate(deposits_pipeline).to_list(length=1)
+        totals = {
+            "invested": _from_decimal128(order_totals[0]["invested"]) if order_totals else Decimal('0'),
+            "fees": _from_decimal128(order_totals[0]["fees"]) if order_totals else Decimal('0'),
+            "filled_orders": order_totals[0]["filled_orders"] if order_totals else 0,
+            "net_deposits": _from_decimal128(deposit_totals[0]["net_deposits"]) if deposit_totals else Decimal('0'),
+            "updated_at": datetime.utcnow()
+        }
+        await self.portfolio_totals.replace_one(
+            {"_id": PORTFOLIO_TOTALS_ID},
+            {
+                "invested": _to_decimal128(totals["invested"]),
+                "fees": _to_decimal128(totals["fees"]),
+                "net_deposits": _to_decimal128(totals["net_deposits"]),
+                "filled_orders": totals["filled_orders"],
+                "updated_at": totals["updated_at"]
+            },
+            upsert=True
+        )
+        logger.info(f"Rebuilt portfolio totals: invested={totals['invested']}, "
+                    f"net deposits={totals['net_deposits']}, orders={totals['filled_orders']}")
+        return totals
+
+    async def _get_net_deposits_since_last_snapshot(self, current_timestamp, total_net_deposits=None):
         """Calculate net deposits since the last balance snapshot"""
         # Get timestamp of last balance record
         last_record = await self.balance_history.find_one(
@@ -1717,6 +2310,12 @@ class MongoClient:
             sort=[("timestamp", pymongo.DESCENDING)]
         )
         
+        # Snapshots carry the running total, so the difference is the change since then
+        if total_net_deposits is not None:
+            previous_total = last_record.get("total_net_deposits") if last_record else "0"
+            if previous_total is not None:
+                return total_net_deposits - to_decimal(previous_total)
+        
         if not last_record:
             # If no previous record, get all deposits/withdrawals
             return await self.get_net_deposits(days=36500)  # ~100 years
@@ -1739,12 +2338,11 @@ class MongoClient:
     async def update_order_field(self, order_id: str, field: str, value: Any) -> bool:
         """Update a specific field in an order document"""
         try:
-            result = await self.orders.update_one(
+            success = await self._update_indexed_order(
                 {"order_id": order_id},
                 {"$set": {field: value, "updated_at": datetime.utcnow()}}
             )
             
-            success = result.modified_count > 0
             if success:
                 logger.info(f"Updated field '{field}' for order {order_id}")
             else:
@@ -1755,23 +2353,63 @@ class MongoClient:
             logger.error(f"Error updating field '{field}' for order {order_id}: {e}")
             return False
             
+    async def bulk_update_orders(self, updates: Dict[str, dict]) -> Dict[str, bool]:
+        """Apply order_id -> {field: value} $set updates with one unordered bulk_write
+
+        Returns order_id -> whether that order's update was written.
+        """
+        if not updates:
+            return {}
+        order_ids = list(updates)
+        try:
+            now = datetime.utcnow()
+            operations = [
+                pymongo.UpdateOne({"order_id": order_id}, {"$set": {**updates[order_id], "updated_at": now}})
+                for order_id in order_ids
+            ]
+            result = await self.orders.bulk_write(operations, ordered=False)
+            if result.matched_count < len(operations):
+                logger.warning(f"Bulk order update matched {result.matched_count} of {len(operations)} orders")
+            saved = {order_id: True for order_id in order_ids}
+        except pymongo.errors.BulkWriteError as e:
+            # Unordered, so everything except the reported operations was applied
+            failed = {error["index"]: error.get("errmsg") for error in e.details.get("writeErrors", [])}
+            for index, message in failed.items():
+                logger.error(f"Error updating order {order_ids[index]}: {message}")
+            saved = {order_id: i not in failed for i, order_id in enumerate(order_ids)}
+        except Exception as e:
+            logger.error(f"Error bulk updating {len(order_ids)} orders: {e}")
+            return {order_id: False for order_id in order_ids}
+        
+        if self.order_index is not None:
+            for order_id in order_ids:
+                if saved[order_id]:
+                    self.order_index.update(order_id, {**updates[order_id], "updated_at": now})
+        return saved
+
+    async def bulk_update_tp_sl(self, changes: List[tuple]) -> Dict[str, bool]:
+        """Persist (order, check_tp_sl_triggers result) pairs of one monitoring pass with one bulk_write"""
+        updates = {}
+        for order, triggers in changes:
+            fields = {}
+            if triggers.get('tp_triggered') and order.take_profit:
+                fields["take_profit.status"] = order.take_profit.status.value
+                fields["take_profit.triggered_at"] = order.take_profit.triggered_at
+            if triggers.get('sl_triggered') and order.stop_loss and order.stop_loss.status == TPSLStatus.TRIGGERED:
+                fields["stop_loss.status"] = order.stop_loss.status.value
+                fields["stop_loss.triggered_at"] = order.stop_loss.triggered_at
+            if (triggers.get('sl_triggered') or triggers.get('trailing_sl_updated')) and order.trailing_stop_loss:
+                fields["trailing_stop_loss"] = _serialize_trailing_stop_loss(order.trailing_stop_loss)
+            if triggers.get('partial_tp_triggered'):
+                fields["partial_take_profits"] = _serialize_partial_take_profits(order.partial_take_profits)
+            if fields:
+                updates[order.order_id] = fields
+        return await self.bulk_update_orders(updates)
+
     async def update_partial_take_profits(self, order_id: str, partial_take_profits: List[PartialTakeProfit]) -> bool:
         """Update partial take profits for an order"""
         try:
-            # Serialize partial take profits data
-            partial_tp_data = []
-            for ptp in partial_take_profits:
-                partial_tp_data.append({
-                    "level": ptp.level,
-                    "price": str(ptp.price),
-                    "profit_percentage": ptp.profit_percentage,
-                    "position_percentage": ptp.position_percentage,
-                    "status": ptp.status.value,
-                    "triggered_at": ptp.triggered_at,
-                    "order_id": ptp.order_id
-                })
-                
-            # Update the order
+            partial_tp_data = _serialize_partial_take_profits(partial_take_profits)
             return await self.update_order_field(order_id, "partial_take_profits", partial_tp_data)
         except Exception as e:
             logger.error(f"Error updating partial take profits for order {order_id}: {e}")
@@ -1780,31 +2418,16 @@ class MongoClient:
     async def update_trailing_stop_loss(self, order_id: str, trailing_stop_loss: TrailingStopLoss) -> bool:
         """Update trailing stop loss for an order"""
         try:
-            # Serialize trailing stop loss data
             if trailing_stop_loss:
-                tsl_data = {
-                    "activation_percentage": trailing_stop_loss.activation_percentage,
-                    "callback_rate": trailing_stop_loss.callback_rate,
-                    "initial_price": str(trailing_stop_loss.initial_price),
-                    "activation_price": str(trailing_stop_loss.activation_price),
-                    "current_stop_price": str(trailing_stop_loss.current_stop_price),
-                    "highest_price": str(trailing_stop_loss.highest_price),
-                    "status": trailing_stop_loss.status.value,
-                    "triggered_at": trailing_stop_loss.triggered_at,
-                    "activated_at": trailing_stop_loss.activated_at,
-                    "order_id": trailing_stop_loss.order_id
-                }
-                
-                # Update the order
+                tsl_data = _serialize_trailing_stop_loss(trailing_stop_loss)
                 return await self.update_order_field(order_id, "trailing_stop_loss", tsl_data)
             else:
                 # Remove trailing stop loss if None
-                result = await self.orders.update_one(
+                success = await self._update_indexed_order(
                     {"order_id": order_id},
                     {"$unset": {"trailing_stop_loss": ""}, "$set": {"updated_at": datetime.utcnow()}}
                 )
                 
-                success = result.modified_count > 0
                 if success:
                     logger.info(f"Removed trailing stop loss for order {order_id}")
                 else:
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+from ..types.constants import ORDER_ARCHIVE_AFTER_DAYS, ORDER_ARCHIVE_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class OrderArchiveJob:
+    """Moves old closed orders to orders_archive in the background"""
+
+    def __init__(self, mongo_client, older_than_days: int = ORDER_ARCHIVE_AFTER_DAYS,
+                 interval: float = ORDER_ARCHIVE_INTERVAL_SECONDS):
+        self.mongo_client = mongo_client
+        self.older_than_days = older_than_days
+        self.interval = interval
+        self.task = None
+
+    async def start(self):
+        if not self.task:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.mongo_client.archive_orders(self.older_than_days)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ARCHIVE] Order archival failed: {e}")
+            await asyncio.sleep(self.interval)
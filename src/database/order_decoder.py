@@ -0,0 +1,151 @@
+import logging
+from decimal import Decimal
+from typing import Optional
+from ..types.models import (
+    Order, OrderStatus, OrderType, TimeFrame, TradeDirection, TPSLStatus,
+    TakeProfit, StopLoss, PartialTakeProfit, TrailingStopLoss
+)
+from ..types.codec import to_decimal as _decimal
+
+logger = logging.getLogger(__name__)
+
+# Only the fields an Order is built from, metadata and _id stay on the server
+ORDER_PROJECTION = {
+    "_id": 0, "symbol": 1, "status": 1, "order_type": 1, "price": 1, "quantity": 1,
+    "timeframe": 1, "order_id": 1, "created_at": 1, "updated_at": 1, "leverage": 1,
+    "direction": 1, "filled_at": 1, "cancelled_at": 1, "fees": 1, "fee_asset": 1,
+    "threshold": 1, "is_manual": 1, "take_profit": 1, "stop_loss": 1,
+    "partial_take_profits": 1, "trailing_stop_loss": 1
+}
+
+# value -> member lookups, Enum(value) goes through a slower generic path
+_ORDER_STATUS = {m.value: m for m in OrderStatus}
+_ORDER_TYPE = {m.value: m for m in OrderType}
+_TIMEFRAME = {m.value: m for m in TimeFrame}
+_DIRECTION = {m.value: m for m in TradeDirection}
+_TPSL_STATUS = {m.value: m for m in TPSLStatus}
+
+_ZERO = Decimal('0')
+
+def _enum(cache: dict, enum_type, value):
+    member = cache.get(value)
+    return member if member is not None else enum_type(value)
+
+def _decode_take_profit(data: Optional[dict]) -> Optional[TakeProfit]:
+    if not data:
+        return None
+    return TakeProfit(
+        price=_decimal(data["price"]),
+        percentage=float(data["percentage"]),
+        status=_enum(_TPSL_STATUS, TPSLStatus, data["status"]),
+        triggered_at=data.get("triggered_at"),
+        order_id=data.get("order_id")
+    )
+
+def _decode_stop_loss(data: Optional[dict]) -> Optional[StopLoss]:
+    if not data:
+        return None
+    return StopLoss(
+        price=_decimal(data["price"]),
+        percentage=float(data["percentage"]),
+        status=_enum(_TPSL_STATUS, TPSLStatus, data["status"]),
+        triggered_at=data.get("triggered_at"),
+        order_id=data.get("order_id")
+    )
+
+def _decode_partial_take_profits(data: Optional[list]) -> list:
+    return [
+        PartialTakeProfit(
+            level=int(tp_data["level"]),
+            price=_decimal(tp_data["price"]),
+            profit_percentage=float(tp_data["profit_percentage"]),
+            position_percentage=float(tp_data["position_percentage"]),
+            status=_enum(_TPSL_STATUS, TPSLStatus, tp_data["status"]),
+            triggered_at=tp_data.get("triggered_at"),
+            order_id=tp_data.get("order_id")
+        )
+        for tp_data in (data or [])
+    ]
+
+def _decode_trailing_stop_loss(data: Optional[dict]) -> Optional[TrailingStopLoss]:
+    if not data:
+        return None
+    return TrailingStopLoss(
+        activation_percentage=float(data["activation_percentage"]),
+        callback_rate=float(data["callback_rate"]),
+        initial_price=_decimal(data["initial_price"]),
+        activation_price=_decimal(data["activation_price"]),
+        current_stop_price=_decimal(data["current_stop_price"]),
+        highest_price=_decimal(data["highest_price"]),
+        status=_enum(_TPSL_STATUS, TPSLStatus, data["status"]),
+        triggered_at=data.get("triggered_at"),
+        activated_at=data.get("activated_at"),
+        order_id=data.get("order_id")
+    )
+
+class _LazyField:
+    """Decodes a sub-document the first time it is read, assignments replace it as usual"""
+    __slots__ = ('name', 'decode')
+
+    def __init__(self, decode):
+        self.decode = decode
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        values = obj.__dict__
+        try:
+            return values[self.name]
+        except KeyError:
+            value = values[self.name] = self.decode(values['_raw'].get(self.name))
+            return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+
+class LazyOrder(Order):
+    """Order decoded from a MongoDB document, TP/SL sub-objects are built on first access"""
+    take_profit = _LazyField(_decode_take_profit)
+    stop_loss = _LazyField(_decode_stop_loss)
+    partial_take_profits = _LazyField(_decode_partial_take_profits)
+    trailing_stop_loss = _LazyField(_decode_trailing_stop_loss)
+
+def decode_order(doc: dict) -> Optional[Order]:
+    """Convert a MongoDB document to an Order"""
+    try:
+        order_type = _ORDER_TYPE.get(doc.get("order_type"))
+        if order_type is None:
+            logger.warning(f"Invalid order_type '{doc.get('order_type')}', defaulting to 'spot'")
+            order_type = OrderType.SPOT
+        direction = doc.get("direction")
+        fees = doc.get("fees")
+
+        # Skips the dataclass __init__, every field is set here or by a _LazyField
+        order = LazyOrder.__new__(LazyOrder)
+        order.__dict__.update({
+            "_raw": doc,
+            "symbol": doc["symbol"],
+            "status": _enum(_ORDER_STATUS, OrderStatus, doc["status"]),
+            "order_type": order_type,
+            "price": _decimal(doc["price"]),
+            "quantity": _decimal(doc["quantity"]),
+            "timeframe": _enum(_TIMEFRAME, TimeFrame, doc["timeframe"]),
+            "order_id": doc["order_id"],
+            "created_at": doc["created_at"],
+            "updated_at": doc["updated_at"],
+            "leverage": doc.get("leverage"),
+            "direction": _enum(_DIRECTION, TradeDirection, direction) if direction else None,
+            "filled_at": doc.get("filled_at"),
+            "cancelled_at": doc.get("cancelled_at"),
+            "fees": _decimal(fees) if fees is not None else _ZERO,
+            "fee_asset": doc.get("fee_asset"),
+            "threshold": doc.get("threshold"),
+            "is_manual": doc.get("is_manual", False)
+        })
+        return order
+    except Exception as e:
+        logger.error(f"Error converting document to Order: {e}")
+        return None
@@ -0,0 +1,188 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from .change_watcher import CollectionCache
+from .order_decoder import ORDER_PROJECTION
+from ..types.models import OrderStatus, TPSLStatus
+from ..types.constants import ORDER_INDEX_RECENT_HOURS
+
+# Pending and filled orders are always indexed, closed ones only while recent
+OPEN_STATUSES = (OrderStatus.PENDING.value, OrderStatus.FILLED.value)
+# Protection types tracked per filled order, matching the order document fields
+PROTECTIONS = ("take_profit", "stop_loss", "partial_take_profits", "trailing_stop_loss")
+# _id is kept so change stream deletions, which only carry _id, can be applied
+INDEX_PROJECTION = {**ORDER_PROJECTION, "_id": 1}
+
+_PENDING = TPSLStatus.PENDING.value
+# Aged out closed orders are dropped at most this often
+_PRUNE_INTERVAL = timedelta(minutes=1)
+
+def _pending_protections(doc: dict) -> List[str]:
+    """Protection types of a filled order that have not triggered yet"""
+    if doc.get("status") != OrderStatus.FILLED.value:
+        return []
+    pending = []
+    for field in PROTECTIONS:
+        value = doc.get(field)
+        if isinstance(value, list):
+            if any(item.get("status") == _PENDING for item in value):
+                pending.append(field)
+        elif value and value.get("status") == _PENDING:
+            pending.append(field)
+    return pending
+
+def _with_updates(doc: dict, set_fields: dict, unset: Iterable[str]) -> dict:
+    """Copy of doc with a $set/$unset applied, dotted paths included
+
+    Copies along each path, decoded orders keep a reference to the old document.
+    """
+    doc = dict(doc)
+    for key, value in list(set_fields.items()) + [(key, None) for key in unset]:
+        parts = key.split(".")
+        target = doc
+        for part in parts[:-1]:
+            child = target.get(part)
+            target[part] = child = dict(child) if isinstance(child, dict) else {}
+            target = child
+        if key in set_fields:
+            target[parts[-1]] = value
+        else:
+            target.pop(parts[-1], None)
+    return doc
+
+class OrderIndex(CollectionCache):
+    """Open and recently closed order documents keyed by order_id
+
+    Secondary indexes hold order_ids by status, by symbol and, for filled
+    orders, by the protection types still pending. Kept current by the
+    ChangeWatcher and written through by every MongoClient order write.
+    """
+
+    def __init__(self, collection, recent_hours: float = ORDER_INDEX_RECENT_HOURS):
+        super().__init__(collection, keep=self.is_indexed, poll_field="updated_at")
+        self.recent = timedelta(hours=recent_hours)
+        self.docs: Dict[str, dict] = {}
+        self.order_ids: Dict[object, str] = {}  # _id -> order_id
+        self.by_status: Dict[str, Set[str]] = defaultdict(set)
+        self.by_symbol: Dict[str, Set[str]] = defaultdict(set)
+        self.by_protection: Dict[str, Set[str]] = defaultdict(set)
+        self.pruned_at = datetime.utcnow()
+
+    def cutoff(self) -> datetime:
+        """Orders closed before this are no longer indexed"""
+        return datetime.utcnow() - self.recent
+
+    def is_indexed(self, doc: dict) -> bool:
+        if doc.get("status") in OPEN_STATUSES:
+            return True
+        updated_at = doc.get("updated_at")
+        return updated_at is not None and updated_at >= self.cutoff()
+
+    def _unlink(self, order_id: str):
+        doc = self.docs.pop(order_id, None)
+        if doc is None:
+            return
+        self.order_ids.pop(doc.get("_id"), None)
+        self.by_status[doc.get("status")].discard(order_id)
+        self.by_symbol[doc.get("symbol")].discard(order_id)
+        for field in PROTECTIONS:
+            self.by_protection[field].discard(order_id)
+
+    def _link(self, doc: dict):
+        order_id = doc["order_id"]
+        self.docs[order_id] = doc
+        if "_id" in doc:
+            self.order_ids[doc["_id"]] = order_id
+        self.by_status[doc.get("status")].add(order_id)
+        self.by_symbol[doc.get("symbol")].add(order_id)
+        for field in _pending_protections(doc):
+            self.by_protection[field].add(order_id)
+
+    def put(self, doc: dict):
+        order_id = doc.get("order_id")
+        if order_id is None:
+            return
+        current = self.docs.get(order_id)
+        # A change event looked up before a later write-through must not undo it
+        if current is not None and doc.get("updated_at") and current.get("updated_at") \
+                and doc["updated_at"] < current["updated_at"]:
+            return
+        if current is not None and "_id" not in doc and "_id" in current:
+            doc = {**doc, "_id": current["_id"]}
+        self._unlink(order_id)
+        if self.keep(doc):
+            self._link(doc)
+        self._prune()
+
+    def update(self, order_id: str, set_fields: dict = None, unset: Iterable[str] = ()):
+        """Apply a $set/$unset written to MongoDB to the indexed copy, if there is one"""
+        doc = self.docs.get(order_id)
+        if doc is not None:
+            self.put(_with_updates(doc, set_fields or {}, unset))
+
+    def delete(self, doc_id):
+        order_id = self.order_ids.get(doc_id)
+        if order_id is not None:
+            self._unlink(order_id)
+
+    def clear(self):
+        self.docs = {}
+        self.order_ids.clear()
+        self.by_status.clear()
+        self.by_symbol.clear()
+        self.by_protection.clear()
+
+    async def load(self):
+        query = {"$or": [
+            {"status": {"$in": list(OPEN_STATUSES)}},
+            {"updated_at": {"$gte": self.cutoff()}}
+        ]}
+        docs = await self.collection.find(query, INDEX_PROJECTION).to_list(None)
+        self.clear()
+        for doc in docs:
+            self._link(doc)
+        self.pruned_at = datetime.utcnow()
+
+    async def poll(self, since: datetime):
+        async for doc in self.collection.find({"updated_at": {"$gt": since}}, INDEX_PROJECTION):
+            self.put(doc)
+
+    def _prune(self):
+        now = datetime.utcnow()
+        if now - self.pruned_at < _PRUNE_INTERVAL:
+            return
+        self.pruned_at = now
+        for order_id in [oid for oid, doc in self.docs.items() if not self.keep(doc)]:
+            self._unlink(order_id)
+
+    def get(self, order_id: str) -> Optional[dict]:
+        return self.docs.get(order_id)
+
+    def with_status(self, status: OrderStatus, symbol: Optional[str] = None) -> List[dict]:
+        order_ids = self.by_status.get(status.value, set())
+        if symbol is not None:
+            order_ids = order_ids & self.by_symbol.get(symbol, set())
+        return [self.docs[order_id] for order_id in order_ids]
+
+    def count(self, status: OrderStatus) -> int:
+        return len(self.by_status.get(status.value, ()))
+
+    def with_pending_protection(self, protections: Iterable[str] = PROTECTIONS) -> List[dict]:
+        """Filled orders with any of the given protection types still pending"""
+        order_ids = set()
+        for field in protections:
+            order_ids |= self.by_protection.get(field, set())
+        return [self.docs[order_id] for order_id in order_ids]
+
+    def recent_orders(self, limit: int) -> Optional[List[dict]]:
+        """The newest orders by created_at, or None when the index cannot tell
+
+        An order outside the index was closed before cutoff(), so it was also
+        created before it; indexed orders created after cutoff() are complete.
+        """
+        cutoff = self.cutoff()
+        docs = [doc for doc in self.docs.values() if doc.get("created_at") and doc["created_at"] >= cutoff]
+        if len(docs) < limit:
+            return None
+        docs.sort(key=lambda doc: doc["created_at"], reverse=True)
+        return docs[:limit]
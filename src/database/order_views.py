@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from ..types.models import OrderStatus
+
+# Materialized /viz views over orders. Each is a small collection of per-day
+# groups, _id = {"date": day, "symbol": ..., <key>}, kept current with $merge.
+
+def _day(field: str) -> dict:
+    return {"$dateTrunc": {"date": field, "unit": "day"}}
+
+def view_specs(order_number: Callable[[str], object]) -> Dict[str, dict]:
+    """viz_type -> collection, order filter, group key and accumulators of its view"""
+    filled = {"status": OrderStatus.FILLED.value}
+    return {
+        "daily_volume": {
+            "collection": "viz_daily_volume",
+            "match": filled,
+            "key": {},
+            "fields": {
+                "volume": {"$sum": {"$toDouble": {"$multiply": [order_number("price"), order_number("quantity")]}}},
+                "count": {"$sum": 1}
+            }
+        },
+        "profit_distribution": {
+            "collection": "viz_profit_distribution",
+            "match": filled,
+            "key": {},
+            "fields": {
+                "total_profit": {"$sum": {"$toDouble": "$profit"}},
+                # Orders with a profit recorded, for the average
+                "profit_count": {"$sum": {"$cond": [{"$gt": ["$profit", None]}, 1, 0]}},
+                "count": {"$sum": 1}
+            }
+        },
+        "order_types": {
+            "collection": "viz_order_types",
+            "match": {},
+            "key": {"type": "$order_type", "status": "$status"},
+            "fields": {"count": {"$sum": 1}}
+        },
+        "hourly_activity": {
+            "collection": "viz_hourly_activity",
+            "match": {},
+            "key": {"hour": {"$hour": "$created_at"}, "status": "$status"},
+            "fields": {"count": {"$sum": 1}}
+        }
+    }
+
+def refresh_pipeline(spec: dict, days: Optional[List[datetime]]) -> list:
+    """Recompute the view groups of the given days (all days when None) and $merge them"""
+    match = dict(spec["match"])
+    stages = []
+    if days is not None:
+        match["created_at"] = {"$gte": min(days), "$lt": max(days) + timedelta(days=1)}
+        stages = [{"$match": match}, {"$match": {"$expr": {"$in": [_day("$created_at"), days]}}}]
+    elif match:
+        stages = [{"$match": match}]
+    return stages + [
+        {"$group": {
+            "_id": {"date": _day("$created_at"), "symbol": "$symbol", **spec["key"]},
+            **spec["fields"]
+        }},
+        {"$merge": {"into": spec["collection"], "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ]
+
+def read_pipeline(viz_type: str, cutoff: datetime, allowed_symbols: Optional[set] = None) -> list:
+    """Regroup a view into the shape get_visualization_data has always returned"""
+    match = {} if viz_type == "profit_distribution" else {"_id.date": {"$gte": cutoff}}
+    if allowed_symbols:
+        match["_id.symbol"] = {"$in": list(allowed_symbols)}
+    stages = [{"$match": match}] if match else []
+
+    if viz_type == "daily_volume":
+        return stages + [
+            {"$group": {
+                "_id": {
+                    "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$_id.date"}},
+                    "symbol": "$_id.symbol"
+                },
+                "volume": {"$sum": "$volume"},
+                "count": {"$sum": "$count"}
+            }},
+            {"$sort": {"_id.date": 1}}
+        ]
+    if viz_type == "profit_distribution":
+        return stages + [
+            {"$group": {
+                "_id": "$_id.symbol",
+                "total_profit": {"$sum": "$total_profit"},
+                "profit_count": {"$sum": "$profit_count"},
+                "count": {"$sum": "$count"}
+            }},
+            {"$project": {
+                "total_profit": 1, "count": 1,
+                "avg_profit": {"$cond": [
+                    {"$gt": ["$profit_count", 0]}, {"$divide": ["$total_profit", "$profit_count"]}, None
+                ]}
+            }}
+        ]
+    if viz_type == "order_types":
+        return stages + [
+            {"$group": {"_id": {"type": "$_id.type", "status": "$_id.status"}, "count": {"$sum": "$count"}}}
+        ]
+    if viz_type == "hourly_activity":
+        return stages + [
+            {"$group": {"_id": {"hour": "$_id.hour", "status": "$_id.status"}, "count": {"$sum": "$count"}}},
+            {"$sort": {"_id.hour": 1}}
+        ]
+    raise ValueError(f"Unknown visualization type: {viz_type}")
@@ -0,0 +1,36 @@
+import asyncio
+import logging
+from ..types.constants import ORDER_VIEWS_INTERVAL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class OrderViewsJob:
+    """Keeps the /viz order views current in the background"""
+
+    def __init__(self, mongo_client, interval: float = ORDER_VIEWS_INTERVAL_SECONDS):
+        self.mongo_client = mongo_client
+        self.interval = interval
+        self.task = None
+
+    async def start(self):
+        if not self.task:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.mongo_client.refresh_order_views()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[VIZ] Order views refresh failed: {e}")
+            await asyncio.sleep(self.interval)
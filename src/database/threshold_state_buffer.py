@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Tuple
+from ..types.constants import THRESHOLD_STATE_FLUSH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class ThresholdStateBuffer:
+    """Write-behind buffer for threshold_state, coalescing changes into one bulk_write"""
+
+    def __init__(self, mongo_client, flush_interval: float = THRESHOLD_STATE_FLUSH_SECONDS):
+        self.mongo_client = mongo_client
+        self.flush_interval = flush_interval
+        # (symbol, timeframe) -> latest full threshold list, later changes replace earlier ones
+        self.pending: Dict[Tuple[str, str], list] = {}
+        self.task = None
+        self._flush_lock = asyncio.Lock()
+
+    def set(self, symbol: str, timeframe: str, thresholds: Iterable[float]):
+        """Queue the full triggered state of a symbol/timeframe"""
+        self.pending[(symbol, timeframe)] = sorted(float(t) for t in thresholds)
+
+    async def flush(self) -> bool:
+        """Write everything queued so far, keeping it queued if the write fails"""
+        async with self._flush_lock:
+            if not self.pending:
+                return True
+            batch, self.pending = self.pending, {}
+            if await self.mongo_client.save_threshold_states(batch):
+                return True
+            # Requeue, without overwriting newer changes made during the write
+            for key, thresholds in batch.items():
+                self.pending.setdefault(key, thresholds)
+            return False
+
+    async def start(self):
+        if not self.task:
+            self.task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flush loop and write what is left"""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if not await self.flush():
+            logger.error(f"Lost {len(self.pending)} threshold state changes on shutdown")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
@@ -276,7 +276,7 @@ Type /help for detailed command information.
 
         try:
             # Get all balances from Binance
-            all_balances = await self.binance_client.client.get_account()
+            all_balances = await self.binance_client._call_api('account', self.binance_client.client.get_account)
             
             if not all_balances or 'balances' not in all_balances:
                 await update.message.reply_text("❌ Error retrieving balance information.")
@@ -304,6 +304,9 @@ Type /help for detailed command information.
             # Combine traded assets and always show coins
             display_assets = traded_assets.union(set(always_show_coins))
             
+            # Price every asset from a single all-symbols snapshot
+            snapshot = await self.binance_client.get_price_snapshot(complete=True)
+            
             # Format the balances
             balances = []
             
@@ -328,20 +331,16 @@ Type /help for detailed command information.
                     asset_value = total
                 else:
                     # Try to get price for this asset against base currency
-                    try:
-                        symbol_pair = f"{asset}{base_currency}"
-                        price = await self.binance_client.get_current_price(symbol_pair)
+                    price = snapshot.get(f"{asset}{base_currency}")
+                    if price:
                         asset_value = total * price
-                    except Exception as e:
-                        logging.debug(f"Could not get price for {symbol_pair}: {e}")
+                    else:
                         # Try reverse pair if available
-                        try:
-                            symbol_pair = f"{base_currency}{asset}"
-                            price = await self.binance_client.get_current_price(symbol_pair)
-                            if price > 0:
-                                asset_value = total / price
-                        except Exception as e:
-                            logging.debug(f"Could not get price for reverse pair {symbol_pair}: {e}")
+                        reverse_price = snapshot.get(f"{base_currency}{asset}")
+                        if reverse_price:
+                            asset_value = total / reverse_price
+                        else:
+                            logging.debug(f"Could not get price for {asset}{base_currency}")
                     
                 # Highlight active trading assets
                 prefix = ""
@@ -393,15 +392,9 @@ Type /help for detailed command information.
             return
             
         try:
-            pending = await self.mongo_client.orders.count_documents(
-                {"status": OrderStatus.PENDING.value}
-            )
-            filled = await self.mongo_client.orders.count_documents(
-                {"status": OrderStatus.FILLED.value}
-            )
-            cancelled = await self.mongo_client.orders.count_documents(
-                {"status": OrderStatus.CANCELLED.value}
-            )
+            pending = await self.mongo_client.count_orders(OrderStatus.PENDING)
+            filled = await self.mongo_client.count_orders(OrderStatus.FILLED)
+            cancelled = await self.mongo_client.count_orders(OrderStatus.CANCELLED)
             
             message = (
                 "📊 Trading Statistics:\n"
@@ -425,69 +418,66 @@ Type /help for detailed command information.
             base_currency = self.config['trading'].get('base_currency', 'USDT')
             
             # Get last 5 orders
-            cursor = self.mongo_client.orders.find().sort("created_at", -1).limit(5)
             orders = []
-            async for doc in cursor:
+            for order in await self.mongo_client.get_recent_orders(5):
                 # Extract base asset
-                symbol = doc['symbol']
+                symbol = order.symbol
                 base_asset = symbol.replace(base_currency, '')
                 
                 # Calculate total value
-                price = float(doc['price'])
-                quantity = float(doc['quantity'])
+                price = float(order.price)
+                quantity = float(order.quantity)
                 total_value = price * quantity
                 
                 # Start building order details
                 order_details = [
-                    f"🔹 {symbol} - {doc['status'].upper()}",
+                    f"🔹 {symbol} - {order.status.value.upper()}",
                     f"Price: ${price:.4f} | Amount: {quantity:.6f} {base_asset}",
                     f"Total Value: ${total_value:.2f} {base_currency}",
-                    f"Type: {doc.get('order_type', 'UNKNOWN')} | Created: {doc['created_at'].strftime('%Y-%m-%d %H:%M:%S')}"
+                    f"Type: {order.order_type.value} | Created: {order.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
                 ]
                 
                 # Add TP/SL info if available
-                if 'take_profit' in doc and doc['take_profit']:
-                    tp = doc['take_profit']
-                    order_details.append(f"Take Profit: ${float(tp['price']):.4f} (+{tp['percentage']:.2f}%)")
+                if order.take_profit:
+                    tp = order.take_profit
+                    order_details.append(f"Take Profit: ${float(tp.price):.4f} (+{tp.percentage:.2f}%)")
                 
-                if 'stop_loss' in doc and doc['stop_loss']:
-                    sl = doc['stop_loss']
-                    order_details.append(f"Stop Loss: ${float(sl['price']):.4f} (-{sl['percentage']:.2f}%)")
+                if order.stop_loss:
+                    sl = order.stop_loss
+                    order_details.append(f"Stop Loss: ${float(sl.price):.4f} (-{sl.percentage:.2f}%)")
                 
                 # Add partial take profits info if available
-                if 'partial_take_profits' in doc and doc['partial_take_profits'] and len(doc['partial_take_profits']) > 0:
+                if order.partial_take_profits:
                     ptp_details = ["Partial Take Profits:"]
-                    for ptp in doc['partial_take_profits']:
-                        ptp_status = ptp.get('status', 'PENDING')
+                    for ptp in order.partial_take_profits:
                         triggered_info = ""
-                        if ptp_status == 'TRIGGERED' and 'triggered_at' in ptp:
-                            triggered_info = f" ✅ Triggered: {ptp['triggered_at'].strftime('%Y-%m-%d %H:%M:%S')}"
+                        if ptp.status == TPSLStatus.TRIGGERED and ptp.triggered_at:
+                            triggered_info = f" ✅ Triggered: {ptp.triggered_at.strftime('%Y-%m-%d %H:%M:%S')}"
                         
                         # Calculate exact amount to be sold at this level
-                        ptp_quantity = quantity * (ptp['position_percentage'] / 100)
-                        ptp_value = ptp_quantity * float(ptp['price'])
+                        ptp_quantity = quantity * (ptp.position_percentage / 100)
+                        ptp_value = ptp_quantity * float(ptp.price)
                         
                         ptp_details.append(
-                            f"  Level {ptp['level']}: ${float(ptp['price']):.4f} "
-                            f"(+{ptp['profit_percentage']:.2f}%) - Sell {ptp['position_percentage']}% "
+                            f"  Level {ptp.level}: ${float(ptp.price):.4f} "
+                            f"(+{ptp.profit_percentage:.2f}%) - Sell {ptp.position_percentage}% "
                             f"({ptp_quantity:.6f} {base_asset} = ${ptp_value:.2f}){triggered_info}"
                         )
                     order_details.append("\n".join(ptp_details))
                 
                 # Add trailing stop loss info if available
-                if 'trailing_stop_loss' in doc and doc['trailing_stop_loss']:
-                    tsl = doc['trailing_stop_loss']
-                    tsl_status = tsl.get('status', 'PENDING')
+                if order.trailing_stop_loss:
+                    tsl = order.trailing_stop_loss
                     tsl_details = [
-                        f"Trailing Stop Loss: Activation at +{tsl['activation_percentage']}%, "
-                        f"Callback {tsl['callback_rate']}%"
+                        f"Trailing Stop Loss: Activation at +{tsl.activation_percentage}%, "
+                        f"Callback {tsl.callback_rate}%"
                     ]
                     
-                    if 'current_stop_price' in tsl:
-                        tsl_details.append(f"Current Stop: ${float(tsl['current_stop_price']):.4f}")
+                    if tsl.current_stop_price:
+                        tsl_details.append(f"Current Stop: ${float(tsl.current_stop_price):.4f}")
                     
-                    if tsl_status == 'TRIGGERED' and 'triggered_at' in tsl:
-                        tsl_details.append(f"Triggered: {tsl['triggered_at'].strftime('%Y-%m-%d %H:%M:%S')}")
+                    if tsl.status == TPSLStatus.TRIGGERED and tsl.triggered_at:
+                        tsl_details.append(f"Triggered: {tsl.triggered_at.strftime('%Y-%m-%d %H:%M:%S')}")
                     
                     order_details.append(" | ".join(tsl_details))
                 
@@ -870,6 +860,9 @@ Type /help for detailed command information.
             now = datetime.utcnow()
             message_parts = []
             
+            # Current prices for every pair from one snapshot
+            snapshot = await self.binance_client.get_price_snapshot()
+            
             for timeframe in TimeFrame:
                 # Get next reset time with corrected timezone handling
                 if timeframe == TimeFrame.DAILY:
@@ -917,8 +910,9 @@ Type /help for detailed command information.
                     ref_price = self.binance_client.reference_prices.get(symbol, {}).get(timeframe)
                     
                     # Get current price
-                    ticker = await self.binance_client.client.get_symbol_ticker(symbol=symbol)
-                    current_price = float(ticker['price'])
+                    current_price = await self.binance_client.get_snapshot_price(symbol, snapshot)
+                    if current_price is None:
+                        continue
                     
                     # Calculate price change if reference price exists
                     if (ref_price):
@@ -1119,6 +1113,8 @@ Type /help for detailed command information.
             
             # Save to database
             await self.mongo_client.insert_manual_trade(order)
+            if self.binance_client.position_ledger:
+                self.binance_client.position_ledger.sync_order(order)
             
             # Send confirmation with auto-calculated fees
             direction_info = f"\nDirection: {order.direction.value}" if order.direction else ""
@@ -1162,6 +1158,13 @@ Type /help for detailed command information.
         )
         return ConversationHandler.END
 
+    async def _get_positions(self, allowed_symbols: set) -> dict:
+        """Open positions from the in-memory ledger, falling back to MongoDB"""
+        ledger = self.binance_client.position_ledger if self.binance_client else None
+        if ledger and ledger.loaded:
+            return ledger.get_stats(allowed_symbols)
+        return await self.mongo_client.get_position_stats(allowed_symbols)
+
     async def show_profits(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show detailed profit analysis"""
         if not self._is_authorized(update.effective_user.id):
@@ -1169,9 +1172,9 @@ Type /help for detailed command information.
             return
 
         try:
-            # Get positions from MongoDB for configured pairs only
+            # Get positions for configured pairs only
             allowed_symbols = set(self.config['trading']['pairs'])
-            positions = await self.mongo_client.get_position_stats(allowed_symbols)
+            positions = await self._get_positions(allowed_symbols)
             
             if not positions:
                 await update.message.reply_text("No filled orders found.")
@@ -1199,6 +1202,9 @@ Type /help for detailed command information.
                 logger.error(f"Failed to get {base_currency} balance: {e}")
                 response.append(f"💵 {base_currency} Balance: Unable to fetch\n")
 
+            # Current prices for every position from one snapshot
+            snapshot = await self.binance_client.get_price_snapshot()
+
             # Process each configured symbol
             for symbol in sorted(allowed_symbols):
                 position = positions.get(symbol)
@@ -1206,8 +1212,11 @@ Type /help for detailed command information.
                     continue
 
                 # Get current price
-                ticker = await self.binance_client.client.get_symbol_ticker(symbol=symbol)
-                current_price = Decimal(ticker['price'])
+                price = await self.binance_client.get_snapshot_price(symbol, snapshot)
+                if price is None:
+                    logger.warning(f"No current price for {symbol}, skipping")
+                    continue
+                current_price = Decimal(str(price))
                 
                 # Calculate profits
                 profit_data = self.mongo_client.calculate_profit_loss(position, current_price)
@@ -1374,6 +1383,8 @@ Type /help for detailed command information.
             
             # Save to database
             await self.mongo_client.insert_manual_trade(order)
+            if self.binance_client.position_ledger:
+                self.binance_client.position_ledger.sync_order(order)
             
             # Send confirmation with auto-calculated fees
             direction_info = f"\nDirection: {order.direction.value}" if order.direction else ""
@@ -1489,7 +1500,7 @@ Type /help for detailed command information.
             return
             
         # Pass allowed symbols to get only active trading pairs data
-        data = await self.mongo_client.get_visualization_data(viz_type, allowed_symbols)
+        data = await self.mongo_client.get_visualization_data(viz_type, allowed_symbols=allowed_symbols)
         
         if not data:
             await query.message.reply_text(
@@ -2926,9 +2937,9 @@ To change this setting:
     async def _generate_portfolio_composition_chart(self, chat_id: int):
         """Generate and send portfolio composition pie chart"""
         try:
-            # Get positions from MongoDB for configured pairs
+            # Get positions for configured pairs
             allowed_symbols = set(self.config['trading']['pairs'])
-            positions = await self.mongo_client.get_position_stats(allowed_symbols)
+            positions = await self._get_positions(allowed_symbols)
             
             if not positions or len(positions) == 0:
                 await self.application.bot.send_message(
@@ -3821,6 +3832,7 @@ To change this setting:
                 ('deposit', 'Record a deposit'),
                 ('withdraw', 'Record a withdrawal'),
                 ('transactions', 'View deposit/withdrawal history'),
+                ('rebuild_totals', 'Recompute invested/deposit totals'),
                 ('help', 'Show help text with all commands')
             ]
             
@@ -3848,6 +3860,7 @@ To change this setting:
             self.application.add_handler(CommandHandler("deposit", self.deposit_command))
             self.application.add_handler(CommandHandler("withdraw", self.withdrawal_command))
             self.application.add_handler(CommandHandler("transactions", self.transactions_command))
+            self.application.add_handler(CommandHandler("rebuild_totals", self.rebuild_totals_command))
             
             # Add specific command handlers for partial TP/trailing SL
             self.application.add_handler(CommandHandler("set_partial_tp", self.set_partial_tp))
@@ -3937,7 +3950,8 @@ To change this setting:
         message += "Financial Tracking:\n"
         message += "/deposit <amount> - Record a deposit\n"
         message += "/withdraw <amount> - Record a withdrawal\n"
-        message += "/transactions - View recent transactions\n\n"
+        message += "/transactions - View recent transactions\n"
+        message += "/rebuild_totals - Recompute invested/deposit totals\n\n"
         
         # Visualization commands
         message += "Visualization Commands:\n"
@@ -4663,4 +4677,21 @@ To change this setting:
         except Exception as e:
             logger.error(f"Error in transactions command: {e}")
             await update.message.reply_text(f"❌ Error: {str(e)}")
+
+    async def rebuild_totals_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Recompute the running portfolio totals from order and deposit history"""
+        try:
+            if not await self.is_user_authorized(update):
+                return
+            
+            totals = await self.mongo_client.rebuild_portfolio_totals()
+            await update.message.reply_text(
+                "✅ Portfolio totals rebuilt:\n"
+                f"Invested: ${float(totals['invested']):,.2f}\n"
+                f"Net Deposits: ${float(totals['net_deposits']):,.2f}\n"
+                f"Fees: ${float(totals['fees']):,.2f}\n"
+                f"Filled Orders: {totals['filled_orders']}"
+            )
+        except Exception as e:
+            logger.error(f"Error in rebuild totals command: {e}")
             await update.message.reply_text(f"❌ Error: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,212 @@
+from binance.client import AsyncClient
+from binance.streams import BinanceSocketManager
+from decimal import Decimal
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from ..types.constants import (
+    ACCOUNT_RECONCILE_SECONDS, PRICE_STREAM_RECONNECT_DELAY, PRICE_STREAM_MAX_RECONNECT_DELAY
+)
+
+logger = logging.getLogger(__name__)
+
+# executionReport statuses that take an order off the book
+CLOSED_ORDER_STATUSES = {'FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH'}
+# Closed order IDs remembered so a late register_order() cannot reopen them
+_CLOSED_ORDERS_KEPT = 1000
+
+class AccountState:
+    """Balances and open orders kept in memory from the Binance user data stream"""
+
+    def __init__(self, client: AsyncClient, call_api=None,
+                 reconcile_interval: float = ACCOUNT_RECONCILE_SECONDS):
+        self.client = client
+        self.call_api = call_api  # Rate limited request wrapper from BinanceClient
+        self.reconcile_interval = reconcile_interval
+        # asset -> (free, locked)
+        self.balances: Dict[str, Tuple[Decimal, Decimal]] = {}
+        # orderId -> {'symbol', 'side', 'price', 'quantity', 'executed', 'status'}
+        self.open_orders: Dict[str, dict] = {}
+        self.closed_orders: Dict[str, None] = {}  # Insertion ordered, oldest trimmed first
+        self.synced = False
+        self.connected = False
+        self.last_reconcile = 0.0
+        self.last_event_at = 0.0
+        self.running = False
+        self.execution_listeners: List[Callable] = []
+        self.tasks = []
+
+    async def start(self):
+        """Load a REST snapshot, then follow the user data stream"""
+        self.running = True
+        await self.reconcile()
+        self.tasks = [
+            asyncio.create_task(self._run_stream()),
+            asyncio.create_task(self._reconcile_loop())
+        ]
+        logger.info("[ACCOUNT] Account state started")
+
+    async def stop(self):
+        self.running = False
+        for task in self.tasks:
+            task.cancel()
+        for task in self.tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.tasks = []
+        self.connected = False
+
+    def add_execution_listener(self, callback: Callable):
+        """Register a callback receiving every executionReport event"""
+        self.execution_listeners.append(callback)
+
+    def is_ready(self) -> bool:
+        """True when local state can be trusted instead of REST"""
+        if not self.synced:
+            return False
+        # Without the stream we only trust a recent reconciliation
+        return self.connected or time.time() - self.last_reconcile <= self.reconcile_interval
+
+    def get_balance(self, asset: str) -> Decimal:
+        """Total (free + locked) balance of an asset"""
+        free, locked = self.balances.get(asset, (Decimal('0'), Decimal('0')))
+        return free + locked
+
+    def get_free_balance(self, asset: str) -> Decimal:
+        return self.balances.get(asset, (Decimal('0'), Decimal('0')))[0]
+
+    def pending_buy_value(self, quote_asset: str) -> Decimal:
+        """Notional of open BUY orders quoted in quote_asset"""
+        pending_value = Decimal('0')
+        for order in self.open_orders.values():
+            if order['side'] == 'BUY' and order['symbol'].endswith(quote_asset):
+                pending_value += order['price'] * order['quantity']
+        return pending_value
+
+    def register_order(self, order_id: str, symbol: str, side: str, price: Decimal,
+                       quantity: Decimal, quote_asset: str):
+        """Book an order acknowledged by REST before its executionReport arrives
+
+        The stream event replaces the entry later; an order the stream already
+        reported is left alone.
+        """
+        order_id = str(order_id)
+        if order_id in self.open_orders or order_id in self.closed_orders:
+            return
+        self.open_orders[order_id] = {
+            'symbol': symbol,
+            'side': side,
+            'price': price,
+            'quantity': quantity,
+            'executed': Decimal('0'),
+            'status': 'NEW'
+        }
+        if side == 'BUY':
+            # The exchange locks the quote amount of the order
+            free, locked = self.balances.get(quote_asset, (Decimal('0'), Decimal('0')))
+            amount = min(free, price * quantity)
+            self.balances[quote_asset] = (free - amount, locked + amount)
+
+    async def reconcile(self) -> bool:
+        """Replace local state with a REST snapshot of balances and open orders"""
+        try:
+            if self.call_api:
+                account = await self.call_api('account', self.client.get_account, recvWindow=60000)
+                open_orders = await self.call_api('open_orders_all', self.client.get_open_orders, recvWindow=60000)
+            else:
+                account = await self.client.get_account(recvWindow=60000)
+                open_orders = await self.client.get_open_orders(recvWindow=60000)
+
+            self.balances = {
+                b['asset']: (Decimal(b['free']), Decimal(b['locked']))
+                for b in account['balances']
+                if Decimal(b['free']) > 0 or Decimal(b['locked']) > 0
+            }
+            self.open_orders = {
+                str(o['orderId']): {
+                    'symbol': o['symbol'],
+                    'side': o['side'],
+                    'price': Decimal(o['price']),
+                    'quantity': Decimal(o['origQty']),
+                    'executed': Decimal(o['executedQty']),
+                    'status': o['status']
+                }
+                for o in open_orders
+            }
+            self.synced = True
+            self.last_reconcile = time.time()
+            logger.debug(f"[ACCOUNT] Reconciled {len(self.balances)} balances and {len(self.open_orders)} open orders")
+            return True
+        except Exception as e:
+            logger.error(f"[ACCOUNT] Reconciliation failed: {e}")
+            return False
+
+    async def _reconcile_loop(self):
+        while self.running:
+            await asyncio.sleep(self.reconcile_interval)
+            await self.reconcile()
+
+    async def _run_stream(self):
+        """Follow the user data stream, reconnecting with backoff"""
+        delay = PRICE_STREAM_RECONNECT_DELAY
+        manager = BinanceSocketManager(self.client)
+        while self.running:
+            try:
+                # user_socket creates the listenKey and keeps it alive
+                async with manager.user_socket() as stream:
+                    self.connected = True
+                    delay = PRICE_STREAM_RECONNECT_DELAY
+                    logger.info("[ACCOUNT] Connected to user data stream")
+                    while self.running:
+                        message = await stream.recv()
+                        if not message:
+                            continue
+                        if message.get('e') == 'error':
+                            raise ConnectionError(message.get('m', 'stream error'))
+                        self._handle_event(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                logger.warning(f"[ACCOUNT] User data stream disconnected: {e}. Reconnecting in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, PRICE_STREAM_MAX_RECONNECT_DELAY)
+                # Events were missed while disconnected
+                await self.reconcile()
+            finally:
+                self.connected = False
+
+    def _handle_event(self, event: dict):
+        """Apply one user data stream event to local state"""
+        event_type = event.get('e')
+        self.last_event_at = time.time()
+
+        if event_type == 'outboundAccountPosition':
+            for balance in event.get('B', []):
+                self.balances[balance['a']] = (Decimal(balance['f']), Decimal(balance['l']))
+
+        elif event_type == 'executionReport':
+            order_id = str(event['i'])
+            status = event['X']
+            if status in CLOSED_ORDER_STATUSES:
+                self.open_orders.pop(order_id, None)
+                self.closed_orders[order_id] = None
+                if len(self.closed_orders) > _CLOSED_ORDERS_KEPT:
+                    del self.closed_orders[next(iter(self.closed_orders))]
+            else:
+                self.open_orders[order_id] = {
+                    'symbol': event['s'],
+                    'side': event['S'],
+                    'price': Decimal(event['p']),
+                    'quantity': Decimal(event['q']),
+                    'executed': Decimal(event['z']),
+                    'status': status
+                }
+            for listener in self.execution_listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    logger.error(f"[ACCOUNT] Execution listener failed: {e}")
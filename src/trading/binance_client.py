@@ -3,6 +3,7 @@ from binance.exceptions import BinanceAPIException
 from decimal import Decimal
 from datetime import datetime, timedelta
 import asyncio
+import contextvars
 import logging
 from typing import Dict, List, Optional, Tuple
 import aiohttp
@@ -10,7 +11,15 @@ import json
 import re  # Add import for regex support
 from ..types.models import Order, OrderStatus, TimeFrame, OrderType, TradeDirection, TakeProfit, StopLoss, TPSLStatus, PartialTakeProfit, TrailingStopLoss  # Add TP/SL imports
 from ..utils.rate_limiter import RateLimiter
-from ..types.constants import PRECISION, MIN_NOTIONAL, TIMEFRAME_INTERVALS, TRADING_FEES, ORDER_TYPE_FEES
+from .market_data_feed import MarketDataFeed, PriceSnapshot
+from .symbol_rules import SymbolRules
+from .account_state import AccountState
+from .threshold_engine import ThresholdEngine, ThresholdCrossing
+from ..database.threshold_state_buffer import ThresholdStateBuffer
+from .pre_trade import PreTradeContext
+from .position_ledger import PositionLedger
+from ..types.constants import PRECISION, MIN_NOTIONAL, TIMEFRAME_INTERVALS, TRADING_FEES, ORDER_TYPE_FEES, PRICE_SNAPSHOT_MAX_AGE
+from ..types.constants import PRIORITY_ORDER, PRIORITY_NORMAL, PRIORITY_BULK
 from ..utils.chart_generator import ChartGenerator
 from ..utils.yahoo_scrapooooor_sp500 import YahooSP500Scraper  # Import the new Yahoo scraper
 import time
@@ -28,7 +37,17 @@ class BinanceClient:
         self.reference_prices = {}
         self.triggered_thresholds = {}
         self.rate_limiter = RateLimiter()
-        self.symbol_info = {}
+        self.market_data = None  # Websocket price feed, created in initialize()
+        self.price_snapshot = None  # Latest PriceSnapshot taken for a trading cycle
+        self.account_state = None  # Balances and open orders from the user data stream
+        self.reference_cache = {}  # (symbol, timeframe, period start ms) -> candle open
+        self.valid_symbols = set()
+        self.symbol_rules = SymbolRules()
+        self.threshold_engine = ThresholdEngine(
+            config['trading'].get('thresholds', {}) if config and 'trading' in config else {}
+        )
+        self.engine_periods = {}  # TimeFrame -> period start the engine's references belong to
+        self.background_tasks = set()
         self.last_reset = {
             tf: datetime.utcnow() for tf in TimeFrame
         }
@@ -44,6 +63,13 @@ class BinanceClient:
         self.mongo_client = mongo_client
         self.config = config
         
+        # Triggered threshold state is persisted write-behind, off the trigger-to-order path
+        self.threshold_state_buffer = ThresholdStateBuffer(mongo_client) if mongo_client else None
+        self.position_ledger = PositionLedger(mongo_client) if mongo_client else None
+        self.threshold_state_durable = bool(
+            config and 'trading' in config and config['trading'].get('threshold_state_durable', False)
+        )
+        
         # Set API environment info
         environment = "TESTNET" if testnet else "MAINNET"
         logger.info(f"[INIT] Using Binance {environment} API")
@@ -138,10 +164,32 @@ class BinanceClient:
         # Add regex pattern for valid Binance symbols
         self.valid_symbol_pattern = re.compile(r'^[A-Z0-9\-.]{1,20}$')
         
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        # Clean context, so the task does not log into a caller's buffered_logs() block
+        task = asyncio.create_task(coro, context=contextvars.Context())
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
     def set_telegram_bot(self, bot):
         """Set telegram bot for notifications"""
         self.telegram_bot = bot
         
+    async def _call_api(self, endpoint: str, func, *args, priority: int = PRIORITY_NORMAL, **kwargs):
+        """Run a REST call through the rate limiter and sync limits from the response headers"""
+        await self.rate_limiter.acquire(endpoint=endpoint, priority=priority)
+        try:
+            return await func(*args, **kwargs)
+        except BinanceAPIException as e:
+            response = getattr(e, 'response', None)
+            self.rate_limiter.handle_api_error(e.status_code, getattr(response, 'headers', None))
+            raise
+        finally:
+            response = getattr(self.client, 'response', None)
+            if response is not None:
+                self.rate_limiter.update_from_headers(response.headers)
+        
     async def check_initial_balance(self) -> bool:
         """Check if current balance is above reserve requirement"""
         try:
@@ -190,14 +238,6 @@ class BinanceClient:
             
             # Initialize rate limiter
             self.rate_limiter = RateLimiter()
-            
-            # Get exchange information
-            await self.rate_limiter.acquire()
-            self.exchange_info = await self.client.get_exchange_info()
-            
-            # Initialize symbol info
-            for symbol_info in self.exchange_info['symbols']:
-                self.symbol_info[symbol_info['symbol']] = symbol_info
                 
             # Get trading symbols to use
             trading_symbols = []
@@ -231,8 +271,25 @@ class BinanceClient:
             else:
                 logger.warning("No trading symbols configured!")
             
+            # Load trading rules for the traded symbols and keep them refreshed
+            await self.symbol_rules.start(self.client, self.valid_symbols, self._call_api)
+            
+            # Start websocket price feed for the valid symbols
+            self.market_data = MarketDataFeed(self.client, call_api=self._call_api)
+            await self.market_data.start(self.valid_symbols)
+            
+            # Follow balances and open orders from the user data stream
+            self.account_state = AccountState(self.client, call_api=self._call_api)
+            await self.account_state.start()
+            
+            # Positions are kept in memory from here on
+            if self.position_ledger:
+                await self.position_ledger.start()
+            
             # Set up initial trading state
             await self.restore_threshold_state()
+            if self.threshold_state_buffer:
+                await self.threshold_state_buffer.start()
             
             # Return success
             logger.info("Binance client initialized successfully")
@@ -284,7 +341,8 @@ class BinanceClient:
                 if symbol not in self.triggered_thresholds:
                     self.triggered_thresholds[symbol] = {}
                 
-                self.triggered_thresholds[symbol][timeframe] = thresholds
+                self.triggered_thresholds[symbol][timeframe] = set(thresholds)
+                self.threshold_engine.set_triggered(symbol, timeframe, thresholds)
                 
                 # Build data for telegram notification
                 if symbol not in restored_by_symbol:
@@ -302,6 +360,15 @@ class BinanceClient:
             logger.error(f"Error restoring triggered thresholds: {e}")
 
     async def close(self):
+        if self.threshold_state_buffer:
+            await self.threshold_state_buffer.stop()
+        if self.position_ledger:
+            await self.position_ledger.stop()
+        await self.symbol_rules.stop()
+        if self.account_state:
+            await self.account_state.stop()
+        if self.market_data:
+            await self.market_data.stop()
         if self.client:
             await self.client.close_connection()
             
@@ -382,6 +449,20 @@ class BinanceClient:
                 logger.warning(f"Invalid symbol format or known invalid: {symbol}")
                 return None
                 
+            # The open of the current candle cannot change until the period boundary
+            period_start = await self.get_reference_timestamp(timeframe)
+            cache_key = (symbol, timeframe.value, period_start)
+            cached_price = self.reference_cache.get(cache_key)
+            if cached_price is None and self.mongo_client:
+                cached_price = await self.mongo_client.get_cached_reference_price(
+                    symbol, timeframe.value, period_start
+                )
+                if cached_price is not None:
+                    self.reference_cache[cache_key] = cached_price
+            if cached_price is not None:
+                self.reference_prices.setdefault(symbol, {})[timeframe] = cached_price
+                return cached_price
+                
             # Use the current candle's open price instead of historical data
             interval_map = {
                 TimeFrame.DAILY: '1d',    # Daily candle
@@ -391,10 +472,9 @@ class BinanceClient:
             
             interval = interval_map[timeframe]
             
-            await self.rate_limiter.acquire()
-            
             # Get current candle
-            klines = await self.client.get_klines(
+            klines = await self._call_api(
+                'klines', self.client.get_klines,
                 symbol=symbol,
                 interval=interval,
                 limit=1  # Just get the current candle
@@ -403,6 +483,14 @@ class BinanceClient:
             if klines and len(klines) > 0:
                 ref_price = float(klines[0][1])  # Current candle's open price
                 logger.info(f"    {timeframe.value} reference: ${ref_price:,.2f}")
+                
+                # Cache for the rest of the period, in memory and in the database
+                self.reference_cache[cache_key] = ref_price
+                self.reference_prices.setdefault(symbol, {})[timeframe] = ref_price
+                if self.mongo_client:
+                    await self.mongo_client.save_cached_reference_price(
+                        symbol, timeframe.value, period_start, ref_price
+                    )
                 return ref_price
             else:
                 logger.warning(f"No kline data for {symbol} {timeframe.value}")
@@ -442,9 +530,9 @@ class BinanceClient:
 
                 # Get current price first with better error handling
                 try:
-                    await self.rate_limiter.acquire()
-                    ticker = await self.client.get_symbol_ticker(symbol=symbol)
-                    current_price = float(ticker['price'])
+                    current_price = await self.get_current_price(symbol)
+                    if current_price is None:
+                        continue
 
                     # Print symbol header and current price together
                     logger.info(f"\n=== Checking {symbol} ===")
@@ -477,7 +565,8 @@ class BinanceClient:
             logger.error(f"Failed to update prices: {e}", exc_info=True)
             raise
             
-    async def check_thresholds(self, symbol: str, timeframe: TimeFrame) -> List[float]:
+    async def check_thresholds(self, symbol: str, timeframe: TimeFrame,
+                               snapshot: Optional[PriceSnapshot] = None) -> List[float]:
         """Check price thresholds for a symbol and timeframe with format validation"""
         try:
             # Validate symbol format first
@@ -492,7 +581,7 @@ class BinanceClient:
                 return []
                 
             # Get current price
-            current_price = await self.get_current_price(symbol)
+            current_price = await self.get_snapshot_price(symbol, snapshot)
             if not current_price:
                 logger.warning(f"Failed to get current price for {symbol}")
                 return []
@@ -537,6 +626,48 @@ class BinanceClient:
             logger.error(f"Error checking thresholds: {e}", exc_info=True)
             return []
 
+    async def evaluate_thresholds(self, symbols: List[str],
+                                  snapshot: Optional[PriceSnapshot] = None) -> List[ThresholdCrossing]:
+        """Find newly crossed thresholds for all symbols and timeframes in one vectorized pass"""
+        try:
+            engine = self.threshold_engine
+            engine.set_ladders(self.config['trading']['thresholds'])
+            
+            symbols = [s for s in symbols if s not in self.invalid_symbols and self._is_valid_symbol_format(s)]
+            for symbol in engine.set_symbols(symbols):
+                # Seed new rows from the restored triggered state
+                for timeframe, thresholds in self.triggered_thresholds.get(symbol, {}).items():
+                    engine.set_triggered(symbol, getattr(timeframe, 'value', timeframe), thresholds)
+            
+            # Reference prices only change at period boundaries
+            for timeframe in TimeFrame:
+                period_start = await self.get_reference_timestamp(timeframe)
+                if self.engine_periods.get(timeframe) != period_start:
+                    engine.clear_references(timeframe)
+                    self.engine_periods[timeframe] = period_start
+            for symbol, timeframe in engine.missing_references():
+                engine.set_reference(symbol, timeframe, await self.get_reference_price(symbol, timeframe))
+            
+            if snapshot is None:
+                snapshot = await self.get_price_snapshot()
+            crossings = engine.evaluate(snapshot.prices)
+            
+            for crossing in crossings:
+                logger.info(f"✅ Threshold triggered: {crossing.symbol} {crossing.threshold}% on {crossing.timeframe.value}")
+                await self.mark_threshold_triggered(crossing.symbol, crossing.timeframe, crossing.threshold)
+                if self.telegram_bot:
+                    # Notify in the background so orders are not held up by Telegram
+                    self._spawn(self.telegram_bot.send_threshold_notification(
+                        crossing.symbol, crossing.timeframe, crossing.threshold,
+                        crossing.current_price, crossing.reference_price, crossing.price_change
+                    ))
+            
+            return crossings
+            
+        except Exception as e:
+            logger.error(f"Error evaluating thresholds: {e}", exc_info=True)
+            return []
+
     async def mark_threshold_triggered(self, symbol: str, timeframe: TimeFrame, threshold: float):
         """Mark a threshold as triggered in memory and persist to database"""
         try:
@@ -558,33 +689,37 @@ class BinanceClient:
             # Add threshold if not already in list
             if threshold not in self.triggered_thresholds[symbol][timeframe_value]:
                 self.triggered_thresholds[symbol][timeframe_value].add(threshold)
+                self.threshold_engine.mark(symbol, timeframe_value, threshold)
                 logger.info(f"Marking threshold {threshold}% as triggered for {symbol} {timeframe_value}")
                 
-                # Persist to database immediately with await instead of background task
-                if self.mongo_client:
-                    threshold_list = list(self.triggered_thresholds[symbol][timeframe_value])
-                    try:
-                        success = await self.mongo_client.save_triggered_threshold(
-                            symbol, timeframe_value, threshold_list
-                        )
-                        if success:
-                            logger.info(f"Successfully saved triggered threshold state to database for {symbol} {timeframe_value}")
-                        else:
-                            logger.error(f"Failed to save triggered threshold state to database for {symbol} {timeframe_value}")
-                    except Exception as db_error:
-                        logger.error(f"Error saving threshold state to database: {db_error}", exc_info=True)
+                # Queue for the next bulk flush instead of a database round trip per threshold
+                if self.threshold_state_buffer:
+                    self.threshold_state_buffer.set(
+                        symbol, timeframe_value, self.triggered_thresholds[symbol][timeframe_value]
+                    )
             else:
                 logger.debug(f"Threshold {threshold}% already marked as triggered for {symbol} {timeframe_value}")
                 
         except Exception as e:
             logger.error(f"Error marking threshold triggered: {e}", exc_info=True)
 
+    def invalidate_reference_cache(self, timeframe_str: str):
+        """Drop cached reference prices for a timeframe"""
+        for key in [k for k in self.reference_cache if k[1] == timeframe_str]:
+            del self.reference_cache[key]
+
     async def reset_timeframe_thresholds(self, timeframe_str: str):
         """Reset triggered thresholds for a specific timeframe"""
         try:
             # Reset triggered thresholds in database
             if self.mongo_client:
                 await self.mongo_client.reset_timeframe_thresholds(timeframe_str)
+                await self.mongo_client.clear_reference_prices(timeframe_str)
+            
+            # New period, new candle open
+            self.invalidate_reference_cache(timeframe_str)
+            self.threshold_engine.reset_timeframe(timeframe_str)
+            self.threshold_engine.clear_references(TimeFrame(timeframe_str))
             
             # Update reference prices for all trading pairs
             await self.update_reference_prices(self.config['trading']['pairs'])
@@ -616,6 +751,8 @@ class BinanceClient:
                 if symbol in self.triggered_thresholds:
                     if timeframe_str in self.triggered_thresholds[symbol]:
                         self.triggered_thresholds[symbol][timeframe_str] = set()
+                        if self.threshold_state_buffer:
+                            self.threshold_state_buffer.set(symbol, timeframe_str, [])
             
             # Log the reset
             logger.info(f"Reset {timeframe_str} thresholds for {len(reset_info['pairs'])} pairs")
@@ -676,26 +813,35 @@ class BinanceClient:
             logger.error(f"Error restoring triggered thresholds: {e}")
             return {}
 
+    async def _get_balance_and_pending(self) -> Tuple[Decimal, Decimal]:
+        """Base currency balance and the value of open buy orders"""
+        if self.account_state and self.account_state.is_ready():
+            # Local computation from the user data stream, no API weight
+            return (self.account_state.get_balance(self.base_currency),
+                    self.account_state.pending_buy_value(self.base_currency))
+        
+        # Get current balance
+        current_balance = await self.get_balance(self.base_currency)
+        
+        # Calculate pending order value
+        # Use extended recvWindow to prevent timestamp issues
+        open_orders = await self._call_api('open_orders_all', self.client.get_open_orders, recvWindow=60000)
+        
+        # Sum up the value of open orders
+        pending_value = Decimal('0')
+        for order in open_orders:
+            if order['symbol'].endswith(self.base_currency):
+                # For buy orders, add price * quantity to pending
+                if order['side'] == 'BUY':
+                    price = Decimal(order['price'])
+                    quantity = Decimal(order['origQty'])
+                    pending_value += price * quantity
+        return current_balance, pending_value
+
     async def check_reserve_balance(self, order_amount: float) -> bool:
         """Check if we have enough reserve balance for a new order"""
         try:
-            # Get current balance
-            current_balance = await self.get_balance(self.base_currency)
-            
-            # Calculate pending order value
-            await self.rate_limiter.acquire()
-            # Use extended recvWindow to prevent timestamp issues
-            open_orders = await self.client.get_open_orders(recvWindow=60000)
-            
-            # Sum up the value of open orders
-            pending_value = Decimal('0')
-            for order in open_orders:
-                if order['symbol'].endswith(self.base_currency):
-                    # For buy orders, add price * quantity to pending
-                    if order['side'] == 'BUY':
-                        price = Decimal(order['price'])
-                        quantity = Decimal(order['origQty'])
-                        pending_value += price * quantity
+            current_balance, pending_value = await self._get_balance_and_pending()
             
             # Calculate free balance
             free_balance = current_balance - pending_value - Decimal(str(self.reserve_balance))
@@ -726,81 +872,102 @@ class BinanceClient:
             logger.error(f"[RESERVE CHECK] Error checking reserve balance: {e}")
             return False
 
+    async def build_pre_trade_context(self, symbol: str, snapshot: Optional[PriceSnapshot] = None,
+                                      triggered_at: Optional[float] = None) -> Optional[PreTradeContext]:
+        """Gather price, rules, balances and position for an order from local state"""
+        try:
+            price = await self.get_snapshot_price(symbol, snapshot)
+            if not price:
+                logger.error(f"Failed to get current price for {symbol}")
+                return None
+            rule = await self.symbol_rules.ensure(symbol)
+            balance, pending_value = await self._get_balance_and_pending()
+            
+            avg_entry_price = None
+            if self.config and 'trading' in self.config and self.config['trading'].get('only_lower_entries', False):
+                avg_entry_price = await self.get_position_avg_entry(symbol)
+            
+            return PreTradeContext(
+                symbol=symbol,
+                price=price,
+                rule=rule,
+                balance=Decimal(str(balance)),
+                pending_value=pending_value,
+                reserve=Decimal(str(self.reserve_balance)),
+                avg_entry_price=avg_entry_price,
+                triggered_at=triggered_at
+            )
+        except Exception as e:
+            logger.error(f"Failed to build pre-trade context for {symbol}: {e}")
+            return None
+
+    async def get_position_avg_entry(self, symbol: str) -> Optional[Decimal]:
+        """Average entry price of the open position in a symbol"""
+        if self.position_ledger and self.position_ledger.loaded:
+            position = self.position_ledger.get(symbol)
+            return position.avg_entry_price if position else None
+        if not self.mongo_client:
+            return None
+        position = await self.mongo_client.get_position_for_symbol(symbol)
+        if position and 'avg_entry_price' in position:
+            return Decimal(position['avg_entry_price'])
+        return None
+
+    def _check_context_reserve(self, context: PreTradeContext, order_amount: float) -> bool:
+        """Reserve check against the balances captured in a pre-trade context"""
+        has_sufficient = context.can_afford(order_amount)
+        logger.info(f"[RESERVE CHECK] Current Balance: ${float(context.balance):.2f}, "
+                     f"Pending: ${float(context.pending_value):.2f}, "
+                     f"Reserve: ${self.reserve_balance:.2f}, "
+                     f"Free: ${float(context.free_balance):.2f}, "
+                     f"Order: ${order_amount:.2f}, "
+                     f"Sufficient: {has_sufficient}")
+        if not has_sufficient and self.telegram_bot:
+            # Alert without holding up the order path
+            self._spawn(self.telegram_bot.send_reserve_alert(
+                context.balance, self.reserve_balance, context.pending_value
+            ))
+        return has_sufficient
+
     async def place_limit_buy_order(self, symbol: str, amount: float, 
                                   threshold: Optional[float] = None,
                                   timeframe: Optional[TimeFrame] = None,
-                                  is_manual: bool = False) -> Order:
+                                  is_manual: bool = False,
+                                  snapshot: Optional[PriceSnapshot] = None,
+                                  context: Optional[PreTradeContext] = None) -> Order:
         """Place a limit buy order with proper lot size handling"""
         try:
             # Add debug logging
             logger.debug(f"Creating order with order_type: {OrderType.SPOT}, class: {OrderType}")
             
-            # Get current price
-            current_price = await self.get_current_price(symbol)
-            if not current_price:
-                logger.error(f"Failed to get current price for {symbol}")
-                return None
+            # Everything up to create_order is read from the pre-trade context
+            if context is None:
+                context = await self.build_pre_trade_context(symbol, snapshot)
+                if context is None:
+                    return None
+            current_price = context.price
             
             # Calculate raw quantity based on amount and price
             raw_quantity = Decimal(str(amount)) / Decimal(str(current_price))
             
-            # Get symbol info for lot size and precision
-            symbol_info = None
-            try:
-                exchange_info = await self.client.get_exchange_info()
-                for s in exchange_info['symbols']:
-                    if s['symbol'] == symbol:
-                        symbol_info = s
-                        break
-            except Exception as e:
-                logger.error(f"Error fetching symbol info: {e}")
-            
-            # Apply lot size restrictions if we have symbol info
-            if symbol_info:
-                for filter_data in symbol_info['filters']:
-                    if filter_data['filterType'] == 'LOT_SIZE':
-                        min_qty = Decimal(filter_data['minQty'])
-                        max_qty = Decimal(filter_data['maxQty'])
-                        step_size = Decimal(filter_data['stepSize'])
-                        
-                        # Calculate precision from step size
-                        precision = int(round(-math.log10(float(step_size))))
-                        
-                        # Adjust quantity to match step size
-                        adjusted_quantity = (raw_quantity // step_size) * step_size
-                        
-                        # Apply min/max constraints
-                        if adjusted_quantity < min_qty:
-                            adjusted_quantity = min_qty
-                            logger.warning(f"Adjusted {symbol} quantity to minimum: {min_qty}")
-                        elif adjusted_quantity > max_qty:
-                            adjusted_quantity = max_qty
-                            logger.warning(f"Adjusted {symbol} quantity to maximum: {max_qty}")
-                        
-                        # Round to appropriate precision
-                        adjusted_quantity = adjusted_quantity.quantize(
-                            Decimal('0.' + '0' * precision),
-                            rounding=ROUND_DOWN
-                        )
-                        
-                        # Use the adjusted quantity
-                        quantity = adjusted_quantity
-                        logger.info(f"Adjusted order quantity from {raw_quantity} to {quantity} based on LOT_SIZE filter")
-                        break
+            # Pre-parsed trading rules for lot size and precision
+            rule = context.rule
+            
+            # Apply lot size restrictions if we have the rules
+            if rule:
+                quantity = rule.adjust_quantity(raw_quantity)
+                logger.info(f"Adjusted order quantity from {raw_quantity} to {quantity} based on LOT_SIZE filter")
             else:
                 # Fallback if we couldn't get symbol info
                 quantity = self._adjust_quantity_to_lot_size(symbol, raw_quantity)
             
             # Check reserve balance first
-            if not is_manual and not await self.check_reserve_balance(amount):
+            if not is_manual and not self._check_context_reserve(context, amount):
                 raise ValueError("Order would violate reserve balance")
 
-            await self.rate_limiter.acquire()
-            
             try:
-                # Get current price
-                ticker = await self.client.get_symbol_ticker(symbol=symbol)
-                price = Decimal(ticker['price'])
+                # Reuse the price the quantity was sized with
+                price = Decimal(str(current_price))
                 
                 # Align price with exchange tick size requirements
                 aligned_price = self._align_price_to_tick(symbol, price)
@@ -810,12 +977,8 @@ class BinanceClient:
                 
                 # Check if this would raise the average entry price when only_lower_entries is enabled
                 if not is_manual and self.config and 'trading' in self.config and self.config['trading'].get('only_lower_entries', False):
-                    # Get existing position average entry price from MongoDB
-                    current_avg_price = None
-                    if self.mongo_client:
-                        position = await self.mongo_client.get_position_for_symbol(symbol)
-                        if position and 'avg_entry_price' in position:
-                            current_avg_price = Decimal(position['avg_entry_price'])
+                    # Existing position average entry price
+                    current_avg_price = context.avg_entry_price
                     
                     # If we already have a position and current price is higher than avg entry
                     if current_avg_price is not None and price > current_avg_price:
@@ -830,15 +993,19 @@ class BinanceClient:
                 order_value = price * quantity
                 
                 # Check minimum notional
-                min_notional = MIN_NOTIONAL.get(symbol, MIN_NOTIONAL['DEFAULT'])
+                min_notional = rule.min_notional if rule else MIN_NOTIONAL.get(symbol, MIN_NOTIONAL['DEFAULT'])
                 if order_value < Decimal(str(min_notional)):
                     # Auto-increase quantity to meet minimum notional requirement
                     logger.warning(f"Order value ${float(order_value):.2f} below minimum notional ${min_notional}. Adjusting quantity...")
                     
                     # Calculate required quantity to meet minimum notional
                     required_quantity = Decimal(str(min_notional)) / price
-                    required_quantity = Decimal(str(round(required_quantity, self._get_quantity_precision(symbol))))
-                    required_quantity = self._adjust_quantity_to_lot_size(symbol, required_quantity)
+                    if rule:
+                        # Round up to the next step so the order stays above the minimum
+                        required_quantity = rule.adjust_quantity(required_quantity, round_up=True)
+                    else:
+                        required_quantity = Decimal(str(round(required_quantity, self._get_quantity_precision(symbol))))
+                        required_quantity = self._adjust_quantity_to_lot_size(symbol, required_quantity)
                     
                     # Update the quantity and log the adjustment
                     adjusted_amount = float(required_quantity * price)
@@ -846,7 +1013,7 @@ class BinanceClient:
                     quantity = required_quantity
                     
                     # If this order would now violate reserve balance, check again
-                    if not is_manual and adjusted_amount > original_amount and not await self.check_reserve_balance(adjusted_amount):
+                    if not is_manual and adjusted_amount > original_amount and not self._check_context_reserve(context, adjusted_amount):
                         raise ValueError(f"Adjusted order (${adjusted_amount:.2f}) would violate reserve balance")
                 
                 # Log order details before placement
@@ -859,12 +1026,19 @@ class BinanceClient:
                 if not is_manual and threshold and symbol in self.triggered_thresholds and timeframe:
                     await self.mark_threshold_triggered(symbol, timeframe.value, threshold)
                 
+                # In durability mode the trigger must be on disk before the order exists
+                if not is_manual and threshold and self.threshold_state_durable and self.threshold_state_buffer:
+                    if not await self.threshold_state_buffer.flush():
+                        raise ValueError(f"Could not persist threshold state for {symbol}, not placing order")
+                
                 # Generate unique order ID
                 order_id = str(int(datetime.utcnow().timestamp() * 1000))
                 
                 if not is_manual:
                     # Place order on Binance
-                    order_response = await self.client.create_order(
+                    order_response = await self._call_api(
+                        'order', self.client.create_order,
+                        priority=PRIORITY_ORDER,
                         symbol=symbol,
                         side='BUY',
                         type='LIMIT',
@@ -873,6 +1047,12 @@ class BinanceClient:
                         price=float(price)  # Using the aligned price here
                     )
                     order_id = str(order_response['orderId'])
+                    # Count it as pending now, the next placement must not wait for the stream to see it
+                    if self.account_state:
+                        self.account_state.register_order(
+                            order_id, symbol, 'BUY', Decimal(str(price)), Decimal(str(quantity)), self.base_currency
+                        )
+                    logger.info(f"[LATENCY] {symbol} order {order_id} acknowledged {context.elapsed_ms():.1f}ms after trigger")
                 
                 # Create order object with all required fields
                 order = Order(
@@ -911,7 +1091,8 @@ class BinanceClient:
     async def cancel_order(self, symbol: str, order_id: str) -> bool:
         """Cancel an order with proper error handling"""
         try:
-            await self.client.cancel_order(symbol=symbol, orderId=order_id)
+            await self._call_api('cancel_order', self.client.cancel_order,
+                                 priority=PRIORITY_ORDER, symbol=symbol, orderId=order_id)
             logger.info(f"Successfully cancelled order {order_id} for {symbol}")
             return True
         except Exception as e:
@@ -930,8 +1111,8 @@ class BinanceClient:
     async def check_order_status(self, symbol: str, order_id: str) -> Optional[OrderStatus]:
         """Check the status of an order"""
         try:
-            await self.rate_limiter.acquire()
-            order = await self.client.get_order(symbol=symbol, orderId=order_id, recvWindow=60000)
+            order = await self._call_api('get_order', self.client.get_order,
+                                         symbol=symbol, orderId=order_id, recvWindow=60000)
             
             if order['status'] == 'FILLED':
                 return OrderStatus.FILLED
@@ -950,14 +1131,16 @@ class BinanceClient:
     async def get_balance(self, symbol: str = None) -> Decimal:
         """Get current balance for a symbol"""
         try:
-            await self.rate_limiter.acquire()
-            
-            # Use extended recvWindow to prevent timestamp issues
-            account = await self.client.get_account(recvWindow=60000)
-            
             # Get specified symbol balance or default to base currency
             if not symbol:
                 symbol = self.base_currency
+            
+            # Serve from the user data stream when it is in sync
+            if self.account_state and self.account_state.is_ready():
+                return self.account_state.get_balance(symbol)
+            
+            # Use extended recvWindow to prevent timestamp issues
+            account = await self._call_api('account', self.client.get_account, recvWindow=60000)
                 
             for balance in account['balances']:
                 if balance['asset'] == symbol:
@@ -1001,10 +1184,10 @@ class BinanceClient:
             
             # First attempt: Get recent candles without time constraints
             logger.info(f"Fetching {count} candles for {symbol} on {timeframe.value} timeframe")
-            await self.rate_limiter.acquire()
-            
             # Start with a simple request for the most recent candles
-            klines = await self.client.get_klines(
+            klines = await self._call_api(
+                'klines', self.client.get_klines,
+                priority=PRIORITY_BULK,
                 symbol=symbol,
                 interval=interval,
                 limit=count + 5  # Request extra candles to handle potential gaps
@@ -1017,7 +1200,9 @@ class BinanceClient:
                 logger.info(f"Trying alternative interval {alternative_interval} for {symbol}")
                 
                 # Get more frequent candles and aggregate them if needed
-                alternative_klines = await self.client.get_klines(
+                alternative_klines = await self._call_api(
+                    'klines', self.client.get_klines,
+                    priority=PRIORITY_BULK,
                     symbol=symbol,
                     interval=alternative_interval,
                     limit=100  # Get more candles at a higher frequency
@@ -1113,10 +1298,10 @@ class BinanceClient:
             end_time = int(datetime.utcnow().timestamp() * 1000)
             start_time = int((datetime.utcnow() - timedelta(days=days)).timestamp() * 1000)
             
-            await self.rate_limiter.acquire(weight=10)  # Higher weight for klines request
-            
             # Get klines (daily candles)
-            klines = await self.client.get_klines(
+            klines = await self._call_api(
+                'klines', self.client.get_klines,
+                priority=PRIORITY_BULK,
                 symbol=symbol,
                 interval='1d',
                 startTime=start_time,
@@ -1161,9 +1346,20 @@ class BinanceClient:
                 if self.mongo_client:
                     await self.mongo_client.save_invalid_symbol(symbol, "Invalid symbol format")
                 return None
+            
+            # Prefer the streamed price, REST is only a fallback when the stream is stale
+            if self.market_data:
+                streamed_price = self.market_data.get_price(symbol)
+                if streamed_price is not None:
+                    return streamed_price
+            
+            # Then the cycle snapshot while it is still fresh
+            if self.price_snapshot and self.price_snapshot.is_fresh(PRICE_SNAPSHOT_MAX_AGE):
+                snapshot_price = self.price_snapshot.get(symbol)
+                if snapshot_price is not None:
+                    return snapshot_price
                 
-            await self.rate_limiter.acquire()
-            ticker = await self.client.get_symbol_ticker(symbol=symbol)
+            ticker = await self._call_api('ticker_price', self.client.get_symbol_ticker, symbol=symbol)
             return float(ticker['price'])
         except BinanceAPIException as e:
             # Check specifically for invalid symbol error
@@ -1181,11 +1377,44 @@ class BinanceClient:
             logger.error(f"Failed to get current price for {symbol}: {e}")
             return None
 
+    async def refresh_price_snapshot(self, complete: bool = False) -> PriceSnapshot:
+        """Take a new price snapshot, from the stream when healthy or one all-symbols ticker call"""
+        try:
+            if not complete and self.market_data and self.market_data.is_healthy():
+                self.price_snapshot = self.market_data.snapshot()
+            else:
+                tickers = await self._call_api('ticker_price_all', self.client.get_all_tickers)
+                self.price_snapshot = PriceSnapshot.from_tickers(tickers)
+            logger.debug(f"Price snapshot refreshed from {self.price_snapshot.source} ({len(self.price_snapshot)} symbols)")
+            return self.price_snapshot
+        except Exception as e:
+            logger.error(f"Failed to refresh price snapshot: {e}")
+            # Fall back to whatever the stream has, even if partial
+            if self.market_data:
+                return self.market_data.snapshot()
+            return PriceSnapshot({}, complete=False)
+
+    async def get_price_snapshot(self, max_age: float = PRICE_SNAPSHOT_MAX_AGE, complete: bool = False) -> PriceSnapshot:
+        """Return the current snapshot, refreshing it when older than max_age"""
+        snapshot = self.price_snapshot
+        if snapshot and snapshot.is_fresh(max_age) and (snapshot.complete or not complete):
+            return snapshot
+        return await self.refresh_price_snapshot(complete=complete)
+
+    async def get_snapshot_price(self, symbol: str, snapshot: Optional[PriceSnapshot] = None) -> Optional[float]:
+        """Read a price from the snapshot, falling back to get_current_price for missing symbols"""
+        if snapshot is not None:
+            price = snapshot.get(symbol)
+            if price is not None:
+                return price
+        return await self.get_current_price(symbol)
+
     def _get_quantity_precision(self, symbol: str) -> int:
         """Get the quantity precision for a symbol"""
         try:
-            if symbol in self.symbol_info:
-                return self.symbol_info[symbol]['baseAssetPrecision']
+            rule = self.symbol_rules.get(symbol)
+            if rule:
+                return rule.base_precision
             return 8  # Default precision if symbol info not available
         except Exception as e:
             logger.error(f"Error getting quantity precision for {symbol}: {e}")
@@ -1194,8 +1423,9 @@ class BinanceClient:
     def _get_price_precision(self, symbol: str) -> int:
         """Get the price precision for a symbol"""
         try:
-            if symbol in self.symbol_info:
-                return self.symbol_info[symbol]['quotePrecision']
+            rule = self.symbol_rules.get(symbol)
+            if rule:
+                return rule.quote_precision
             return 8  # Default precision if symbol info not available
         except Exception as e:
             logger.error(f"Error getting price precision for {symbol}: {e}")
@@ -1204,10 +1434,9 @@ class BinanceClient:
     def _get_tick_size(self, symbol: str) -> Decimal:
         """Get the minimum price increment (tick size) for a symbol"""
         try:
-            if symbol in self.symbol_info:
-                for filter_data in self.symbol_info[symbol]['filters']:
-                    if filter_data['filterType'] == 'PRICE_FILTER':
-                        return Decimal(filter_data['tickSize'])
+            rule = self.symbol_rules.get(symbol)
+            if rule:
+                return rule.tick_size
             return Decimal('0.00000001')  # Default tick size if not available
         except Exception as e:
             logger.error(f"Error getting tick size for {symbol}: {e}")
@@ -1220,6 +1449,13 @@ class BinanceClient:
         that don't align with the symbol's tick size.
         """
         try:
+            rule = self.symbol_rules.get(symbol)
+            if rule:
+                aligned_price = rule.align_price(price)
+                if aligned_price != price:
+                    logger.info(f"Aligned price for {symbol} from {price} to {aligned_price} (tick size: {rule.tick_size})")
+                return aligned_price
+            
             tick_size = self._get_tick_size(symbol)
             if tick_size == Decimal('0'):
                 return price  # No alignment needed
@@ -1249,28 +1485,38 @@ class BinanceClient:
     def _adjust_quantity_to_lot_size(self, symbol: str, quantity: Decimal) -> Decimal:
         """Adjust quantity to match symbol's lot size requirements"""
         try:
-            # Get symbol precision (existing code)
-            precision = self._get_quantity_precision(symbol)
+            rule = self.symbol_rules.get(symbol)
             
-            # Apply precision with rounding down to avoid exceeding order amount
-            adjusted_quantity = quantity.quantize(
-                Decimal('0.' + '0' * precision),
-                rounding=ROUND_DOWN
-            )
+            # Snap to the step size when rules are loaded, otherwise fall back to precision
+            if rule:
+                adjusted_quantity = rule.adjust_quantity(quantity)
+            else:
+                precision = self._get_quantity_precision(symbol)
+                
+                # Apply precision with rounding down to avoid exceeding order amount
+                adjusted_quantity = quantity.quantize(
+                    Decimal('0.' + '0' * precision),
+                    rounding=ROUND_DOWN
+                )
             
             # Add safety check for minimum notional value
-            min_notional = Decimal('10')  # Default minimum notional value
-            if symbol in MIN_NOTIONAL:
-                min_notional = Decimal(str(MIN_NOTIONAL[symbol]))
+            if rule:
+                min_notional = rule.min_notional
+            else:
+                min_notional = Decimal(str(MIN_NOTIONAL.get(symbol, MIN_NOTIONAL['DEFAULT'])))
             
             # Ensure the order meets minimum notional value
-            current_price = Decimal(str(self.last_prices.get(symbol, 0)))
+            last_price = self.market_data.get_price(symbol) if self.market_data else None
+            current_price = Decimal(str(last_price)) if last_price else Decimal('0')
             if current_price > 0 and adjusted_quantity * current_price < min_notional:
                 logger.warning(f"Order value too small for {symbol}. Adjusting to meet minimum notional.")
-                adjusted_quantity = (min_notional / current_price).quantize(
-                    Decimal('0.' + '0' * precision),
-                    rounding=ROUND_DOWN
-                )
+                if rule:
+                    adjusted_quantity = rule.adjust_quantity(min_notional / current_price, round_up=True)
+                else:
+                    adjusted_quantity = (min_notional / current_price).quantize(
+                        Decimal('0.' + '0' * precision),
+                        rounding=ROUND_DOWN
+                    )
             
             if adjusted_quantity != quantity:
                 logger.info(f"Adjusted {symbol} quantity from {quantity} to {adjusted_quantity}")
@@ -1604,7 +1850,7 @@ class BinanceClient:
             logger.error(f"Error creating TP/SL orders for {order.symbol}: {e}")
             return None, None
 
-    async def check_tp_sl_triggers(self, order: Order) -> Dict[str, bool]:
+    async def check_tp_sl_triggers(self, order: Order, snapshot: Optional[PriceSnapshot] = None) -> Dict[str, bool]:
         """Check if take profit, stop loss, or partial take profit levels have been triggered"""
         result = {'tp_triggered': False, 'sl_triggered': False, 'partial_tp_triggered': [], 'trailing_sl_updated': False}
         
@@ -1621,7 +1867,7 @@ class BinanceClient:
                 
         try:
             # Get current price
-            current_price = await self.get_current_price(order.symbol)
+            current_price = await self.get_snapshot_price(order.symbol, snapshot)
             if not current_price:
                 logger.warning(f"Failed to get current price for {order.symbol}")
                 return result
@@ -1736,14 +1982,14 @@ class BinanceClient:
         """Check connection to Binance and return status data for health checks"""
         try:
             # Test connection
-            await self.client.ping()
+            await self._call_api('ping', self.client.ping)
             
             # Get server time to verify working connection
-            time_resp = await self.client.get_server_time()
+            time_resp = await self._call_api('server_time', self.client.get_server_time)
             server_time = datetime.fromtimestamp(time_resp['serverTime']/1000)
             
             # Get account info
-            account = await self.client.get_account()
+            account = await self._call_api('account', self.client.get_account)
             balances = {
                 asset['asset']: float(asset['free']) 
                 for asset in account['balances'] 
@@ -1790,8 +2036,7 @@ class BinanceClient:
             
         try:
             # Try to get symbol ticker, which will fail if symbol is invalid
-            await self.rate_limiter.acquire()
-            await self.client.get_symbol_ticker(symbol=symbol)
+            await self._call_api('ticker_price', self.client.get_symbol_ticker, symbol=symbol)
             return True
         except BinanceAPIException as e:
             if e.code == -1121 or e.code == -1100:  # Add code -1100 for illegal character errors
@@ -1840,18 +2085,11 @@ class BinanceClient:
 
     def _get_lot_size_info(self, symbol: str) -> tuple:
         """Get lot size filter information for a symbol"""
-        min_qty = Decimal('0.00000001')  # Default values
-        max_qty = Decimal('9999999.0')
-        step_size = Decimal('0.00000001')
-        
-        if hasattr(self, 'symbol_info') and symbol in self.symbol_info:
-            for filter_data in self.symbol_info[symbol]['filters']:
-                if filter_data['filterType'] == 'LOT_SIZE':
-                    min_qty = Decimal(filter_data['minQty'])
-                    max_qty = Decimal(filter_data['maxQty'])
-                    step_size = Decimal(filter_data['stepSize'])
-                    break
+        rule = self.symbol_rules.get(symbol)
+        if rule:
+            return rule.min_qty, rule.max_qty, rule.step_size
         
-        return min_qty, max_qty, step_size
+        # Default values
+        return Decimal('0.00000001'), Decimal('9999999.0'), Decimal('0.00000001')
 
     # ...rest of existing code...
@@ -0,0 +1,222 @@
+from binance.client import AsyncClient
+from binance.streams import BinanceSocketManager
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from ..types.constants import (
+    PRICE_STREAM_STALE_SECONDS, PRICE_STREAM_RECONNECT_DELAY, PRICE_STREAM_MAX_RECONNECT_DELAY
+)
+
+logger = logging.getLogger(__name__)
+
+class PriceSnapshot:
+    """Prices for many symbols captured at one point in time"""
+    __slots__ = ('prices', 'timestamp', 'source', 'complete')
+
+    def __init__(self, prices: Dict[str, float], timestamp: Optional[float] = None,
+                 source: str = 'rest', complete: bool = True):
+        self.prices = prices
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.source = source
+        # complete snapshots hold every exchange symbol, stream ones only the subscribed set
+        self.complete = complete
+
+    def get(self, symbol: str, default: Optional[float] = None) -> Optional[float]:
+        return self.prices.get(symbol, default)
+
+    def age(self) -> float:
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.timestamp
+
+    def is_fresh(self, max_age: float) -> bool:
+        return self.age() <= max_age
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.prices
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_tickers(cls, tickers) -> 'PriceSnapshot':
+        """Build a snapshot from an all-symbols /ticker/price response"""
+        return cls({t['symbol']: float(t['price']) for t in tickers}, source='rest', complete=True)
+
+class MarketDataFeed:
+    """Keeps the latest price per symbol in memory from Binance miniTicker streams"""
+
+    def __init__(self, client: AsyncClient, stale_after: float = PRICE_STREAM_STALE_SECONDS,
+                 use_all_market_stream: bool = False, call_api=None):
+        self.client = client
+        self.call_api = call_api  # Rate limited request wrapper from BinanceClient
+        self.stale_after = stale_after
+        self.use_all_market_stream = use_all_market_stream
+        self.symbols: Set[str] = set()
+        # symbol -> (price, receive time)
+        self.prices: Dict[str, Tuple[float, float]] = {}
+        self.connected = False
+        self.last_message_at = 0.0
+        self.running = False
+        self.task = None
+        self._resubscribe = asyncio.Event()
+        self.price_listeners: List[Callable] = []
+
+    async def start(self, symbols: Iterable[str]):
+        """Start streaming prices for the given symbols"""
+        if self.running:
+            self.update_symbols(symbols)
+            return
+        self.symbols = {s.upper() for s in symbols}
+        self.running = True
+        # Seed prices before the first stream message arrives
+        await self._gap_fill()
+        self.task = asyncio.create_task(self._run())
+        logger.info(f"[FEED] Market data feed started for {len(self.symbols)} symbols")
+
+    async def stop(self):
+        """Stop streaming and wait for the stream task to exit"""
+        self.running = False
+        self._resubscribe.set()
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.connected = False
+        logger.info("[FEED] Market data feed stopped")
+
+    def update_symbols(self, symbols: Iterable[str]):
+        """Change the subscribed symbol set, reconnecting only if it changed"""
+        new_symbols = {s.upper() for s in symbols}
+        if new_symbols == self.symbols:
+            return
+        added = new_symbols - self.symbols
+        self.symbols = new_symbols
+        logger.info(f"[FEED] Symbol set changed ({len(new_symbols)} symbols, {len(added)} new), resubscribing")
+        if not self.use_all_market_stream:
+            self._resubscribe.set()
+
+    def add_price_listener(self, callback: Callable):
+        """Register a callback receiving (symbol, price) for every price update"""
+        self.price_listeners.append(callback)
+
+    def _notify(self, symbol: str, price: float):
+        for listener in self.price_listeners:
+            try:
+                listener(symbol, price)
+            except Exception as e:
+                logger.error(f"[FEED] Price listener failed: {e}")
+
+    def get_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Return the streamed price if it is fresher than max_age seconds"""
+        entry = self.prices.get(symbol)
+        if entry is None:
+            return None
+        price, received_at = entry
+        if time.time() - received_at > (max_age if max_age is not None else self.stale_after):
+            return None
+        return price
+
+    def snapshot(self) -> PriceSnapshot:
+        """Snapshot of all streamed prices that are not stale"""
+        now = time.time()
+        prices = {
+            symbol: price for symbol, (price, received_at) in self.prices.items()
+            if now - received_at <= self.stale_after
+        }
+        return PriceSnapshot(prices, timestamp=now, source='stream', complete=False)
+
+    def is_healthy(self) -> bool:
+        """True while the stream is connected and delivering messages"""
+        return self.connected and time.time() - self.last_message_at <= self.stale_after
+
+    def _streams(self):
+        return [f"{symbol.lower()}@miniTicker" for symbol in sorted(self.symbols)]
+
+    def _open_socket(self, manager: BinanceSocketManager):
+        if self.use_all_market_stream:
+            return manager.miniticker_socket()
+        return manager.multiplex_socket(self._streams())
+
+    async def _run(self):
+        """Stream loop with reconnect backoff and REST gap-fill"""
+        delay = PRICE_STREAM_RECONNECT_DELAY
+        manager = BinanceSocketManager(self.client)
+        while self.running:
+            if not self.symbols and not self.use_all_market_stream:
+                # Nothing to subscribe to yet
+                self._resubscribe.clear()
+                await self._resubscribe.wait()
+                continue
+            try:
+                self._resubscribe.clear()
+                async with self._open_socket(manager) as stream:
+                    self.connected = True
+                    delay = PRICE_STREAM_RECONNECT_DELAY
+                    logger.info("[FEED] Connected to miniTicker stream")
+                    # Waited on with every recv so a new symbol set applies without waiting for a message
+                    resubscribe = asyncio.ensure_future(self._resubscribe.wait())
+                    receive = None
+                    try:
+                        while self.running:
+                            receive = asyncio.ensure_future(stream.recv())
+                            await asyncio.wait({receive, resubscribe}, return_when=asyncio.FIRST_COMPLETED)
+                            if not receive.done():
+                                break
+                            message = receive.result()
+                            if not message:
+                                continue
+                            if isinstance(message, dict) and message.get('e') == 'error':
+                                raise ConnectionError(message.get('m', 'stream error'))
+                            self._handle_message(message)
+                    finally:
+                        resubscribe.cancel()
+                        if receive is not None:
+                            receive.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[FEED] Stream disconnected: {e}. Reconnecting in {delay}s")
+                self.connected = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, PRICE_STREAM_MAX_RECONNECT_DELAY)
+                # Fill whatever we missed while disconnected
+                await self._gap_fill()
+            finally:
+                self.connected = False
+
+    def _handle_message(self, message):
+        """Apply a combined-stream or all-market miniTicker payload"""
+        data = message.get('data', message) if isinstance(message, dict) else message
+        tickers = data if isinstance(data, list) else [data]
+        now = time.time()
+        for ticker in tickers:
+            symbol = ticker.get('s')
+            if not symbol or 'c' not in ticker:
+                continue
+            if self.use_all_market_stream and symbol not in self.symbols:
+                continue
+            price = float(ticker['c'])
+            self.prices[symbol] = (price, now)
+            self._notify(symbol, price)
+        self.last_message_at = now
+
+    async def _gap_fill(self):
+        """Refresh all tracked prices with a single REST ticker call"""
+        try:
+            if self.call_api:
+                tickers = await self.call_api('ticker_price_all', self.client.get_all_tickers)
+            else:
+                tickers = await self.client.get_all_tickers()
+            now = time.time()
+            for ticker in tickers:
+                if ticker['symbol'] in self.symbols:
+                    price = float(ticker['price'])
+                    self.prices[ticker['symbol']] = (price, now)
+                    self._notify(ticker['symbol'], price)
+            logger.debug(f"[FEED] Gap-filled {len(self.symbols)} symbols from REST")
+        except Exception as e:
+            logger.error(f"[FEED] REST gap-fill failed: {e}")
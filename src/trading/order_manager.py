@@ -1,13 +1,18 @@
 import asyncio
+import contextvars
 import logging
 import time  # Add this import
 import os
 import platform
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from decimal import Decimal  # Add the missing Decimal import
 from ..types.models import Order, OrderStatus, TimeFrame, TPSLStatus, OrderType
+from ..types.constants import ORDER_RECONCILE_SECONDS, ORDER_RECONCILE_FALLBACK_SECONDS, ENDPOINT_WEIGHTS, MAX_CONCURRENT_SYMBOLS, TP_SL_RESYNC_SECONDS, TRAILING_SL_SAVE_SECONDS
+from ..utils.logger import buffered_logs
 from ..trading.binance_client import BinanceClient
+from ..trading.market_data_feed import PriceSnapshot
+from ..trading.trigger_book import TriggerBook
 from ..database.mongo_client import MongoClient
 from ..telegram.bot import TelegramBot
 
@@ -23,6 +28,18 @@ class OrderManager:
         self.running = False
         self.monitor_task = None
         self.check_interval = 60  # 60 seconds between checks
+        self.last_order_reconcile = 0.0
+        self.orders_in_flight = set()  # Order IDs whose status change is being handled
+        self.event_tasks = set()
+        self.trigger_book = TriggerBook()  # TP/SL levels checked on every streamed price
+        self.tp_sl_in_flight = set()  # Order IDs whose TP/SL check is running
+        self.trailing_saved_at: Dict[str, float] = {}  # Order ID -> time.monotonic() of the last trailing stop save
+        self.trailing_unsaved: Dict[str, Order] = {}  # Trailing stops moved in memory but not yet saved
+        
+        # Concurrent symbol evaluation
+        self.max_concurrent_symbols = int(config['trading'].get('max_concurrent_symbols', MAX_CONCURRENT_SYMBOLS))
+        self.symbol_locks: Dict[str, asyncio.Lock] = {}
+        self.order_placement_lock = asyncio.Lock()  # Keeps reserve checks and placements atomic
         logger.setLevel(logging.DEBUG)  # Add this line
         
         # Check if running in Docker environment
@@ -39,6 +56,14 @@ class OrderManager:
         # Add TP/SL monitoring task - use the proper long-running task
         self.tp_sl_task = asyncio.create_task(self.start_monitor_tp_sl())
         
+        # Receive fills and cancels pushed by the user data stream
+        if self.binance_client.account_state:
+            self.binance_client.account_state.add_execution_listener(self.handle_execution_report)
+        
+        # Check TP/SL levels as prices stream in
+        if self.binance_client.market_data:
+            self.binance_client.market_data.add_price_listener(self._on_price)
+        
         return self.monitor_task  # Return the main monitoring task
         
     async def stop(self):
@@ -59,12 +84,14 @@ class OrderManager:
                 await self.tp_sl_task
             except asyncio.CancelledError:
                 pass
+        
+        await self._flush_trailing_updates()
             
     async def check_connection_health(self):
         """Check if all connections are healthy"""
         try:
             # Check Binance connection
-            await self.binance_client.client.ping()
+            await self.binance_client._call_api('ping', self.binance_client.client.ping)
             
             # Check MongoDB connection
             await self.mongo_client.db.command('ping')
@@ -74,8 +101,8 @@ class OrderManager:
             logger.error(f"Health check failed: {e}")
             return False
             
-    async def process_symbol(self, symbol: str):
-        """Process a single symbol for threshold checking"""
+    async def process_symbol(self, symbol: str, snapshot=None, crossings=None, triggered_at=None):
+        """Process a single symbol, placing orders for its (timeframe, threshold) crossings"""
         try:
             # Skip if the symbol was removed during this cycle
             if hasattr(self.binance_client, 'removed_symbols_this_cycle') and symbol in self.binance_client.removed_symbols_this_cycle:
@@ -93,7 +120,7 @@ class OrderManager:
                 return
             
             # Get current price
-            current_price = await self.binance_client.get_current_price(symbol)
+            current_price = await self.binance_client.get_snapshot_price(symbol, snapshot)
             
             # Check if price is None (could happen with invalid symbols)
             if current_price is None:
@@ -109,50 +136,68 @@ class OrderManager:
             if not has_enough_balance:
                 logger.warning(f"Insufficient balance for orders. Current balance below required amount.")
                 
-            # Check thresholds for each timeframe
-            for timeframe in TimeFrame:
-                logger.info(f"Checking {timeframe.value} timeframe...")
+            # Without crossings from the threshold engine, check each timeframe directly
+            if crossings is None:
+                crossings = []
+                for timeframe in TimeFrame:
+                    logger.info(f"Checking {timeframe.value} timeframe...")
+                    for threshold in await self.binance_client.check_thresholds(symbol, timeframe, snapshot):
+                        crossings.append((timeframe, threshold))
+                        triggered_at = triggered_at or time.perf_counter()
                 
-                # Get triggered thresholds
-                triggered_thresholds = await self.binance_client.check_thresholds(symbol, timeframe)
+            # Process each triggered threshold
+            for timeframe, threshold in crossings:
+                logger.info(f"🎯 Processing trigger: {symbol} {threshold}% on {timeframe.value}")
                 
-                # Process each triggered threshold
-                for threshold in triggered_thresholds:
-                    logger.info(f"🎯 Processing trigger: {symbol} {threshold}% on {timeframe.value}")
-                    
-                    # Skip order placement if balance is insufficient
-                    if not has_enough_balance:
-                        logger.warning(f"Skipping order for {symbol} at threshold {threshold}% due to insufficient balance")
-                        continue
-                    
-                    # Attempt to place an order for this threshold
-                    try:
+                # Skip order placement if balance is insufficient
+                if not has_enough_balance:
+                    logger.warning(f"Skipping order for {symbol} at threshold {threshold}% due to insufficient balance")
+                    continue
+                
+                # Attempt to place an order for this threshold
+                try:
+                    # One placement at a time so parallel symbols cannot overdraw the reserve
+                    async with self.order_placement_lock:
+                        # A crossing handed over twice must not place a second order
+                        period_start = datetime.fromtimestamp(
+                            await self.binance_client.get_reference_timestamp(timeframe) / 1000
+                        )
+                        if await self.mongo_client.has_threshold_order(symbol, timeframe, threshold, period_start):
+                            logger.info(f"Order for {symbol} {threshold}% on {timeframe.value} already placed, skipping")
+                            continue
+                        
+                        # Price, rules, balances and position from local state, create_order is the only request
+                        context = await self.binance_client.build_pre_trade_context(symbol, snapshot, triggered_at)
+                        
                         # Place buy order
                         order = await self.binance_client.place_limit_buy_order(
                             symbol=symbol,
                             amount=order_amount,
                             threshold=threshold,
-                            timeframe=timeframe
-                        )
+                            timeframe=timeframe,
+                            snapshot=snapshot,
+                            context=context
+                        ) if context else None
                         
                         if order:
                             # Save order to database
                             await self.mongo_client.insert_order(order)
+                    
+                    if order:
+                        # Send notification
+                        if self.telegram_bot:
+                            await self.telegram_bot.send_order_notification(order)
                             
-                            # Send notification
-                            if self.telegram_bot:
-                                await self.telegram_bot.send_order_notification(order)
-                                
-                            logger.info(f"Created buy order for {symbol} at threshold {threshold}%")
-                        else:
-                            logger.error(f"Failed to create buy order for {symbol} at threshold {threshold}%")
-                    except Exception as e:
-                        error_msg = str(e)
-                        if "Filter failure: LOT_SIZE" in error_msg:
-                            logger.warning(f"LOT_SIZE issue for {symbol}: Order quantity doesn't meet exchange requirements. Skipping this threshold.")
-                            # Optionally, you could mark this symbol as problematic in your database
-                        else:
-                            logger.error(f"Error placing order for {symbol} at threshold {threshold}%: {e}")
+                        logger.info(f"Created buy order for {symbol} at threshold {threshold}%")
+                    else:
+                        logger.error(f"Failed to create buy order for {symbol} at threshold {threshold}%")
+                except Exception as e:
+                    error_msg = str(e)
+                    if "Filter failure: LOT_SIZE" in error_msg:
+                        logger.warning(f"LOT_SIZE issue for {symbol}: Order quantity doesn't meet exchange requirements. Skipping this threshold.")
+                        # Optionally, you could mark this symbol as problematic in your database
+                    else:
+                        logger.error(f"Error placing order for {symbol} at threshold {threshold}%: {e}")
                         
         except Exception as e:
             logger.error(f"Error processing {symbol}: {e}")
@@ -224,18 +269,22 @@ class OrderManager:
                         valid_symbols = [s for s in configured_symbols if s not in self.binance_client.invalid_symbols]
                         logger.info(f"Processing {len(valid_symbols)} trading symbols from config (fallback)")
                     
-                    # Process symbols sequentially to maintain log order
-                    for symbol in valid_symbols:
-                        await self.process_symbol(symbol)
-                        await asyncio.sleep(0.5)  # Small delay between symbols
+                    # Keep the price stream subscribed to the current symbol set
+                    if self.binance_client.market_data:
+                        self.binance_client.market_data.update_symbols(valid_symbols)
+                    self.binance_client.symbol_rules.track(valid_symbols)
+                    
+                    # One price snapshot for the whole cycle instead of a ticker call per symbol
+                    snapshot = await self.binance_client.refresh_price_snapshot()
+                    
+                    # Evaluate symbols concurrently, logs stay grouped per symbol
+                    await self.evaluate_symbols(valid_symbols, snapshot)
 
                     logger.info("\nCompleted price check cycle")
                     logger.info("="*50)
 
-                    # Only check orders if there are pending ones
-                    pending_count = await self.mongo_client.orders.count_documents(
-                        {"status": OrderStatus.PENDING.value}
-                    )
+                    # Only check orders if there are pending ones (fills arrive via executionReport)
+                    pending_count = await self.mongo_client.count_pending_orders()
                     
                     if pending_count > 0:
                         logger.info(f"\nFound {pending_count} pending orders...")
@@ -257,6 +306,43 @@ class OrderManager:
                 logger.error(f"Error in monitoring: {e}", exc_info=True)
                 await asyncio.sleep(10)
             
+    async def _evaluate_symbol(self, symbol: str, snapshot, semaphore: asyncio.Semaphore, crossings=None,
+                               triggered_at=None):
+        """Process one symbol under the concurrency limit and its own lock
+
+        Crossings are already marked triggered, so they wait for the lock instead of being dropped.
+        """
+        lock = self.symbol_locks.setdefault(symbol, asyncio.Lock())
+        async with semaphore:
+            if lock.locked() and not crossings:
+                logger.debug(f"{symbol} is still being processed, skipping")
+                return
+            async with lock:
+                with buffered_logs():
+                    await self.process_symbol(symbol, snapshot, crossings, triggered_at)
+
+    async def evaluate_symbols(self, symbols: List[str], snapshot=None):
+        """Run process_symbol across symbols with bounded concurrency"""
+        started = time.perf_counter()
+        if snapshot is None:
+            snapshot = await self.binance_client.get_price_snapshot()
+        
+        # All thresholds of the whole universe in one vectorized pass
+        crossings = {symbol: [] for symbol in symbols}
+        for crossing in await self.binance_client.evaluate_thresholds(symbols, snapshot):
+            crossings.setdefault(crossing.symbol, []).append((crossing.timeframe, crossing.threshold))
+        triggered_at = time.perf_counter()  # Start of trigger-to-ack latency
+        
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_symbols))
+        results = await asyncio.gather(
+            *(self._evaluate_symbol(symbol, snapshot, semaphore, crossings[symbol], triggered_at) for symbol in symbols),
+            return_exceptions=True
+        )
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {symbol}: {result}")
+        logger.info(f"Evaluated {len(symbols)} symbols in {time.perf_counter() - started:.2f}s")
+
     async def create_order(self, symbol: str, timeframe: TimeFrame, threshold: float):
         """Create and store a new order"""
         try:
@@ -273,64 +359,146 @@ class OrderManager:
         except Exception as e:
             logger.error(f"Failed to create order: {e}")
             
+    def handle_execution_report(self, event: dict):
+        """User data stream callback: hand final order states to the status handler"""
+        status_map = {
+            'FILLED': OrderStatus.FILLED,
+            'CANCELED': OrderStatus.CANCELLED,
+            'REJECTED': OrderStatus.CANCELLED,
+            'EXPIRED': OrderStatus.CANCELLED
+        }
+        status = status_map.get(event.get('X'))
+        if not status:
+            return
+        task = asyncio.create_task(self._process_execution_report(str(event['i']), status), context=contextvars.Context())
+        self.event_tasks.add(task)
+        task.add_done_callback(self.event_tasks.discard)
+
+    async def _process_execution_report(self, order_id: str, status: OrderStatus):
+        """Apply a pushed fill or cancel to the stored order"""
+        try:
+            # The fill can arrive before the new order has been written to the database
+            order = None
+            for _ in range(5):
+                order = await self.mongo_client.get_order(order_id)
+                if order:
+                    break
+                await asyncio.sleep(1)
+            
+            if not order:
+                logger.debug(f"executionReport for unknown order {order_id}, leaving it to reconciliation")
+                return
+            if order.status != OrderStatus.PENDING:
+                return
+                
+            logger.info(f"Order {order_id} for {order.symbol} {status.value} (user data stream)")
+            await self._apply_order_status(order, status)
+        except Exception as e:
+            logger.error(f"Error processing execution report for {order_id}: {e}", exc_info=True)
+
+    async def _apply_order_status(self, order: Order, status: OrderStatus):
+        """Handle a pending order becoming FILLED or CANCELLED"""
+        if order.order_id in self.orders_in_flight:
+            return
+        self.orders_in_flight.add(order.order_id)
+        try:
+            order.status = status
+            if status == OrderStatus.FILLED:
+                order.filled_at = datetime.utcnow()
+                # Only the first path to see the fill (stream or reconciliation) continues
+                if not await self.mongo_client.update_order_status(
+                    order.order_id, status, filled_at=order.filled_at,
+                    expected_status=OrderStatus.PENDING
+                ):
+                    return
+                
+                # Check balance changes
+                balance_change = await self.binance_client.get_balance_changes()
+                if balance_change:
+                    order.balance_change = balance_change
+                    await self.telegram_bot.send_balance_update(
+                        order.symbol, balance_change
+                    )
+                
+                # Create TP/SL orders if configured
+                await self.binance_client.create_tp_sl_orders(order)
+                # Update order in database with TP/SL information
+                await self.mongo_client.insert_order(order)
+                self.trigger_book.add(order)
+                await self.mongo_client.add_filled_order_to_totals(order)
+                if self.binance_client.position_ledger:
+                    self.binance_client.position_ledger.sync_order(order)
+                
+                # Send only ROAR notification for filled orders
+                await self.telegram_bot.send_roar(order)
+                
+            elif status == OrderStatus.CANCELLED:
+                order.cancelled_at = datetime.utcnow()
+                if not await self.mongo_client.update_order_status(
+                    order.order_id, status, cancelled_at=order.cancelled_at,
+                    expected_status=OrderStatus.PENDING
+                ):
+                    return
+                # Send notification only for cancelled orders
+                await self.telegram_bot.send_order_notification(order)
+        finally:
+            self.orders_in_flight.discard(order.order_id)
+
+    def _order_reconcile_due(self) -> bool:
+        """Poll order status every minute without the stream, rarely with it"""
+        account_state = self.binance_client.account_state
+        interval = ORDER_RECONCILE_SECONDS if account_state and account_state.connected else ORDER_RECONCILE_FALLBACK_SECONDS
+        return time.time() - self.last_order_reconcile >= interval
+
+    @staticmethod
+    def _bulk_reconcile_cheaper(pending_count: int) -> bool:
+        """Whether one account + open orders snapshot weighs less than get_order per pending order"""
+        bulk_weight = ENDPOINT_WEIGHTS['account'] + ENDPOINT_WEIGHTS['open_orders_all']
+        return pending_count * ENDPOINT_WEIGHTS['get_order'] >= bulk_weight
+
     async def monitor_orders(self):
-        """Monitor and update status of pending orders"""
+        """Cancel expired orders and reconcile pending order status"""
         try:
             pending_orders = await self.mongo_client.get_pending_orders()
             cancel_after = timedelta(hours=self.config['trading']['cancel_after_hours'])
             
+            # Bulk reconciliation: one open-orders snapshot instead of get_order per order,
+            # unless so few orders are pending that looking each up weighs less
+            reconcile = self._order_reconcile_due()
+            open_order_ids = None
+            if reconcile:
+                self.last_order_reconcile = time.time()
+                account_state = self.binance_client.account_state
+                if (account_state and self._bulk_reconcile_cheaper(len(pending_orders))
+                        and await account_state.reconcile()):
+                    open_order_ids = set(account_state.open_orders)
+            
             for order in pending_orders:
                 # Check if order should be cancelled due to time
                 if datetime.utcnow() - order.created_at > cancel_after:
                     if await self.binance_client.cancel_order(order.symbol, order.order_id):
-                        order.status = OrderStatus.CANCELLED
-                        order.cancelled_at = datetime.utcnow()
-                        await self.mongo_client.update_order_status(
-                            order.order_id, order.status, cancelled_at=order.cancelled_at
-                        )
-                        await self.telegram_bot.send_order_notification(order)
+                        await self._apply_order_status(order, OrderStatus.CANCELLED)
                         continue
                 
+                if not reconcile:
+                    continue
+                    
+                # Orders still resting on the book need no individual lookup
+                if open_order_ids is not None and order.order_id in open_order_ids:
+                    continue
+                
                 # Check current order status
                 status = await self.binance_client.check_order_status(
                     order.symbol, order.order_id
                 )
                 
                 if status and status != order.status:
-                    order.status = status
-                    if status == OrderStatus.FILLED:
-                        order.filled_at = datetime.utcnow()
-                        await self.mongo_client.update_order_status(
-                            order.order_id, status, filled_at=order.filled_at
-                        )
-                        
-                        # Check balance changes
-                        balance_change = await self.binance_client.get_balance_changes()
-                        if balance_change:
-                            order.balance_change = balance_change
-                            await self.telegram_bot.send_balance_update(
-                                order.symbol, balance_change
-                            )
-                        
-                        # Create TP/SL orders if configured
-                        await self.binance_client.create_tp_sl_orders(order)
-                        # Update order in database with TP/SL information
-                        await self.mongo_client.insert_order(order)
-                        
-                        # Send only ROAR notification for filled orders
-                        await self.telegram_bot.send_roar(order)
-                        
-                    elif status == OrderStatus.CANCELLED:
-                        order.cancelled_at = datetime.utcnow()
-                        await self.mongo_client.update_order_status(
-                            order.order_id, status, cancelled_at=order.cancelled_at
-                        )
-                        # Send notification only for cancelled orders
-                        await self.telegram_bot.send_order_notification(order)
+                    await self._apply_order_status(order, status)
 
             # Add delay after order checks if there were orders
-            await asyncio.sleep(3)
-            os.system(self.clear_command)
+            if reconcile:
+                await asyncio.sleep(3)
+                os.system(self.clear_command)
 
         except Exception as e:
             logger.error(f"Error monitoring orders: {e}", exc_info=True)
@@ -338,33 +506,9 @@ class OrderManager:
     async def calculate_invested_amount(self) -> Decimal:
         """Calculate the total amount currently invested"""
         try:
-            # Get sum of all filled orders that haven't been sold yet
-            pipeline = [
-                {"$match": {"status": OrderStatus.FILLED.value}},
-                {"$group": {
-                    "_id": "$symbol",
-                    "total_invested": {
-                        "$sum": {
-                            "$multiply": [
-                                {"$toDecimal": "$price"},
-                                {"$toDecimal": "$quantity"}
-                            ]
-                        }
-                    }
-                }},
-                {"$group": {
-                    "_id": None,
-                    "grand_total": {"$sum": "$total_invested"}
-                }}
-            ]
-            
-            # Update to proper cursor handling for async
-            cursor = self.mongo_client.orders.aggregate(pipeline)
-            result = await cursor.to_list(length=1)
-            
-            if result and len(result) > 0:
-                return Decimal(str(result[0]["grand_total"]))
-            return Decimal('0')
+            # Maintained incrementally on every fill
+            totals = await self.mongo_client.get_portfolio_totals()
+            return totals["invested"]
             
         except Exception as e:
             logger.error(f"Error calculating invested amount: {e}")
@@ -395,18 +539,15 @@ class OrderManager:
             # Check timeframe resets first - ensure this runs before other trading operations
             await self._check_timeframe_resets()
             
+            # Take one price snapshot for the cycle
+            snapshot = await self.binance_client.refresh_price_snapshot()
+            
             # Process each trading pair
-            for symbol in self.config['trading']['pairs']:
-                if not self.running:
-                    break
-                    
-                # Process the symbol
-                await self.process_symbol(symbol)
+            if self.running:
+                await self.evaluate_symbols(self.config['trading']['pairs'], snapshot)
                 
             # Check pending orders
-            pending_count = await self.mongo_client.orders.count_documents(
-                {"status": OrderStatus.PENDING.value}
-            )
+            pending_count = await self.mongo_client.count_pending_orders()
             
             if pending_count > 0:
                 logger.info(f"Found {pending_count} pending orders, checking status...")
@@ -418,113 +559,176 @@ class OrderManager:
     async def monitor_tp_sl(self):
         """Monitor take profit and stop loss triggers"""
         try:
+            # Save throttled trailing stop moves first, the load below must not undo them
+            await self._flush_trailing_updates()
+            
             # Get active orders
+            loaded_at = time.monotonic()
             orders = await self.mongo_client.get_active_orders()
             
-            for order in orders:
-                # Skip unsupported order types
-                if not order.order_type in [OrderType.MARKET, OrderType.LIMIT]:
-                    continue
-                    
-                # Check if TP or SL is triggered
-                triggers = await self.binance_client.check_tp_sl_triggers(order)
-                tp_triggered = triggers.get('tp_triggered', False)
-                sl_triggered = triggers.get('sl_triggered', False)
-                partial_tp_triggered = triggers.get('partial_tp_triggered', [])
-                trailing_sl_updated = triggers.get('trailing_sl_updated', False)
-                
-                updates = {}
-                database_updated = False
-                
-                # Update order if take profit triggered
-                if tp_triggered and order.take_profit:
-                    updates['take_profit.status'] = TPSLStatus.TRIGGERED
-                    updates['take_profit.triggered_at'] = order.take_profit.triggered_at
-                    
-                    # Send notification
-                    try:
-                        if self.telegram_bot:
-                            await self.telegram_bot.send_tp_notification(order, order.take_profit)
-                    except Exception as e:
-                        logger.error(f"Error sending TP notification: {e}")
-                
-                # Update order if stop loss triggered
-                if sl_triggered and order.stop_loss:
-                    updates['stop_loss.status'] = TPSLStatus.TRIGGERED
-                    updates['stop_loss.triggered_at'] = order.stop_loss.triggered_at
-                    
-                    # Send notification
-                    try:
-                        if self.telegram_bot:
-                            await self.telegram_bot.send_sl_notification(order, order.stop_loss)
-                    except Exception as e:
-                        logger.error(f"Error sending SL notification: {e}")
-                
-                # Apply updates to take profit or stop loss if needed
-                if updates:
-                    try:
-                        for field, value in updates.items():
-                            await self.mongo_client.update_order_field(order.order_id, field, value)
-                        database_updated = True
-                    except Exception as e:
-                        logger.error(f"Error updating order {order.order_id} fields: {e}")
-                
-                # Handle partial take profits triggered
-                if partial_tp_triggered:
-                    # Update the partial take profits objects in memory
-                    for level in partial_tp_triggered:
-                        for pt in order.partial_take_profits:
-                            if pt.level == level and pt.status != TPSLStatus.TRIGGERED:
-                                pt.status = TPSLStatus.TRIGGERED
-                                pt.triggered_at = datetime.utcnow()
-                                
-                                # Send notification
-                                try:
-                                    if self.telegram_bot:
-                                        await self.telegram_bot.send_partial_tp_notification(order, pt)
-                                except Exception as e:
-                                    logger.error(f"Error sending partial TP notification: {e}")
-                    
-                    # Update partial take profits in the database
-                    try:
-                        await self.mongo_client.update_partial_take_profits(order.order_id, order.partial_take_profits)
-                        database_updated = True
-                    except Exception as e:
-                        logger.error(f"Error updating partial take profits for order {order.order_id}: {e}")
-                
-                # Update trailing stop loss if moved
-                if trailing_sl_updated and order.trailing_stop_loss:
-                    try:
-                        await self.mongo_client.update_trailing_stop_loss(order.order_id, order.trailing_stop_loss)
-                        database_updated = True
+            # Read all prices for this pass from one snapshot
+            snapshot = await self.binance_client.get_price_snapshot() if orders else None
+            
+            checked = []
+            changes = []
+            try:
+                for order in orders:
+                    # Skip unsupported order types
+                    if not order.order_type in [OrderType.MARKET, OrderType.LIMIT]:
+                        continue
                         
-                        # Send trailing stop loss update notification
-                        if self.telegram_bot:
-                            await self.telegram_bot.send_trailing_sl_update_notification(order, order.trailing_stop_loss)
-                    except Exception as e:
-                        logger.error(f"Error updating trailing stop loss for order {order.order_id}: {e}")
+                    # Skip orders the price stream handled since they were loaded
+                    if (order.order_id in self.tp_sl_in_flight or
+                            self.trigger_book.added_at.get(order.order_id, 0.0) > loaded_at):
+                        continue
+                        
+                    # Check if TP or SL is triggered
+                    self.tp_sl_in_flight.add(order.order_id)
+                    checked.append(order.order_id)
+                    triggers = await self.binance_client.check_tp_sl_triggers(order, snapshot)
+                    changes.append((order, triggers))
                 
-                # If no other updates were done but we still have changes, update the whole order
-                if not database_updated and (tp_triggered or sl_triggered or partial_tp_triggered or trailing_sl_updated):
-                    try:
-                        await self.mongo_client.insert_order(order)
-                    except Exception as e:
-                        logger.error(f"Error updating order {order.order_id}: {e}")
+                # Write every change of this pass at once
+                await self._apply_tp_sl_triggers(changes)
+            finally:
+                self.tp_sl_in_flight.difference_update(checked)
+            
+            # Re-index the trigger book from the database
+            self.trigger_book.sync(
+                [o for o in orders if o.order_type in [OrderType.MARKET, OrderType.LIMIT]], loaded_at
+            )
                         
         except Exception as e:
             logger.error(f"Error monitoring TP/SL: {e}")
             return None
 
+    async def _apply_tp_sl_triggers(self, changes: List[Tuple[Order, Dict[str, Any]]]) -> Dict[str, bool]:
+        """Persist check_tp_sl_triggers results with one bulk write, notifying only for the orders saved"""
+        changes = [
+            (order, triggers) for order, triggers in changes
+            if (triggers.get('tp_triggered') or triggers.get('sl_triggered') or
+                triggers.get('partial_tp_triggered') or triggers.get('trailing_sl_updated'))
+        ]
+        if not changes:
+            return {}
+            
+        saved = await self.mongo_client.bulk_update_tp_sl(changes)
+        ledger = self.binance_client.position_ledger
+        now = time.monotonic()
+        
+        for order, triggers in changes:
+            if not saved.get(order.order_id):
+                logger.error(f"TP/SL changes for order {order.order_id} were not saved, skipping notifications")
+                continue
+                
+            # Saved with the current trailing stop, earlier unsaved moves included
+            self.trailing_unsaved.pop(order.order_id, None)
+            if triggers.get('trailing_sl_updated'):
+                self.trailing_saved_at[order.order_id] = now
+            
+            tp_triggered = triggers.get('tp_triggered', False)
+            sl_triggered = triggers.get('sl_triggered', False)
+            partial_tp_triggered = triggers.get('partial_tp_triggered', [])
+            
+            # Exits shrink the open position
+            if (tp_triggered or sl_triggered or partial_tp_triggered) and ledger:
+                ledger.sync_order(order)
+                
+            if not self.telegram_bot:
+                continue
+                
+            try:
+                if tp_triggered and order.take_profit:
+                    await self.telegram_bot.send_tp_notification(order, order.take_profit)
+                if sl_triggered and order.stop_loss and order.stop_loss.status == TPSLStatus.TRIGGERED:
+                    await self.telegram_bot.send_sl_notification(order, order.stop_loss)
+                for pt in order.partial_take_profits or []:
+                    if pt.level in partial_tp_triggered:
+                        await self.telegram_bot.send_partial_tp_notification(order, pt)
+                if triggers.get('trailing_sl_updated') and order.trailing_stop_loss:
+                    await self.telegram_bot.send_trailing_sl_update_notification(order, order.trailing_stop_loss)
+            except Exception as e:
+                logger.error(f"Error sending TP/SL notification for order {order.order_id}: {e}")
+                
+        return saved
+
+    def _defer_trailing_update(self, order: Order, triggers: Dict[str, Any]) -> bool:
+        """Keep a streamed trailing stop move in memory if the order's stop was saved recently
+
+        TP, SL and partial TP triggers are never deferred.
+        """
+        if not triggers.get('trailing_sl_updated') or any(
+                triggers.get(key) for key in ('tp_triggered', 'sl_triggered', 'partial_tp_triggered')):
+            return False
+        if time.monotonic() - self.trailing_saved_at.get(order.order_id, 0.0) >= TRAILING_SL_SAVE_SECONDS:
+            return False
+        self.trailing_unsaved[order.order_id] = order
+        return True
+
+    async def _flush_trailing_updates(self):
+        """Save and notify the trailing stop moves deferred by _defer_trailing_update"""
+        if not self.trailing_unsaved:
+            return
+        pending = [
+            order for order_id, order in self.trailing_unsaved.items()
+            if order_id not in self.tp_sl_in_flight
+        ]
+        if not pending:
+            return
+        try:
+            saved = await self._apply_tp_sl_triggers([(order, {'trailing_sl_updated': True}) for order in pending])
+            for order in pending:
+                if not saved.get(order.order_id):
+                    # Let the resync take the database state
+                    self.trailing_unsaved.pop(order.order_id, None)
+                    self.trigger_book.forget(order.order_id)
+        except Exception as e:
+            logger.error(f"Error saving trailing stop updates: {e}")
+
+    def _on_price(self, symbol: str, price: float):
+        """Price feed listener, checks only orders whose TP/SL levels were crossed"""
+        if not self.running or (self.telegram_bot and self.telegram_bot.is_paused):
+            return
+        for order in self.trigger_book.on_price(symbol, price):
+            if order.order_id in self.tp_sl_in_flight:
+                # Already being checked, it is indexed again when that finishes
+                continue
+            self.tp_sl_in_flight.add(order.order_id)
+            task = asyncio.create_task(self._check_tp_sl_order(order, price), context=contextvars.Context())
+            self.event_tasks.add(task)
+            task.add_done_callback(self.event_tasks.discard)
+
+    async def _check_tp_sl_order(self, order: Order, price: float):
+        """Run the TP/SL checks for one order at a streamed price"""
+        try:
+            snapshot = PriceSnapshot({order.symbol: price}, source='stream', complete=False)
+            triggers = await self.binance_client.check_tp_sl_triggers(order, snapshot)
+            # A deferred trailing move is still indexed below, it is saved later
+            saved = {} if self._defer_trailing_update(order, triggers) else \
+                await self._apply_tp_sl_triggers([(order, triggers)])
+            if order.order_id in saved and not saved[order.order_id]:
+                # In-memory state is ahead of the database, the next full pass retries from there
+                self.trigger_book.forget(order.order_id)
+                return
+        except Exception as e:
+            logger.error(f"Error checking TP/SL for order {order.order_id}: {e}")
+        finally:
+            self.tp_sl_in_flight.discard(order.order_id)
+        # Index whatever levels are still pending
+        self.trigger_book.add(order)
+
     async def start_monitor_tp_sl(self):
         """Start the TP/SL monitoring loop"""
         logger.info("Starting TP/SL monitoring loop")
-        check_interval = 20  # Check every 20 seconds
         
         while self.running:
+            # Streamed prices drive the trigger book, the full pass is a resync and fallback
+            market_data = self.binance_client.market_data
+            check_interval = TP_SL_RESYNC_SECONDS if market_data and market_data.is_healthy() else 20
             try:
                 # Skip if trading is paused
                 if self.telegram_bot and self.telegram_bot.is_paused:
-                    await asyncio.sleep(check_interval)
+                    await asyncio.sleep(20)
                     continue
                 
                 # Skip if connection issues
@@ -539,5 +743,11 @@ class OrderManager:
             except Exception as e:
                 logger.error(f"Error in TP/SL monitoring loop: {e}")
             
-            # Sleep until next check
-            await asyncio.sleep(check_interval)
+            # Sleep until next check, waking early if the price stream drops
+            slept = 0
+            while self.running and slept < check_interval:
+                await asyncio.sleep(20)
+                slept += 20
+                await self._flush_trailing_updates()
+                if not (market_data and market_data.is_healthy()):
+                    break
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from ..types.models import Order, OrderStatus, TPSLStatus
+from ..types.constants import POSITION_LEDGER_VERIFY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+ONE = Decimal('1')
+
+class Position:
+    """Open quantity, cost basis and fees of one symbol"""
+    __slots__ = ('symbol', 'total_quantity', 'total_cost', 'total_fees', 'order_count')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.total_quantity = ZERO
+        self.total_cost = ZERO
+        self.total_fees = ZERO
+        self.order_count = 0
+
+    @property
+    def avg_entry_price(self) -> Decimal:
+        return self.total_cost / self.total_quantity if self.total_quantity else ZERO
+
+    def to_dict(self) -> dict:
+        """Same keys as MongoClient.get_position_stats"""
+        return {
+            "symbol": self.symbol,
+            "total_quantity": self.total_quantity,
+            "total_cost": self.total_cost,
+            "avg_entry_price": self.avg_entry_price,
+            "total_fees": self.total_fees,
+            "order_count": self.order_count,
+            "orders": []
+        }
+
+def _open_fraction(take_profit, stop_loss, trailing_stop_loss, partial_take_profits) -> Decimal:
+    """Share of an order's quantity still held after TP/SL exits (statuses as strings)"""
+    triggered = TPSLStatus.TRIGGERED.value
+    if triggered in (take_profit, stop_loss, trailing_stop_loss):
+        return ZERO
+    sold = sum((Decimal(str(pct)) for status, pct in partial_take_profits if status == triggered), ZERO) / 100
+    return max(ZERO, ONE - sold)
+
+def _status_value(target) -> Optional[str]:
+    if target is None:
+        return None
+    status = target.get('status') if isinstance(target, dict) else target.status
+    return status.value if hasattr(status, 'value') else status
+
+class PositionLedger:
+    """In-memory positions updated on fills and TP/SL exits, verified against MongoDB now and then"""
+
+    def __init__(self, mongo_client, verify_interval: float = POSITION_LEDGER_VERIFY_SECONDS):
+        self.mongo_client = mongo_client
+        self.verify_interval = verify_interval
+        self.positions: Dict[str, Position] = {}
+        # order_id -> (symbol, quantity, price, fees, open fraction)
+        self.entries: Dict[str, Tuple[str, Decimal, Decimal, Decimal, Decimal]] = {}
+        self.loaded = False
+        self.version = 0  # Bumped on every change, lets verify() detect concurrent updates
+        self.task = None
+
+    def get(self, symbol: str) -> Optional[Position]:
+        position = self.positions.get(symbol)
+        return position if position and position.total_quantity > 0 else None
+
+    def get_stats(self, allowed_symbols: Iterable[str] = None) -> Dict[str, dict]:
+        """Open positions keyed by symbol, shaped like MongoClient.get_position_stats"""
+        allowed = set(allowed_symbols) if allowed_symbols else None
+        return {
+            symbol: position.to_dict()
+            for symbol, position in self.positions.items()
+            if position.total_quantity > 0 and (allowed is None or symbol in allowed)
+        }
+
+    def _apply(self, order_id: str, symbol: str, quantity: Decimal, price: Decimal,
+               fees: Decimal, open_fraction: Decimal):
+        """Set the open fraction of one filled order, adjusting its symbol's totals by the difference"""
+        previous = self.entries.get(order_id)
+        previous_fraction = previous[4] if previous else ZERO
+        if previous and previous_fraction == open_fraction:
+            return
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = Position(symbol)
+        delta = open_fraction - previous_fraction
+        position.total_quantity += quantity * delta
+        position.total_cost += quantity * price * delta
+        position.total_fees += fees * delta
+        if previous is None:
+            position.order_count += 1
+        self.entries[order_id] = (symbol, quantity, price, fees, open_fraction)
+        self.version += 1
+
+    def sync_order(self, order: Order):
+        """Apply a fill or TP/SL exit of an order, safe to call repeatedly"""
+        try:
+            if order.status != OrderStatus.FILLED:
+                return
+            fraction = _open_fraction(
+                _status_value(order.take_profit),
+                _status_value(order.stop_loss),
+                _status_value(order.trailing_stop_loss),
+                [(_status_value(pt), pt.position_percentage) for pt in (order.partial_take_profits or [])]
+            )
+            self._apply(order.order_id, order.symbol, Decimal(str(order.quantity)),
+                        Decimal(str(order.price)), Decimal(str(order.fees or 0)), fraction)
+        except Exception as e:
+            logger.error(f"[LEDGER] Failed to apply order {order.order_id}: {e}")
+
+    def _sync_document(self, doc: dict):
+        fraction = _open_fraction(
+            _status_value(doc.get('take_profit')),
+            _status_value(doc.get('stop_loss')),
+            _status_value(doc.get('trailing_stop_loss')),
+            [(pt.get('status'), pt.get('position_percentage', 0)) for pt in (doc.get('partial_take_profits') or [])]
+        )
+        self._apply(str(doc['order_id']), doc['symbol'], Decimal(str(doc['quantity'])),
+                    Decimal(str(doc['price'])), Decimal(str(doc.get('fees') or 0)), fraction)
+
+    async def _replay(self) -> 'PositionLedger':
+        """Build a fresh ledger from the filled orders in MongoDB"""
+        ledger = PositionLedger(self.mongo_client, self.verify_interval)
+        async for doc in self.mongo_client.iter_filled_orders_for_positions():
+            try:
+                ledger._sync_document(doc)
+            except Exception as e:
+                logger.warning(f"[LEDGER] Skipping order {doc.get('order_id')}: {e}")
+        return ledger
+
+    async def load(self) -> bool:
+        """Load all filled orders once"""
+        try:
+            ledger = await self._replay()
+            self.positions, self.entries = ledger.positions, ledger.entries
+            self.loaded = True
+            logger.info(f"[LEDGER] Loaded {len(self.entries)} filled orders into {len(self.get_stats())} open positions")
+            return True
+        except Exception as e:
+            logger.error(f"[LEDGER] Failed to load positions: {e}")
+            return False
+
+    async def verify(self) -> bool:
+        """Compare against a replay from MongoDB, adopting the replay on any difference"""
+        try:
+            version = self.version
+            ledger = await self._replay()
+            if self.version != version:
+                # A fill landed while replaying, compare next time
+                logger.debug("[LEDGER] Positions changed during consistency check, skipping")
+                return True
+            mismatched = [
+                symbol for symbol in set(self.positions) | set(ledger.positions)
+                if self._totals(symbol) != ledger._totals(symbol)
+            ]
+            if mismatched:
+                logger.warning(f"[LEDGER] Positions out of sync with MongoDB for {', '.join(sorted(mismatched))}, reloading")
+                self.positions, self.entries = ledger.positions, ledger.entries
+                return False
+            logger.debug(f"[LEDGER] Consistency check passed for {len(self.positions)} symbols")
+            return True
+        except Exception as e:
+            logger.error(f"[LEDGER] Consistency check failed: {e}")
+            return False
+
+    def _totals(self, symbol: str) -> tuple:
+        position = self.positions.get(symbol)
+        if position is None:
+            return (ZERO, ZERO, 0)
+        return (position.total_quantity.normalize(), position.total_cost.normalize(), position.order_count)
+
+    async def start(self):
+        await self.load()
+        self.task = asyncio.create_task(self._verify_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _verify_loop(self):
+        while True:
+            await asyncio.sleep(self.verify_interval)
+            await self.verify()
@@ -0,0 +1,36 @@
+import time
+from decimal import Decimal
+from typing import Optional
+from .symbol_rules import SymbolRule
+
+class PreTradeContext:
+    """Price, trading rules, balances and position gathered once before placing an order"""
+    __slots__ = (
+        'symbol', 'price', 'rule', 'balance', 'pending_value', 'reserve',
+        'avg_entry_price', 'triggered_at'
+    )
+
+    def __init__(self, symbol: str, price: float, rule: Optional[SymbolRule],
+                 balance: Decimal, pending_value: Decimal, reserve: Decimal,
+                 avg_entry_price: Optional[Decimal] = None, triggered_at: Optional[float] = None):
+        self.symbol = symbol
+        self.price = price
+        self.rule = rule
+        self.balance = balance
+        self.pending_value = pending_value
+        self.reserve = reserve
+        self.avg_entry_price = avg_entry_price
+        # time.perf_counter() when the threshold was detected
+        self.triggered_at = triggered_at if triggered_at is not None else time.perf_counter()
+
+    @property
+    def free_balance(self) -> Decimal:
+        """Quote balance left after open buy orders and the reserve"""
+        return self.balance - self.pending_value - self.reserve
+
+    def can_afford(self, amount) -> bool:
+        return self.free_balance >= Decimal(str(amount))
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the trigger"""
+        return (time.perf_counter() - self.triggered_at) * 1000
@@ -0,0 +1,166 @@
+from binance.client import AsyncClient
+from decimal import Decimal, ROUND_DOWN, ROUND_UP, ROUND_HALF_EVEN
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional
+from ..types.constants import MIN_NOTIONAL, SYMBOL_RULES_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class SymbolRule:
+    """Pre-parsed trading rules for one symbol"""
+    __slots__ = (
+        'symbol', 'base_asset', 'quote_asset', 'status',
+        'base_precision', 'quote_precision',
+        'tick_size', 'min_price', 'max_price',
+        'step_size', 'min_qty', 'max_qty', 'qty_quantum',
+        'min_notional'
+    )
+
+    def __init__(self, symbol: str, base_asset: str = '', quote_asset: str = '', status: str = 'TRADING',
+                 base_precision: int = 8, quote_precision: int = 8,
+                 tick_size: Decimal = Decimal('0.00000001'), min_price: Decimal = Decimal('0'),
+                 max_price: Decimal = Decimal('0'), step_size: Decimal = Decimal('0.00000001'),
+                 min_qty: Decimal = Decimal('0.00000001'), max_qty: Decimal = Decimal('9999999.0'),
+                 min_notional: Optional[Decimal] = None):
+        self.symbol = symbol
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.status = status
+        self.base_precision = base_precision
+        self.quote_precision = quote_precision
+        self.tick_size = tick_size
+        self.min_price = min_price
+        self.max_price = max_price
+        self.step_size = step_size
+        self.min_qty = min_qty
+        self.max_qty = max_qty
+        # Quantization unit derived from the step size, e.g. 0.001 -> Decimal('0.001')
+        self.qty_quantum = Decimal(1).scaleb(step_size.normalize().as_tuple().exponent) if step_size > 0 else Decimal(1)
+        if min_notional is None:
+            min_notional = Decimal(str(MIN_NOTIONAL.get(symbol, MIN_NOTIONAL['DEFAULT'])))
+        self.min_notional = min_notional
+
+    @classmethod
+    def from_exchange_symbol(cls, data: dict) -> 'SymbolRule':
+        """Build a rule from one entry of the exchangeInfo 'symbols' list"""
+        kwargs = {
+            'base_asset': data.get('baseAsset', ''),
+            'quote_asset': data.get('quoteAsset', ''),
+            'status': data.get('status', 'TRADING'),
+            'base_precision': int(data.get('baseAssetPrecision', 8)),
+            'quote_precision': int(data.get('quotePrecision', 8)),
+        }
+        for filter_data in data.get('filters', []):
+            filter_type = filter_data.get('filterType')
+            if filter_type == 'PRICE_FILTER':
+                kwargs['tick_size'] = Decimal(filter_data['tickSize'])
+                kwargs['min_price'] = Decimal(filter_data['minPrice'])
+                kwargs['max_price'] = Decimal(filter_data['maxPrice'])
+            elif filter_type == 'LOT_SIZE':
+                kwargs['step_size'] = Decimal(filter_data['stepSize'])
+                kwargs['min_qty'] = Decimal(filter_data['minQty'])
+                kwargs['max_qty'] = Decimal(filter_data['maxQty'])
+            elif filter_type in ('MIN_NOTIONAL', 'NOTIONAL') and 'minNotional' in filter_data:
+                kwargs['min_notional'] = Decimal(filter_data['minNotional'])
+        return cls(data['symbol'], **kwargs)
+
+    def align_price(self, price: Decimal) -> Decimal:
+        """Round a price to the tick size, never ending up off-tick"""
+        if self.tick_size == Decimal('0'):
+            return price
+        aligned = price.quantize(self.tick_size.normalize(), rounding=ROUND_HALF_EVEN)
+        remainder = aligned % self.tick_size
+        if remainder > Decimal('0'):
+            aligned -= remainder
+        return aligned
+
+    def adjust_quantity(self, quantity: Decimal, round_up: bool = False) -> Decimal:
+        """Snap a quantity to the step size and clamp it to the LOT_SIZE bounds"""
+        if self.step_size > 0:
+            steps = (quantity / self.step_size).to_integral_value(rounding=ROUND_UP if round_up else ROUND_DOWN)
+            quantity = steps * self.step_size
+        if quantity < self.min_qty:
+            quantity = self.min_qty
+        elif quantity > self.max_qty:
+            quantity = self.max_qty
+        return quantity.quantize(self.qty_quantum, rounding=ROUND_DOWN)
+
+class SymbolRules:
+    """O(1) lookup table of SymbolRule records for the traded symbols"""
+
+    def __init__(self, refresh_interval: float = SYMBOL_RULES_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self.rules: Dict[str, SymbolRule] = {}
+        self.symbols = set()
+        self.unknown = set()  # Tracked symbols the last refresh had no rules for
+        self.client: Optional[AsyncClient] = None
+        self.call_api = None  # Rate limited request wrapper from BinanceClient
+        self.last_refresh = None
+        self.task = None
+        self._refresh_lock = asyncio.Lock()
+
+    def get(self, symbol: str) -> Optional[SymbolRule]:
+        return self.rules.get(symbol)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.rules
+
+    def track(self, symbols: Iterable[str]):
+        """Add symbols to the set kept by the background refresh"""
+        self.symbols.update(symbols)
+
+    async def refresh(self) -> bool:
+        """Download exchange info once and rebuild the rules for tracked symbols"""
+        if not self.client:
+            return False
+        async with self._refresh_lock:
+            try:
+                if self.call_api:
+                    exchange_info = await self.call_api('exchange_info', self.client.get_exchange_info)
+                else:
+                    exchange_info = await self.client.get_exchange_info()
+                rules = {}
+                for data in exchange_info.get('symbols', []):
+                    if data['symbol'] in self.symbols:
+                        rules[data['symbol']] = SymbolRule.from_exchange_symbol(data)
+                # Swap the table in one step so lookups never see a partial refresh
+                self.rules = rules
+                self.unknown = self.symbols - rules.keys()
+                self.last_refresh = asyncio.get_running_loop().time()
+                logger.info(f"[RULES] Loaded trading rules for {len(rules)}/{len(self.symbols)} symbols")
+                return True
+            except Exception as e:
+                logger.error(f"[RULES] Failed to refresh symbol rules: {e}")
+                return False
+
+    async def ensure(self, symbol: str) -> Optional[SymbolRule]:
+        """Return the rule for a symbol, refreshing once if it has not been loaded yet"""
+        rule = self.rules.get(symbol)
+        if rule is None and symbol not in self.unknown:
+            self.symbols.add(symbol)
+            await self.refresh()
+            rule = self.rules.get(symbol)
+        return rule
+
+    async def start(self, client: AsyncClient, symbols: Iterable[str], call_api=None):
+        """Load the rules and keep them fresh in the background"""
+        self.client = client
+        self.call_api = call_api
+        self.track(symbols)
+        await self.refresh()
+        self.task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
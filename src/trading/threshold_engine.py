@@ -0,0 +1,141 @@
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+from ..types.models import TimeFrame
+
+logger = logging.getLogger(__name__)
+
+class ThresholdCrossing(NamedTuple):
+    """A threshold newly crossed by a symbol on a timeframe"""
+    symbol: str
+    timeframe: TimeFrame
+    threshold: float
+    current_price: float
+    reference_price: float
+    price_change: float
+
+class ThresholdEngine:
+    """Vectorized threshold evaluation over all symbols and timeframes
+
+    Holds reference prices as a (symbols x timeframes) array, the threshold
+    ladders as a (timeframes x levels) array padded with +inf, and a
+    (symbols x timeframes x levels) mask of thresholds already triggered.
+    """
+
+    def __init__(self, thresholds: Dict[str, List[float]]):
+        self.timeframes = list(TimeFrame)
+        self.timeframe_index = {tf.value: i for i, tf in enumerate(self.timeframes)}
+        self.symbols: List[str] = []
+        self.symbol_index: Dict[str, int] = {}
+        self.ladder_config = None
+        self.ladders = np.full((len(self.timeframes), 0), np.inf)
+        self.reference = np.full((0, len(self.timeframes)), np.nan)
+        self.triggered = np.zeros((0, len(self.timeframes), 0), dtype=bool)
+        self.set_ladders(thresholds)
+
+    def set_ladders(self, thresholds: Dict[str, List[float]]):
+        """Load the threshold ladders, keeping triggered flags for levels that still exist"""
+        config = tuple(tuple(sorted(float(t) for t in thresholds.get(tf.value, []))) for tf in self.timeframes)
+        if config == self.ladder_config:
+            return
+        width = max((len(ladder) for ladder in config), default=0)
+        ladders = np.full((len(self.timeframes), width), np.inf)
+        triggered = np.zeros((len(self.symbols), len(self.timeframes), width), dtype=bool)
+        for j, ladder in enumerate(config):
+            ladders[j, :len(ladder)] = ladder
+            # Carry over triggered flags by threshold value
+            for k, value in enumerate(ladder):
+                old = np.flatnonzero(np.isclose(self.ladders[j], value))
+                if old.size:
+                    triggered[:, j, k] = self.triggered[:, j, old[0]]
+        self.ladder_config = config
+        self.ladders = ladders
+        self.triggered = triggered
+
+    def set_symbols(self, symbols: Iterable[str]) -> List[str]:
+        """Resize the arrays to a new symbol universe, returns symbols that were added"""
+        symbols = list(dict.fromkeys(symbols))
+        if symbols == self.symbols:
+            return []
+        reference = np.full((len(symbols), len(self.timeframes)), np.nan)
+        triggered = np.zeros((len(symbols), len(self.timeframes), self.ladders.shape[1]), dtype=bool)
+        added = []
+        for i, symbol in enumerate(symbols):
+            old = self.symbol_index.get(symbol)
+            if old is None:
+                added.append(symbol)
+                continue
+            reference[i] = self.reference[old]
+            triggered[i] = self.triggered[old]
+        self.symbols = symbols
+        self.symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.reference = reference
+        self.triggered = triggered
+        return added
+
+    def missing_references(self) -> List[tuple]:
+        """(symbol, TimeFrame) pairs without a reference price"""
+        rows, cols = np.nonzero(np.isnan(self.reference))
+        return [(self.symbols[i], self.timeframes[j]) for i, j in zip(rows, cols)]
+
+    def set_reference(self, symbol: str, timeframe: TimeFrame, price: Optional[float]):
+        i = self.symbol_index.get(symbol)
+        if i is not None:
+            self.reference[i, self.timeframe_index[timeframe.value]] = price if price else np.nan
+
+    def clear_references(self, timeframe: TimeFrame):
+        """Forget the reference prices of a timeframe, e.g. at a period boundary"""
+        self.reference[:, self.timeframe_index[timeframe.value]] = np.nan
+
+    def _level(self, j: int, threshold: float) -> Optional[int]:
+        matches = np.flatnonzero(np.isclose(self.ladders[j], float(threshold)))
+        return int(matches[0]) if matches.size else None
+
+    def set_triggered(self, symbol: str, timeframe_value: str, thresholds: Iterable[float]):
+        """Replace the triggered flags of a symbol/timeframe"""
+        i = self.symbol_index.get(symbol)
+        j = self.timeframe_index.get(timeframe_value)
+        if i is None or j is None:
+            return
+        self.triggered[i, j, :] = False
+        for threshold in thresholds:
+            k = self._level(j, threshold)
+            if k is not None:
+                self.triggered[i, j, k] = True
+
+    def mark(self, symbol: str, timeframe_value: str, threshold: float):
+        i = self.symbol_index.get(symbol)
+        j = self.timeframe_index.get(timeframe_value)
+        if i is None or j is None:
+            return
+        k = self._level(j, threshold)
+        if k is not None:
+            self.triggered[i, j, k] = True
+
+    def reset_timeframe(self, timeframe_value: str):
+        """Clear all triggered flags of a timeframe"""
+        j = self.timeframe_index.get(timeframe_value)
+        if j is not None:
+            self.triggered[:, j, :] = False
+
+    def evaluate(self, prices: Dict[str, float]) -> List[ThresholdCrossing]:
+        """Return every threshold newly crossed at the given prices, in one vectorized pass"""
+        if not self.symbols or self.ladders.shape[1] == 0:
+            return []
+        current = np.fromiter((prices.get(symbol, np.nan) for symbol in self.symbols),
+                              dtype=float, count=len(self.symbols))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change = (current[:, None] - self.reference) / self.reference * 100
+            # NaN prices or references compare False and never trigger
+            crossed = (change[:, :, None] <= -self.ladders[None, :, :]) & ~self.triggered
+        crossings = []
+        for i, j, k in np.argwhere(crossed):
+            crossings.append(ThresholdCrossing(
+                symbol=self.symbols[i],
+                timeframe=self.timeframes[j],
+                threshold=float(self.ladders[j, k]),
+                current_price=float(current[i]),
+                reference_price=float(self.reference[i, j]),
+                price_change=float(change[i, j])
+            ))
+        return crossings
@@ -0,0 +1,137 @@
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional
+from ..types.models import Order, OrderStatus, TPSLStatus, TradeDirection
+
+logger = logging.getLogger(__name__)
+
+class _SymbolBook:
+    """Two heaps per symbol: levels hit on the way up and levels hit on the way down"""
+    __slots__ = ('up', 'down')
+
+    def __init__(self):
+        # (level, strict, seq, order_id, version), fires when price >= level (> if strict)
+        self.up = []
+        # (-level, strict, seq, order_id, version), fires when price <= level (< if strict)
+        self.down = []
+
+class TriggerBook:
+    """Price-indexed TP, SL, partial TP and trailing stop levels of open positions
+
+    Each price update pops only the crossed levels, O(log n + k), and returns
+    the orders that need a full check_tp_sl_triggers pass.
+    """
+
+    def __init__(self):
+        self.books: Dict[str, _SymbolBook] = {}
+        self.orders: Dict[str, Order] = {}
+        # order_id -> version, entries of older versions are skipped when popped
+        self.versions: Dict[str, int] = {}
+        # order_id -> time.monotonic() of the last add(), newer than a database load wins over it
+        self.added_at: Dict[str, float] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.orders
+
+    def add(self, order: Order):
+        """Index the pending levels of an order, replacing anything indexed for it before"""
+        self.remove(order.order_id)
+        self.added_at[order.order_id] = time.monotonic()
+        if order.status != OrderStatus.FILLED:
+            return
+        version = self.versions.get(order.order_id, 0) + 1
+        self.versions[order.order_id] = version
+        book = self.books.setdefault(order.symbol, _SymbolBook())
+        is_long = not order.direction or order.direction == TradeDirection.LONG
+        pending = TPSLStatus.PENDING
+
+        def push(profit_side: bool, level, strict: bool = False):
+            # Profit levels sit above a long entry and below a short one
+            up = profit_side == is_long
+            level = float(level)
+            entry = (level if up else -level, strict, next(self._sequence), order.order_id, version)
+            heapq.heappush(book.up if up else book.down, entry)
+
+        indexed = False
+        if order.take_profit and order.take_profit.status == pending:
+            push(True, order.take_profit.price)
+            indexed = True
+        if order.stop_loss and order.stop_loss.status == pending:
+            push(False, order.stop_loss.price)
+            indexed = True
+        for partial_tp in order.partial_take_profits or []:
+            if partial_tp.status == pending:
+                push(True, partial_tp.price)
+                indexed = True
+        trailing = order.trailing_stop_loss
+        if trailing and trailing.status == pending:
+            push(False, trailing.current_stop_price)
+            # The stop moves when the price passes activation, then on every new extreme
+            push(True, trailing.highest_price if trailing.activated_at else trailing.activation_price,
+                 strict=bool(trailing.activated_at))
+            indexed = True
+        if indexed:
+            self.orders[order.order_id] = order
+
+    def remove(self, order_id: str):
+        """Forget an order, its heap entries become stale"""
+        if self.orders.pop(order_id, None) is not None:
+            self.versions[order_id] = self.versions.get(order_id, 0) + 1
+
+    def forget(self, order_id: str):
+        """Remove an order and let the next sync take its database state"""
+        self.remove(order_id)
+        self.added_at.pop(order_id, None)
+
+    def sync(self, orders: List[Order], loaded_at: float):
+        """Rebuild from orders loaded from the database at time.monotonic() loaded_at
+
+        Orders changed in memory after the load keep their in-memory state.
+        """
+        current = {}
+        for order in orders:
+            if self.added_at.get(order.order_id, 0.0) > loaded_at:
+                kept = self.orders.get(order.order_id)
+                if kept is not None:
+                    current[order.order_id] = kept
+            else:
+                current[order.order_id] = order
+        # Rebuilding also drops stale heap entries
+        self.books.clear()
+        self.orders.clear()
+        self.added_at = {order_id: t for order_id, t in self.added_at.items() if t > loaded_at}
+        for order in current.values():
+            self.add(order)
+        logger.debug(f"[TRIGGERS] Indexed {len(self.orders)} orders with active TP/SL")
+
+    def on_price(self, symbol: str, price: float) -> List[Order]:
+        """Pop levels crossed by a new price, returning the affected orders"""
+        book = self.books.get(symbol)
+        if book is None:
+            return []
+        hit = {}
+        self._pop_crossed(book.up, price, hit)
+        self._pop_crossed(book.down, -price, hit)
+        for order_id in hit:
+            # Remaining levels are re-added after the order has been checked
+            self.remove(order_id)
+        return list(hit.values())
+
+    def _pop_crossed(self, heap: list, price: float, hit: Dict[str, Order]):
+        while heap:
+            level, strict, _, order_id, version = heap[0]
+            if level > price or (strict and level == price):
+                return
+            heapq.heappop(heap)
+            order = self.orders.get(order_id)
+            if order is not None and self.versions.get(order_id) == version:
+                hit[order_id] = order
+
+    def get(self, order_id: str) -> Optional[Order]:
+        return self.orders.get(order_id)
@@ -0,0 +1,74 @@
+from dataclasses import fields
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict
+from .models import Order, TakeProfit, StopLoss, PartialTakeProfit, TrailingStopLoss
+
+# Field conversions, enums are stored by value and other fields as they are
+DECIMAL = 'decimal'
+ONE = 'one'    # Optional nested model
+MANY = 'many'  # List of nested models
+
+_TP_SL_KINDS = {'price': DECIMAL}
+_KINDS = {
+    'take_profit': _TP_SL_KINDS,
+    'stop_loss': _TP_SL_KINDS,
+    'partial_take_profit': _TP_SL_KINDS,
+    'trailing_stop_loss': {
+        'initial_price': DECIMAL, 'activation_price': DECIMAL, 'current_stop_price': DECIMAL,
+        'highest_price': DECIMAL
+    },
+    'order': {
+        'price': DECIMAL, 'quantity': DECIMAL, 'fees': DECIMAL,
+        'take_profit': ONE, 'stop_loss': ONE, 'partial_take_profits': MANY, 'trailing_stop_loss': ONE
+    }
+}
+
+_MODELS = {
+    'order': Order, 'take_profit': TakeProfit, 'stop_loss': StopLoss,
+    'partial_take_profit': PartialTakeProfit, 'trailing_stop_loss': TrailingStopLoss
+}
+# class -> (kind name, field names in declaration order)
+_CLASSES = {cls: (kind, tuple(f.name for f in fields(cls))) for kind, cls in _MODELS.items()}
+
+def to_decimal(value) -> Decimal:
+    """Decimal from a stored str, number or Decimal128"""
+    if value.__class__ is str:
+        return Decimal(value)
+    if isinstance(value, Decimal):
+        return value
+    if hasattr(value, 'to_decimal'):
+        return value.to_decimal()
+    return Decimal(str(value))
+
+def _describe(cls) -> tuple:
+    try:
+        return _CLASSES[cls]
+    except KeyError:
+        # LazyOrder and other subclasses encode like their model
+        for base in cls.__mro__[1:]:
+            if base in _CLASSES:
+                return _CLASSES[base]
+        raise TypeError(f"No codec for {cls.__name__}")
+
+def _encode_value(kind, value, decimal):
+    if value is None:
+        return None
+    if kind is DECIMAL:
+        return decimal(value)
+    if kind is MANY:
+        return [to_document(item, decimal) for item in value]
+    if kind is ONE:
+        return to_document(value, decimal)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+def to_document(obj, decimal: Callable[[Decimal], Any] = str) -> Dict[str, Any]:
+    """BSON-ready dict of a model, in the shape stored in MongoDB
+
+    decimal converts prices and quantities, str by default, Decimal128 for schema version 2.
+    """
+    kind_name, names = _describe(obj.__class__)
+    kinds = _KINDS[kind_name]
+    return {name: _encode_value(kinds.get(name), getattr(obj, name), decimal) for name in names}
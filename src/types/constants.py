@@ -16,8 +16,107 @@ TIMEFRAME_INTERVALS = {
 }
 
 # Rate limiting
-MAX_REQUESTS_PER_MINUTE = 1200
+MAX_REQUESTS_PER_MINUTE = 1200  # Request weight per minute
 REQUEST_WEIGHT_DEFAULT = 1
+MAX_ORDERS_PER_10_SECONDS = 50
+MAX_RAW_REQUESTS_PER_5_MINUTES = 61000
+
+# Request weight per REST endpoint
+ENDPOINT_WEIGHTS = {
+    'ping': 1,
+    'server_time': 1,
+    'ticker_price': 2,      # /api/v3/ticker/price with symbol
+    'ticker_price_all': 4,  # /api/v3/ticker/price without symbol
+    'klines': 2,
+    'exchange_info': 20,
+    'account': 20,
+    'open_orders': 6,
+    'open_orders_all': 80,
+    'get_order': 4,
+    'all_orders': 20,
+    'order': 1,             # POST /api/v3/order
+    'cancel_order': 1,
+    'user_data_stream': 2
+}
+
+# Endpoints that also count against the order rate limit
+ORDER_ENDPOINTS = {'order'}
+
+# Priority lanes, lower value is served first
+PRIORITY_ORDER = 0   # Order placement and cancels
+PRIORITY_NORMAL = 1  # Trading cycle reads
+PRIORITY_BULK = 2    # Charts, history and benchmark downloads
+
+# Share of the weight bucket each lane must leave for higher priority lanes
+RATE_LIMIT_LANE_RESERVE = {
+    PRIORITY_ORDER: 0.0,
+    PRIORITY_NORMAL: 0.05,
+    PRIORITY_BULK: 0.25
+}
+
+# Market data stream settings
+PRICE_STREAM_STALE_SECONDS = 15  # Fall back to REST when the stream is older than this
+PRICE_STREAM_RECONNECT_DELAY = 1
+PRICE_STREAM_MAX_RECONNECT_DELAY = 60
+PRICE_SNAPSHOT_MAX_AGE = 10  # Seconds a cycle price snapshot may be reused
+
+# Exchange trading rules refresh interval (seconds)
+SYMBOL_RULES_REFRESH_SECONDS = 3600
+
+# How often local account state is reconciled against REST (seconds)
+ACCOUNT_RECONCILE_SECONDS = 300
+
+# Safety-net order status reconciliation when fills arrive over the user data stream (seconds)
+ORDER_RECONCILE_SECONDS = 600
+# Order status polling while the user data stream is down (seconds)
+ORDER_RECONCILE_FALLBACK_SECONDS = 60
+
+# Symbols evaluated concurrently in one monitoring cycle
+MAX_CONCURRENT_SYMBOLS = 10
+
+# Interval between write-behind flushes of triggered threshold state (seconds)
+THRESHOLD_STATE_FLUSH_SECONDS = 2
+
+# How often the in-memory position ledger is checked against MongoDB (seconds)
+POSITION_LEDGER_VERIFY_SECONDS = 3600
+
+# Full TP/SL pass and trigger book resync while the price stream is healthy (seconds)
+TP_SL_RESYNC_SECONDS = 300
+
+# A trailing stop moved by streamed prices is saved and notified at most this often per
+# order (seconds), later moves stay in memory until then or the next resync pass
+TRAILING_SL_SAVE_SECONDS = 20
+
+# Change polling interval when MongoDB has no change streams (standalone), and how
+# many polls pass between full reloads that also pick up deleted documents
+CHANGE_POLL_SECONDS = 5
+CHANGE_POLL_FULL_RELOAD_EVERY = 60
+
+# Hours a cancelled order stays in the in-memory order index after its last update
+ORDER_INDEX_RECENT_HOURS = 24
+
+# Balance history rollups: refresh interval (seconds), and the fewest points a chart
+# should have before get_balance_history switches to a coarser resolution
+BALANCE_ROLLUP_INTERVAL_SECONDS = 3600
+BALANCE_CHART_MIN_POINTS = 60
+# Rollup resolution -> (bucket unit for $dateTrunc, bucket length in days), coarsest first
+BALANCE_ROLLUPS = {
+    "weekly": ("week", 7),
+    "daily": ("day", 1)
+}
+
+# Closed orders older than this many days move from orders to orders_archive, checked
+# every ORDER_ARCHIVE_INTERVAL_SECONDS and moved ORDER_ARCHIVE_BATCH_SIZE at a time
+ORDER_ARCHIVE_AFTER_DAYS = 90
+ORDER_ARCHIVE_INTERVAL_SECONDS = 6 * 3600
+ORDER_ARCHIVE_BATCH_SIZE = 500
+
+# Seconds between refreshes of the /viz order views, which /viz reads as they are
+ORDER_VIEWS_INTERVAL_SECONDS = 300
+
+# Orders rewritten per batch by the Decimal128 migration, and the pause between batches (seconds)
+DECIMAL_MIGRATION_BATCH_SIZE = 500
+DECIMAL_MIGRATION_PAUSE_SECONDS = 0.2
 
 # Order related constants
 MIN_NOTIONAL = {
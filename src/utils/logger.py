@@ -8,6 +8,10 @@ from datetime import datetime
 import shutil
 from datetime import datetime, timedelta
 import glob
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
 
 # Create custom logger levels
 BALANCE_CHECK = 25
@@ -26,6 +30,42 @@ class ConfigLogger:
     def log_config(self, message: str):
         self.logger.log(CONFIG_CHECK, f"[CONFIG] {message}")
 
+# Records emitted inside buffered_logs() are collected here per asyncio task, as (owning task, records)
+_log_buffer: ContextVar[Optional[tuple]] = ContextVar('log_buffer', default=None)
+
+def _current_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+class BufferedLogFilter(logging.Filter):
+    """Holds back records emitted inside a buffered_logs() block"""
+    def filter(self, record):
+        state = _log_buffer.get()
+        # Tasks spawned inside the block inherit the context but log on their own
+        if state is None or state[0] is not _current_task():
+            return True
+        buffer = state[1]
+        # Every root handler sees the record, only keep it once
+        if not getattr(record, '_buffered', False):
+            record._buffered = True
+            buffer.append(record)
+        return False
+
+@contextmanager
+def buffered_logs():
+    """Collect log records of the current task and emit them as one block on exit"""
+    buffer = []
+    token = _log_buffer.set((_current_task(), buffer))
+    try:
+        yield buffer
+    finally:
+        _log_buffer.reset(token)
+        root_logger = logging.getLogger()
+        for record in buffer:
+            root_logger.callHandlers(record)
+
 class WindowsConsoleHandler(logging.StreamHandler):
     """Custom handler for Windows console that handles encoding properly"""
     def __init__(self):
@@ -230,6 +270,11 @@ def setup_logging() -> ConfigLogger:
     root_logger.addHandler(error_handler)
     root_logger.addHandler(balance_handler)
     root_logger.addHandler(config_handler)
+    
+    # Let concurrently processed symbols keep their log lines grouped
+    buffered_filter = BufferedLogFilter()
+    for handler in root_logger.handlers:
+        handler.addFilter(buffered_filter)
 
     # Create balance logger
     balance_logger = logging.getLogger('balance')
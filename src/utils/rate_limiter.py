@@ -1,25 +1,150 @@
 import asyncio
+import heapq
+import itertools
+import logging
 import time
-from collections import deque
-from ..types.constants import MAX_REQUESTS_PER_MINUTE, REQUEST_WEIGHT_DEFAULT
+from typing import Optional
+from ..types.constants import (
+    MAX_REQUESTS_PER_MINUTE, REQUEST_WEIGHT_DEFAULT, MAX_ORDERS_PER_10_SECONDS,
+    MAX_RAW_REQUESTS_PER_5_MINUTES, ENDPOINT_WEIGHTS, ORDER_ENDPOINTS,
+    PRIORITY_ORDER, PRIORITY_NORMAL, PRIORITY_BULK, RATE_LIMIT_LANE_RESERVE
+)
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Continuously refilling bucket of `capacity` tokens per `period` seconds"""
+    __slots__ = ('capacity', 'period', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = float(capacity)
+        self.period = period
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, cost: float, now: float, reserve: float = 0.0) -> float:
+        """Seconds until `cost` tokens can be taken while leaving `reserve` untouched"""
+        self._refill(now)
+        missing = cost + reserve - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def consume(self, cost: float, now: float):
+        self._refill(now)
+        self.tokens -= cost
+
+    def sync_used(self, used: float, now: float):
+        """Align with the exchange's view of how much of the window is used"""
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
 
 class RateLimiter:
-    def __init__(self, max_requests: int = MAX_REQUESTS_PER_MINUTE):
+    """Weight-aware rate limiter with priority lanes, synced from Binance response headers"""
+
+    def __init__(self, max_requests: int = MAX_REQUESTS_PER_MINUTE,
+                 max_orders: int = MAX_ORDERS_PER_10_SECONDS,
+                 max_raw_requests: int = MAX_RAW_REQUESTS_PER_5_MINUTES):
         self.max_requests = max_requests
-        self.requests = deque()
-        
-    async def acquire(self, weight: int = REQUEST_WEIGHT_DEFAULT):
-        """Acquire rate limit permission"""
-        now = time.time()
-        
-        # Remove requests older than 1 minute
-        while self.requests and now - self.requests[0] > 60:
-            self.requests.popleft()
-            
-        # If we're at the limit, wait until we can make another request
-        if len(self.requests) >= self.max_requests:
-            wait_time = 60 - (now - self.requests[0])
-            if wait_time > 0:
-                await asyncio.sleep(wait_time)
-                
-        self.requests.append(now)
+        self.weight_bucket = TokenBucket(max_requests, 60)
+        self.order_bucket = TokenBucket(max_orders, 10)
+        self.raw_bucket = TokenBucket(max_raw_requests, 300)
+        self.blocked_until = 0.0  # Set by 429/418 Retry-After
+        self._waiters = []  # heap of (priority, seq, weight, is_order, future)
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, weight: Optional[int] = None, endpoint: Optional[str] = None,
+                      priority: int = PRIORITY_NORMAL):
+        """Acquire rate limit permission for one request"""
+        if weight is None:
+            weight = ENDPOINT_WEIGHTS.get(endpoint, REQUEST_WEIGHT_DEFAULT)
+        is_order = endpoint in ORDER_ENDPOINTS
+        if is_order:
+            priority = PRIORITY_ORDER
+
+        # Fast path: nobody is queued and all buckets have room
+        if not self._waiters and self._try_consume(weight, is_order, priority, time.monotonic()) == 0.0:
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), weight, is_order, future))
+        self._dispatch()
+        await future
+
+    def _try_consume(self, weight: int, is_order: bool, priority: int, now: float) -> float:
+        """Consume tokens if possible, otherwise return how long to wait"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        reserve = self.weight_bucket.capacity * RATE_LIMIT_LANE_RESERVE.get(priority, 0.0)
+        wait = max(
+            self.weight_bucket.wait_time(weight, now, reserve),
+            self.raw_bucket.wait_time(1, now),
+            self.order_bucket.wait_time(1, now) if is_order else 0.0
+        )
+        if wait > 0:
+            return wait
+        self.weight_bucket.consume(weight, now)
+        self.raw_bucket.consume(1, now)
+        if is_order:
+            self.order_bucket.consume(1, now)
+        return 0.0
+
+    def _dispatch(self):
+        """Release queued requests in priority order as capacity allows"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            priority, _, weight, is_order, future = self._waiters[0]
+            if future.done():
+                # Caller was cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._try_consume(weight, is_order, priority, time.monotonic())
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    def update_from_headers(self, headers):
+        """Sync buckets from X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-10S response headers"""
+        if not headers:
+            return
+        now = time.monotonic()
+        try:
+            used_weight = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('x-mbx-used-weight-1m')
+            if used_weight is not None:
+                self.weight_bucket.sync_used(float(used_weight), now)
+            order_count = headers.get('X-MBX-ORDER-COUNT-10S') or headers.get('x-mbx-order-count-10s')
+            if order_count is not None:
+                self.order_bucket.sync_used(float(order_count), now)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Ignoring malformed rate limit headers: {e}")
+
+    def handle_api_error(self, status_code: Optional[int], headers=None):
+        """Back off on 429 (rate limited) and 418 (IP banned) responses"""
+        if status_code not in (429, 418):
+            return
+        retry_after = None
+        if headers:
+            retry_after = headers.get('Retry-After') or headers.get('retry-after')
+        try:
+            delay = float(retry_after) if retry_after is not None else 60.0
+        except (TypeError, ValueError):
+            delay = 60.0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        # Treat the whole window as used so we restart slowly after the ban
+        self.weight_bucket.tokens = 0.0
+        logger.warning(f"Binance returned HTTP {status_code}, pausing requests for {delay:.0f}s")
+
+    @property
+    def used_weight(self) -> float:
+        """Approximate request weight used in the current minute"""
+        self.weight_bucket._refill(time.monotonic())
+        return self.weight_bucket.capacity - self.weight_bucket.tokens